@@ -1,5 +1,7 @@
 # app.py
 import os
+import sys
+import logging
 
 # 🔑 加载 .env 文件中的环境变量
 try:
@@ -9,16 +11,27 @@ try:
 except ImportError:
     print("⚠️ python-dotenv not installed, using system environment variables")
 
+# 📝 日志统一在入口配置：core 模块只 getLogger(__name__)，消息原样输出到 stdout
+# ASSET_LOG_LEVEL / FILM_IR_LOG_LEVEL=WARNING 时进度日志不再格式化和写出
+logging.basicConfig(level=logging.WARNING, stream=sys.stdout, format="%(message)s")
+logging.getLogger("core.asset_generator").setLevel(os.environ.get("ASSET_LOG_LEVEL", "INFO").upper())
+logging.getLogger("core.film_ir_manager").setLevel(os.environ.get("FILM_IR_LOG_LEVEL", "INFO").upper())
+
 import json
 import uuid
 import shutil
+import asyncio
+import time
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
 from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 import re
+import orjson
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List, Union
 
@@ -26,11 +39,12 @@ from core.workflow_manager import WorkflowManager
 from core.agent_engine import AgentEngine
 from core.film_ir_manager import FilmIRManager
 from core.film_ir_io import load_film_ir, film_ir_exists
+from core.workflow_io import compute_progress
 
 # Base URL for asset links - use environment variable in production
 BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
 
-app = FastAPI(title="AI 导演工作台 API / SocialSaver Backend")
+app = FastAPI(title="AI 导演工作台 API / SocialSaver Backend", default_response_class=ORJSONResponse)
 
 
 # ============================================================
@@ -39,6 +53,9 @@ app = FastAPI(title="AI 导演工作台 API / SocialSaver Backend")
 
 def parse_time_to_seconds(time_value) -> float:
     """将时间值转换为秒数，支持 'MM:SS', 'HH:MM:SS' 格式或数字"""
+    # 快速路径：workflow 中的时间通常已是 float
+    if time_value.__class__ is float:
+        return time_value
     if time_value is None:
         return 0.0
     if isinstance(time_value, (int, float)):
@@ -64,25 +81,34 @@ def parse_time_to_seconds(time_value) -> float:
             return 0.0
     return 0.0
 
+
+_SHOT_NUM_RE = re.compile(r'\d+')
+_CINEMATOGRAPHY_TAG_RE = re.compile(r'\[(?:SCALE|POSITION|ORIENTATION|GAZE|MOTION):[^\]]*\]')
+
+
 def convert_shot_to_socialsaver(shot: Dict[str, Any], job_id: str, base_url: str = "") -> Dict[str, Any]:
     """
     将 ReTake 的 shot 格式转换为 SocialSaver 的 StoryboardShot 格式
     """
+    shot_get = shot.get
+
     # 提取 shot_number (shot_01 -> 1)
-    shot_id = shot.get("shot_id", "shot_01")
-    shot_number = int(re.search(r'\d+', shot_id).group()) if re.search(r'\d+', shot_id) else 1
+    shot_id = shot_get("shot_id", "shot_01")
+    shot_num_match = _SHOT_NUM_RE.search(shot_id)
+    shot_number = int(shot_num_match.group()) if shot_num_match else 1
 
     # 提取描述（去除摄影参数标签）
-    description = shot.get("description", "")
+    description = shot_get("description", "")
     # 去除 [SCALE: ...] [POSITION: ...] 等标签，保留纯叙事
-    visual_description = re.sub(r'\[(?:SCALE|POSITION|ORIENTATION|GAZE|MOTION):[^\]]*\]', '', description).strip()
+    visual_description = _CINEMATOGRAPHY_TAG_RE.sub('', description).strip()
 
-    # 获取摄影参数
-    cinematography = shot.get("cinematography", {})
+    # 获取摄影参数（多个输出字段共用同一取值，只查一次）
+    cine_get = shot_get("cinematography", {}).get
+    shot_type = cine_get("shot_type", "")
+    focus_and_depth = cine_get("focus_and_depth", "") or cine_get("focal_depth", "")
 
     # 获取资源路径
-    assets = shot.get("assets", {})
-    first_frame = assets.get("first_frame", "")
+    first_frame = shot_get("assets", {}).get("first_frame", "")
     if first_frame and base_url:
         first_frame = f"{base_url}/assets/{job_id}/{first_frame}"
 
@@ -90,8 +116,8 @@ def convert_shot_to_socialsaver(shot: Dict[str, Any], job_id: str, base_url: str
     # 这些可能在 storyboard.json 原始数据中
 
     # 计算时间
-    start_seconds = parse_time_to_seconds(shot.get("start_time", 0))
-    end_seconds = parse_time_to_seconds(shot.get("end_time", 0))
+    start_seconds = parse_time_to_seconds(shot_get("start_time", 0))
+    end_seconds = parse_time_to_seconds(shot_get("end_time", 0))
     duration_seconds = end_seconds - start_seconds
 
     return {
@@ -99,33 +125,33 @@ def convert_shot_to_socialsaver(shot: Dict[str, Any], job_id: str, base_url: str
         "shotId": shot_id,  # 添加 shotId 用于角色/场景匹配
         "firstFrameImage": first_frame,
         # 🎬 frame_description -> visualDescription (首帧描述)
-        "visualDescription": shot.get("frame_description", "") or visual_description,
+        "visualDescription": shot_get("frame_description", "") or visual_description,
         # 🎬 content_analysis -> contentDescription (内容分析)
-        "contentDescription": shot.get("content_analysis", visual_description),
+        "contentDescription": shot_get("content_analysis", visual_description),
         # 🎬 时间信息
         "startSeconds": start_seconds,
         "endSeconds": end_seconds,
         "durationSeconds": duration_seconds,
         # 🎬 shot_type -> shotType (镜头类型/景别)
-        "shotType": cinematography.get("shot_type", "") or cinematography.get("shot_scale", ""),
-        "shotSize": cinematography.get("shot_type", "") or cinematography.get("shot_scale", "MEDIUM"),
+        "shotType": shot_type or cine_get("shot_scale", ""),
+        "shotSize": shot_type or cine_get("shot_scale", "MEDIUM"),
         # 🎬 camera_angle (摄影机角度)
-        "cameraAngle": cinematography.get("camera_angle", "") or cinematography.get("subject_orientation", ""),
+        "cameraAngle": cine_get("camera_angle", "") or cine_get("subject_orientation", ""),
         # 🎬 camera_movement (摄影机运动)
-        "cameraMovement": cinematography.get("camera_movement", "") or cinematography.get("camera_type", "") or cinematography.get("motion_vector", ""),
+        "cameraMovement": cine_get("camera_movement", "") or cine_get("camera_type", "") or cine_get("motion_vector", ""),
         # 🎬 focus_and_depth (焦距与景深)
-        "focusAndDepth": cinematography.get("focus_and_depth", "") or cinematography.get("focal_depth", ""),
-        "focalLengthDepth": cinematography.get("focus_and_depth", "") or cinematography.get("focal_depth", ""),
+        "focusAndDepth": focus_and_depth,
+        "focalLengthDepth": focus_and_depth,
         # 🎬 lighting (光线)
-        "lighting": shot.get("lighting", "") or cinematography.get("lighting", ""),
+        "lighting": shot_get("lighting", "") or cine_get("lighting", ""),
         # 🎬 music_and_sound (音乐与音效)
-        "musicAndSound": shot.get("music_and_sound", ""),
-        "soundDesign": shot.get("sound_design", ""),
-        "music": shot.get("music_mood", ""),
+        "musicAndSound": shot_get("music_and_sound", ""),
+        "soundDesign": shot_get("sound_design", ""),
+        "music": shot_get("music_mood", ""),
         # 🎬 voiceover (对白/旁白)
-        "voiceover": shot.get("voiceover", ""),
-        "dialogueVoiceover": shot.get("dialogue_voiceover", ""),
-        "dialogueText": shot.get("dialogue_text", "")
+        "voiceover": shot_get("voiceover", ""),
+        "dialogueVoiceover": shot_get("dialogue_voiceover", ""),
+        "dialogueText": shot_get("dialogue_text", "")
     }
 
 
@@ -135,6 +161,7 @@ def convert_workflow_to_socialsaver(workflow: Dict[str, Any], base_url: str = ""
     """
     job_id = workflow.get("job_id", "")
     shots = workflow.get("shots", [])
+    stages = workflow.get("global_stages", {})
 
     storyboard = [
         convert_shot_to_socialsaver(shot, job_id, base_url)
@@ -147,10 +174,10 @@ def convert_workflow_to_socialsaver(workflow: Dict[str, Any], base_url: str = ""
         "globalStyle": workflow.get("global", {}).get("style_prompt", ""),
         "storyboard": storyboard,
         "status": {
-            "analyze": workflow.get("global_stages", {}).get("analyze", "NOT_STARTED"),
-            "stylize": workflow.get("global_stages", {}).get("stylize", "NOT_STARTED"),
-            "videoGen": workflow.get("global_stages", {}).get("video_gen", "NOT_STARTED"),
-            "merge": workflow.get("global_stages", {}).get("merge", "NOT_STARTED")
+            "analyze": stages.get("analyze", "NOT_STARTED"),
+            "stylize": stages.get("stylize", "NOT_STARTED"),
+            "videoGen": stages.get("video_gen", "NOT_STARTED"),
+            "merge": stages.get("merge", "NOT_STARTED")
         }
     }
 
@@ -166,6 +193,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+class APIGZipMiddleware(GZipMiddleware):
+    """只压缩 /api 下的 JSON 响应：/assets 的 mp4/png 已是压缩格式，SSE 流不能被缓冲"""
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "") if scope["type"] == "http" else ""
+        if path.startswith("/api/") and not path.endswith("/stream"):
+            await super().__call__(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+# 响应压缩：分镜表 / 状态轮询的 JSON 键名高度重复，gzip 后体积大幅缩小
+app.add_middleware(APIGZipMiddleware, minimum_size=1024)
+
 # 2. 初始化核心引擎
 # 创建全局 manager 实例
 manager = WorkflowManager() 
@@ -316,6 +358,42 @@ def _run_upload_analysis_background(job_id: str, video_path: Path):
         }
 
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+
+def _sendfile_to_disk(src, dest: Path) -> None:
+    """用 os.sendfile 在内核态完成文件到文件的拷贝"""
+    in_fd = src.fileno()
+    size = os.fstat(in_fd).st_size
+    with open(dest, "wb") as out:
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(out.fileno(), in_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+
+
+async def _save_upload_to_disk(file: UploadFile, dest: Path) -> None:
+    """
+    写入上传文件，读写均不阻塞事件循环
+
+    Linux 上的大文件（超过 1MB，SpooledTemporaryFile 已落盘）走 sendfile 零拷贝；
+    其他平台（macOS / BSD 的 sendfile 只支持写入 socket）、小文件或 sendfile 失败时按块写入
+    """
+    if sys.platform.startswith("linux") and (getattr(file, "size", None) or 0) > UPLOAD_CHUNK_SIZE:
+        try:
+            await asyncio.to_thread(_sendfile_to_disk, file.file, dest)
+            return
+        except OSError as e:
+            print(f"⚠️ sendfile failed, falling back to chunked copy: {e}")
+            await file.seek(0)
+
+    with open(dest, "wb") as buffer:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await asyncio.to_thread(buffer.write, chunk)
+
+
 @app.post("/api/upload")
 async def upload_video(file: UploadFile = File(...), background_tasks: BackgroundTasks = None):
     """
@@ -335,8 +413,7 @@ async def upload_video(file: UploadFile = File(...), background_tasks: Backgroun
 
         # 2. 保存视频到 job 目录
         video_path = job_dir / "input.mp4"
-        with open(video_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await _save_upload_to_disk(file, video_path)
 
         print(f"📁 [已保存] 视频已保存到: {video_path}")
 
@@ -417,10 +494,11 @@ async def get_workflow(job_id: Optional[str] = None):
     """获取最新全局状态"""
     target_id = job_id or manager.job_id
     if not target_id:
-        jobs_dir = Path("jobs")
-        if jobs_dir.exists():
-            existing_jobs = sorted([d.name for d in jobs_dir.iterdir() if d.is_dir()], reverse=True)
-            if existing_jobs: target_id = existing_jobs[0]
+        try:
+            with os.scandir("jobs") as it:
+                target_id = max((e.name for e in it if e.is_dir()), default=None)
+        except FileNotFoundError:
+            pass
     
     if not target_id:
         return {"error": "No jobs found"}
@@ -433,25 +511,23 @@ async def get_workflow(job_id: Optional[str] = None):
 @app.post("/api/agent/chat")
 async def agent_chat(req: ChatRequest):
     """Agent 全局指挥"""
-    if req.job_id: 
-        manager.job_id = req.job_id
-        manager.job_dir = Path("jobs") / req.job_id
-        
-    # 先同步磁盘数据到内存
-    wf = manager.load()
+    # 使用本请求独立的 WorkflowManager：await 期间状态轮询等请求会改写全局 manager 绑定的 job，
+    # 共享实例会把指令应用到别的 job 上。构造时同步磁盘数据到内存
+    wm = await asyncio.to_thread(WorkflowManager, req.job_id or manager.job_id)
+    wf = wm.workflow
     
     # 💡 必须包含所有分镜描述，Agent 才能找到所有主体进行替换
-    all_descriptions = []
-    for i, shot in enumerate(wf.get("shots", [])):
-        desc = shot.get("description", "")
-        if desc:
-            all_descriptions.append(f"Shot {i+1}: {desc}")
-    descriptions_text = "\n".join(all_descriptions) if all_descriptions else "No shots"
-    summary = f"Job ID: {manager.job_id}\nGlobal Style: {wf.get('global', {}).get('style_prompt')}\n\n[All Shot Descriptions]\n{descriptions_text}"
+    descriptions_text = "\n".join(
+        f"Shot {i+1}: {shot['description']}"
+        for i, shot in enumerate(wf.get("shots", []))
+        if shot.get("description")
+    ) or "No shots"
+    summary = f"Job ID: {wm.job_id}\nGlobal Style: {wf.get('global', {}).get('style_prompt')}\n\n[All Shot Descriptions]\n{descriptions_text}"
     
-    action = agent.get_action_from_text(req.message, summary)
+    # Gemini 调用耗时较长，使用异步客户端，避免阻塞其他请求（如状态轮询）
+    action = await agent.get_action_from_text_async(req.message, summary)
     if isinstance(action, list) or (isinstance(action, dict) and action.get("op") != "error"):
-        res = manager.apply_agent_action(action)
+        res = await asyncio.to_thread(wm.apply_agent_action, action)
         return {"action": action, "result": res}
     return {"action": action, "result": {"status": "error"}}
 
@@ -462,22 +538,61 @@ async def update_shot_params(req: ShotUpdateRequest):
         manager.job_id = req.job_id
         manager.job_dir = Path("jobs") / req.job_id
     
-    # 💡 核心修复：修改前必须强制加载该 job 的最新磁盘数据，防止版本覆盖
-    manager.load()
-    
     action = {
         "op": "update_shot_params",
         "shot_id": req.shot_id,
         "description": req.description
     }
-    
-    res = manager.apply_agent_action(action)
+
+    # load() 的物理文件对齐与修改本身合并为一次写盘
+    with manager.batched_save():
+        # 💡 核心修复：修改前必须强制加载该 job 的最新磁盘数据，防止版本覆盖
+        manager.load()
+        res = manager.apply_agent_action(action)
     return res
 
 # ============================================================
 # SocialSaver 专用 API 端点
 # ============================================================
 
+# job 目录存在性缓存：job_id -> 过期时间 (monotonic)
+_JOB_DIR_TTL = 5.0
+_JOB_DIR_CACHE_SIZE = 256
+_job_dir_seen: "OrderedDict[str, float]" = OrderedDict()
+
+
+def _require_job_dir(job_id: str) -> Path:
+    """返回 job 目录，不存在时抛出 404；存在的结果缓存 5 秒，减少轮询时的 stat 调用"""
+    job_dir = Path("jobs") / job_id
+    expires = _job_dir_seen.get(job_id)
+    if expires is not None:
+        if expires > time.monotonic():
+            return job_dir
+        # 过期条目直接删除，避免已删除的 job 一直留在缓存中
+        _job_dir_seen.pop(job_id, None)
+    if not job_dir.exists():
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    _job_dir_seen[job_id] = time.monotonic() + _JOB_DIR_TTL
+    # 超出上限时淘汰最早写入的条目
+    while len(_job_dir_seen) > _JOB_DIR_CACHE_SIZE:
+        _job_dir_seen.popitem(last=False)
+    return job_dir
+
+
+# 分镜表缓存：job_id -> (源文件版本, 序列化后的响应体)，按最近使用淘汰
+_STORYBOARD_CACHE_SIZE = 32
+_storyboard_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def _file_version(path: Path):
+    """文件版本标识 (mtime_ns, size)，文件不存在返回 None"""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
 @app.get("/api/job/{job_id}/storyboard")
 async def get_storyboard_socialsaver(job_id: str):
     """
@@ -485,14 +600,19 @@ async def get_storyboard_socialsaver(job_id: str):
     返回格式与 SocialSaver 前端的 StoryboardShot[] 类型兼容
 
     优先使用 Film IR 数据（两阶段分析更准确），回退到 workflow 数据
+    workflow.json / film_ir.json 未变化时直接返回缓存的响应体
     """
-    job_dir = Path("jobs") / job_id
-    if not job_dir.exists():
-        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    job_dir = _require_job_dir(job_id)
 
-    manager.job_id = job_id
-    manager.job_dir = job_dir
-    workflow = manager.load()
+    version = (_file_version(job_dir / "workflow.json"), _file_version(job_dir / "film_ir.json"))
+    cached = _storyboard_cache.get(job_id)
+    if cached and cached[0] == version:
+        _storyboard_cache.move_to_end(job_id)
+        return Response(content=cached[1], media_type="application/json")
+
+    # 使用本请求独立的 WorkflowManager，不改绑全局 manager 的 job
+    wm = WorkflowManager(job_id)
+    workflow = wm.workflow
 
     # 🎬 优先使用 Film IR 的镜头数据（更准确的两阶段分析）
     film_ir_path = job_dir / "film_ir.json"
@@ -687,7 +807,12 @@ async def get_storyboard_socialsaver(job_id: str):
     base_url = ""
 
     result = convert_workflow_to_socialsaver(workflow, base_url)
-    return result
+    body = orjson.dumps(result)
+    _storyboard_cache[job_id] = (version, body)
+    _storyboard_cache.move_to_end(job_id)
+    while len(_storyboard_cache) > _STORYBOARD_CACHE_SIZE:
+        _storyboard_cache.popitem(last=False)
+    return Response(content=body, media_type="application/json")
 
 
 @app.get("/api/job/{job_id}/shots/{shot_id}")
@@ -695,9 +820,7 @@ async def get_single_shot_socialsaver(job_id: str, shot_id: str):
     """
     获取单个分镜的 SocialSaver 格式数据
     """
-    job_dir = Path("jobs") / job_id
-    if not job_dir.exists():
-        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    job_dir = _require_job_dir(job_id)
 
     manager.job_id = job_id
     manager.job_dir = job_dir
@@ -715,19 +838,19 @@ async def get_job_status(job_id: str):
     """
     获取作业状态摘要（用于前端轮询）
     """
-    job_dir = Path("jobs") / job_id
-    if not job_dir.exists():
-        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    job_dir = _require_job_dir(job_id)
 
     manager.job_id = job_id
     manager.job_dir = job_dir
     workflow = manager.load()
 
-    shots = workflow.get("shots", [])
-    total = len(shots)
-    stylized = sum(1 for s in shots if s.get("status", {}).get("stylize") == "SUCCESS")
-    video_done = sum(1 for s in shots if s.get("status", {}).get("video_generate") == "SUCCESS")
-    running = sum(1 for s in shots if s.get("status", {}).get("stylize") == "RUNNING" or s.get("status", {}).get("video_generate") == "RUNNING")
+    # 每次读取时现场统计：workflow.json 也会被 apply_changes.py / run_workflow.py 等脚本直接改写，
+    # 落盘的统计值可能过期
+    progress = compute_progress(workflow)
+    total = progress["total"]
+    stylized = progress["stylized"]
+    video_done = progress["video_done"]
+    running = progress["running"]
 
     return {
         "jobId": job_id,
@@ -737,24 +860,36 @@ async def get_job_status(job_id: str):
         "runningCount": running,
         "canMerge": video_done == total and total > 0,
         "globalStages": workflow.get("global_stages", {}),
-        "globalStyle": workflow.get("global", {}).get("style_prompt", "")
+        "globalStyle": workflow.get("global", {}).get("style_prompt", ""),
+        "mergeOutput": workflow.get("merge_output")
     }
 
 
+def _run_merge_background(job_id: str):
+    """后台执行视频合并，结果写入 global_stages.merge"""
+    wm = WorkflowManager(job_id)
+    try:
+        wm.merge_videos()
+        print(f"✅ [Merge] {job_id} 合并完成")
+    except Exception as e:
+        print(f"❌ [Merge] {job_id} 合并失败: {e}")
+        wm.workflow.setdefault("global_stages", {})["merge"] = "FAILED"
+        wm.workflow.pop("merge_started_at", None)
+        wm.save()
+
+
 @app.post("/api/run/{node_type}")
 async def run_task(node_type: str, background_tasks: BackgroundTasks, shot_id: Optional[str] = None, job_id: Optional[str] = None):
     if job_id:
+        manager.job_dir = _require_job_dir(job_id)
         manager.job_id = job_id
-        manager.job_dir = Path("jobs") / job_id
 
-    # 处理合并导出逻辑
+    # 处理合并导出逻辑：ffmpeg 合并耗时较长，放到后台执行，前端轮询 /status 的 globalStages.merge
     if node_type == "merge":
         manager.load()
-        try:
-            result_file = manager.merge_videos()
-            return {"status": "success", "file": result_file, "job_id": manager.job_id}
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+        manager.start_merge()
+        background_tasks.add_task(_run_merge_background, manager.job_id)
+        return {"status": "started", "job_id": manager.job_id}
 
     if node_type not in ["stylize", "video_generate"]:
         raise HTTPException(status_code=400, detail="Invalid node type")
@@ -3598,7 +3733,8 @@ def run_entity_generation_background(
     try:
         from core.asset_generator import AssetGenerator
 
-        generator = AssetGenerator(job_id, ".")
+        # 用户主动触发的生成（补全缺失视图 / force 重新生成）：不复用结果缓存，每次都产出新图
+        generator = AssetGenerator(job_id, ".", use_cache=False)
 
         # 重新从 film_ir.json 读取最新的实体信息（确保使用最新的描述）
         ir_manager = FilmIRManager(job_id)
@@ -4568,7 +4704,7 @@ def run_product_generation_background(job_id: str, product_id: str, description:
     """
     后台任务：生成产品三视图
     """
-    from core.asset_generator import generate_product_views_with_imagen
+    from core.asset_generator import AssetGenerator, generate_product_views_with_imagen
 
     job_dir = Path("jobs") / job_id
     three_views_dir = job_dir / "three_views" / product_id
@@ -4588,10 +4724,11 @@ def run_product_generation_background(job_id: str, product_id: str, description:
 
         product_idx = next((i for i, p in enumerate(products) if p.get("anchorId") == product_id), None)
         if product_idx is not None:
+            ext = AssetGenerator.ASSET_EXT
             products[product_idx]["threeViews"] = {
-                "front": f"three_views/{product_id}/front.png" if results.get("front") else None,
-                "side": f"three_views/{product_id}/side.png" if results.get("side") else None,
-                "back": f"three_views/{product_id}/back.png" if results.get("back") else None
+                "front": f"three_views/{product_id}/front{ext}" if results.get("front") else None,
+                "side": f"three_views/{product_id}/side{ext}" if results.get("side") else None,
+                "back": f"three_views/{product_id}/back{ext}" if results.get("back") else None
             }
             products[product_idx]["status"] = "SUCCESS"
             ir_manager.save()
@@ -4695,21 +4832,9 @@ async def retry_shot_analysis(job_id: str, request: RetryBatchRequest = None):
     if not video_path.exists():
         raise HTTPException(status_code=400, detail="Video file not found for retry")
 
-    # 初始化 Gemini client
-    from core.utils import gemini_keys
-    api_key = gemini_keys.get()
-
-    client = genai.Client(api_key=api_key)
-
-    # 上传视频
+    # 上传视频（Stage 1 已上传且仍有效时直接复用）
     try:
-        import time
-        uploaded_file = client.files.upload(file=str(video_path))
-        while uploaded_file.state.name == "PROCESSING":
-            time.sleep(3)
-            uploaded_file = client.files.get(name=uploaded_file.name)
-        if uploaded_file.state.name != "ACTIVE":
-            raise HTTPException(status_code=500, detail="Video processing failed")
+        uploaded_file, client = ir_manager._upload_video_to_gemini(video_path)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Video upload failed: {e}")
 
@@ -5084,20 +5209,33 @@ async def get_agent_status(job_id: str):
     }
 
 
-# --- 核心：防缓存中间件 ---
-@app.middleware("http")
-async def add_no_cache_header(request, call_next):
-    response = await call_next(request)
-    if request.url.path.startswith("/assets"):
-        response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
-        response.headers["Pragma"] = "no-cache"
-        response.headers["Expires"] = "0"
-    return response
+# --- 核心：资源协商缓存 ---
+class RevalidatingStaticFiles(StaticFiles):
+    """
+    产物（定妆图、分镜视频）会在同一路径被重新生成，不能设置 max-age 强缓存。
+    使用 no-cache 让浏览器每次带 If-None-Match 回源校验：StaticFiles 基于
+    mtime + size 生成 ETag，未变化时直接返回 304，不再重复传输文件。
+    """
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
 
 # 挂载静态资源目录
-app.mount("/assets", StaticFiles(directory="jobs", check_dir=False), name="assets")
+app.mount("/assets", RevalidatingStaticFiles(directory="jobs", check_dir=False), name="assets")
 
 if __name__ == "__main__":
     import uvicorn
     # 启动服务
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # 上传/清洁进度、Agent 状态和 SSE 事件总线都保存在进程内存中，
+    # 多 worker 时轮询会落到别的进程，因此默认单 worker；确需扩容时设置 WEB_CONCURRENCY
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run(
+        # 单 worker 直接传入当前 app 对象：导入字符串会让 uvicorn 再导入一次 app.py，
+        # 重复创建 AgentEngine、SQLite 连接和 WorkflowManager；多 worker 时子进程只能按导入字符串加载
+        app if workers == 1 else "app:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+    )
\ No newline at end of file
@@ -1,4 +1,5 @@
-import json
+import os
+import orjson
 import argparse
 from pathlib import Path
 
@@ -6,10 +7,13 @@ PROJECT_DIR = Path(__file__).parent
 DEFAULT_JOB_ID = "demo_job_001"
 
 def load_workflow(job_dir: Path) -> dict:
-    return json.loads((job_dir / "workflow.json").read_text(encoding="utf-8"))
+    return orjson.loads((job_dir / "workflow.json").read_bytes())
 
 def save_workflow(job_dir: Path, wf: dict) -> None:
-    (job_dir / "workflow.json").write_text(json.dumps(wf, ensure_ascii=False, indent=2), encoding="utf-8")
+    wf_path = job_dir / "workflow.json"
+    tmp_path = wf_path.with_suffix(".json.tmp")
+    tmp_path.write_bytes(orjson.dumps(wf, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    os.replace(tmp_path, wf_path)
 
 def apply_global_style(wf: dict, new_style_prompt: str, cascade: bool = True) -> int:
     """
@@ -62,10 +66,11 @@ def main():
 
     job_dir = PROJECT_DIR / "jobs" / args.job_id
     wf = load_workflow(job_dir)
+    changed = False
 
     if args.set_global_style is not None:
         affected = apply_global_style(wf, args.set_global_style, cascade=(not args.no_cascade))
-        save_workflow(job_dir, wf)
+        changed = True
         print(f"✅ 已更新 global.style_prompt")
         print(f"✅ 受影响 shots：{affected}（stylize/video_generate 已标记为 NOT_STARTED）")
     else:
@@ -74,10 +79,13 @@ def main():
     
     if args.replace_entity and args.new_ref:
         affected = replace_entity_reference(wf, args.replace_entity, args.new_ref)
-        save_workflow(job_dir, wf)
+        changed = True
         print(f"✅ 已替换 {args.replace_entity} 的 reference_image -> {args.new_ref}")
         print(f"✅ 受影响 shots：{affected}（stylize/video_generate 已标记为 NOT_STARTED）")
-        return
+
+    # 所有修改完成后只写盘一次
+    if changed:
+        save_workflow(job_dir, wf)
 
 if __name__ == "__main__":
     main()
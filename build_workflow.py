@@ -1,4 +1,5 @@
-import json
+import os
+import orjson
 from pathlib import Path
 
 PROJECT_DIR = Path(__file__).parent
@@ -36,8 +37,17 @@ def to_seconds(t):
         return parts[0]
     return None
 
+def list_dir_names(path: Path) -> set:
+    try:
+        return set(os.listdir(path))
+    except FileNotFoundError:
+        return set()
+
 def main():
-    storyboard = json.loads(STORYBOARD_PATH.read_text(encoding="utf-8"))
+    storyboard = orjson.loads(STORYBOARD_PATH.read_bytes())
+    # 一次读取目录，避免每个 shot 两次 stat
+    frame_names = list_dir_names(FRAMES_DIR)
+    stylized_names = list_dir_names(STYLIZED_DIR)
 
     shots = []
     for s in storyboard:
@@ -60,8 +70,8 @@ def main():
             "description": desc,
             "voiceover": s.get("voiceover"),
             "assets": {
-                "first_frame": frame_path if (JOB_DIR / frame_path).exists() else None,
-                "stylized_frame": stylized_path if (JOB_DIR / stylized_path).exists() else None,
+                "first_frame": frame_path if f"{sid}.png" in frame_names else None,
+                "stylized_frame": stylized_path if f"{sid}.png" in stylized_names else None,
                 "video": None
             },
             "status": {
@@ -83,7 +93,7 @@ def main():
         "shots": shots
     }
 
-    WORKFLOW_PATH.write_text(json.dumps(workflow, ensure_ascii=False, indent=2), encoding="utf-8")
+    WORKFLOW_PATH.write_bytes(orjson.dumps(workflow, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     print(f"✅ workflow.json 已生成：{WORKFLOW_PATH}")
     print(f"shots 数量：{len(shots)}")
 
@@ -1,131 +1,463 @@
 # core/agent_engine.py
 import os
-import json
+import asyncio
+import difflib
+import hashlib
+import orjson
 import re
+import sqlite3
+import threading
+import time
+import httpx
 from google import genai
-from google.genai import types # 💡 引入类型定义
-from typing import Dict, Any, List, Union
+from google.genai import errors, types # 💡 引入类型定义
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Literal, Optional, Tuple, Union
+from pydantic import BaseModel, Field
+
+# 静态指令在导入时构建一次，固定放在提示词最前面，便于命中 Gemini 的隐式前缀缓存。
+# 单独的指令块低于显式上下文缓存的最小 token 数，只在长摘要时随摘要一起显式缓存
+_STATIC_DIRECTIVES = """你是专业的视频导演助理，根据用户需求生成工作流修改指令列表，每个意图对应一条指令。
+
+[全局规则]
+- 摄影参数保真（最高优先级）：分镜描述中的 [SCALE] 景别、[POSITION] 主体位置、[ORIENTATION] 朝向、[GAZE] 视线、[MOTION] 运动矢量标签，除非用户明确要求修改，否则必须保持不变；系统会在风格修改、主体替换、描述增强时自动保留。
+- 画幅固定为 16:9 宽屏，由系统强制；禁止任何 1:1 或竖屏构图描述。
+- 角色身份锚定：用户定义的具体角色描述会被系统原样传播到所有含人物的分镜；纯风景、空场景、建筑内景、物体特写、无人物过渡镜头会被自动跳过。
+
+[指令]
+1. set_global_style(value)：value 为 2-4 个英文单词的风格关键词，如 "Cyberpunk Neon"、"Studio Ghibli Anime"、"Film Noir Cinematic"；禁止 "Total transformation into ..."、"Hyper-stylized in ..."、"Complete overhaul" 等填充句式，无需指定画幅。
+2. global_subject_swap(old_subject, new_subject)：无属性描述的简单替换（如"把男人换成女人"）。"把 A 换成 B" 中 A 为 old，B 为 new；old_subject 必须是摘要 Shot Descriptions 中真实存在的英文词（用户说"男人"而摘要为 "man" 则用 "man"；"小孩" 译为 "child"）。
+3. detailed_subject_swap(old_subject, new_subject, attributes)：用户给出视觉描述时使用（如"把男人换成一个金色短发、穿红衣服的女人"）；attributes 只填写用户明确提到的属性。
+4. enhance_shot_description(shot_id, spatial_info, style_boost)：spatial_info 使用 16:9 宽屏构图表述，如 "subject positioned on the left side of the 16:9 widescreen frame"。
+5. update_cinematography(shot_id, param, value)：仅当用户明确要求修改摄影参数（如"把镜头改成特写"、"让人物转向左边"）时使用；param 取 shot_scale / subject_frame_position / subject_orientation / gaze_direction / motion_vector。
+"""
+
+
+# 结构化输出 schema：由 Gemini 受约束解码保证输出为合法的指令列表，
+# 无需在提示词中反复强调 JSON 格式
+class SubjectAttributes(BaseModel):
+    hair_style: Optional[str] = Field(None, description="short/long/curly/straight/bald/ponytail...")
+    hair_color: Optional[str] = Field(None, description="golden/black/brown/silver/red/blonde...")
+    eye_color: Optional[str] = Field(None, description="blue/green/brown/hazel...")
+    skin_tone: Optional[str] = Field(None, description="fair/tan/dark/pale...")
+    age_descriptor: Optional[str] = Field(None, description="young/elderly/middle-aged/child...")
+    clothing: Optional[str] = Field(None, description="red dress/black suit/white shirt...")
+    accessories: Optional[str] = Field(None, description="glasses/hat/necklace/earrings...")
+    body_type: Optional[str] = Field(None, description="slim/muscular/petite/tall...")
+    facial_features: Optional[str] = Field(None, description="beard/freckles/scar/dimples...")
+    other_visual: Optional[str] = Field(None, description="其他视觉特征")
+
+
+class AgentAction(BaseModel):
+    op: Literal[
+        "set_global_style",
+        "global_subject_swap",
+        "detailed_subject_swap",
+        "enhance_shot_description",
+        "update_cinematography",
+    ]
+    value: Optional[str] = Field(None, description="set_global_style 的风格关键词，或 update_cinematography 的新值")
+    old_subject: Optional[str] = Field(None, description="摘要中真实存在的英文原主体词")
+    new_subject: Optional[str] = Field(None, description="英文新主体词")
+    attributes: Optional[SubjectAttributes] = Field(None, description="仅 detailed_subject_swap：用户明确提到的视觉属性")
+    shot_id: Optional[str] = Field(None, description="分镜 ID，如 shot_01")
+    spatial_info: Optional[str] = Field(None, description="enhance_shot_description 的空间位置描述")
+    style_boost: Optional[str] = Field(None, description="enhance_shot_description 的风格强化描述")
+    param: Optional[str] = Field(None, description="update_cinematography 的参数名")
+
+
+# 提示词与输出 schema 的指纹：静态指令或 schema 修改后，旧的决策缓存自然失效
+_PROMPT_DIGEST = hashlib.blake2b(
+    _STATIC_DIRECTIVES.encode("utf-8")
+    + orjson.dumps(AgentAction.model_json_schema(), option=orjson.OPT_SORT_KEYS),
+    digest_size=16,
+).hexdigest()
+
+
+_VALID_OPS = frozenset({
+    "set_global_style",
+    "global_subject_swap",
+    "detailed_subject_swap",
+    "enhance_shot_description",
+    "update_cinematography",
+})
+
+
+def _is_valid_actions(res_json: Any) -> bool:
+    """快速模型的输出必须是非空的合法指令列表，否则升级到主模型重试"""
+    return (
+        isinstance(res_json, list)
+        and bool(res_json)
+        and all(isinstance(a, dict) and a.get("op") in _VALID_OPS for a in res_json)
+    )
+
+
+def _is_transient_error(e: Exception) -> bool:
+    """限流、服务端错误、超时 / 网络错误可稍后重试；其余 4xx（如模型不支持缓存、内容低于最小 token 数）为永久错误"""
+    if isinstance(e, errors.APIError):
+        return e.code in (408, 429) or e.code >= 500
+    return isinstance(e, (httpx.TransportError, TimeoutError, ConnectionError))
+
+
+def _drop_nulls(obj: Any) -> Any:
+    """去掉 schema 中未填写的可选字段，保持与旧版自由 JSON 输出一致的 dict 形状"""
+    if isinstance(obj, dict):
+        return {k: _drop_nulls(v) for k, v in obj.items() if v is not None}
+    if isinstance(obj, list):
+        return [_drop_nulls(v) for v in obj]
+    return obj
+
+
+_SUMMARY_HEADER = "[当前工作流状态摘要]\n"
+
+# set_global_style 的填充句式（模型偶尔仍会输出），解析后剥离
+_STYLE_FILLER_RE = re.compile(
+    r'\b(?:Total transformation|Hyper-stylized|Complete overhaul)\b(?:\s+(?:into|in|to)\b)?[\s,:-]*',
+    re.IGNORECASE,
+)
+
+_CACHE_TTL = "3600s"
+
+# 摘要较长时连同静态指令一起缓存；摘要变化较小时只发送相对缓存版本的增量
+_SUMMARY_CACHE_MIN_CHARS = 8000
+_SUMMARY_DELTA_MAX_RATIO = 0.5
+# 同时保留的摘要缓存数；淘汰只丢弃本地引用，远端缓存由 TTL 自然过期，
+# 不主动删除（其它并发请求可能仍在引用）
+_SUMMARY_CACHE_SLOTS = 4
+# 创建缓存遇到限流 / 服务端错误 / 超时等临时故障时暂停重试，间隔按连续失败次数翻倍
+_SUMMARY_CACHE_RETRY_S = 60
+_SUMMARY_CACHE_RETRY_MAX_S = 900
+_DELTA_HEADER = "[摘要增量]（相对上方摘要的 unified diff，- 为删除行，+ 为新增行）\n"
+
+# 简短的主体替换指令先交给轻量模型，超时或输出不合法时再升级到主模型
+_FAST_MODEL_ID = "gemini-2.0-flash-lite"
+_FAST_TIMEOUT_MS = 2000
+_FAST_PATH_MAX_LEN = 40
+_FAST_PATH_RE = re.compile(r'换成|替换|replace', re.IGNORECASE)
+
+# 同一摘要下重复的指令直接复用上次的决策，不再请求模型
+_DECISION_CACHE_SIZE = 512
+
+# 决策缓存落盘（SQLite WAL），进程重启后相同指令仍可命中
+_DISK_CACHE_PATH = Path(os.getenv("AGENT_CACHE_DB", str(Path(__file__).parent.parent / "agent_cache.db")))
+_DISK_CACHE_TTL = 7 * 24 * 3600  # 秒
+
+# 长连接池 + HTTP/2：并发请求复用同一连接，避免每次调用重新握手 TCP/TLS
+_HTTP_CLIENT_ARGS = {
+    "http2": True,
+    "limits": httpx.Limits(max_keepalive_connections=40, max_connections=100, keepalive_expiry=30.0),
+}
+
+
+def _open_decision_db(path: Path) -> Optional[sqlite3.Connection]:
+    """打开决策缓存库并清理过期记录；失败时返回 None（仅使用内存缓存）"""
+    try:
+        db = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("CREATE TABLE IF NOT EXISTS cache(k BLOB PRIMARY KEY, v BLOB, ts INTEGER)")
+        db.execute("DELETE FROM cache WHERE ts < ?", (int(time.time()) - _DISK_CACHE_TTL,))
+        return db
+    except sqlite3.Error as e:
+        print(f"⚠️ Agent 决策缓存库不可用，仅使用内存缓存: {e}")
+        return None
+
 
 class AgentEngine:
     def __init__(self):
         from .utils import gemini_keys
         api_key = gemini_keys.get()
-        self.client = genai.Client(api_key=api_key)
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                timeout=300_000,  # ms
+                client_args=_HTTP_CLIENT_ARGS,
+                async_client_args=_HTTP_CLIENT_ARGS,
+            ),
+        )
         self.model_id = "gemini-3-flash-preview" 
+        self.fast_model_id = _FAST_MODEL_ID
+        self._summary_caches: "OrderedDict[bytes, Tuple[str, str]]" = OrderedDict()  # 摘要 digest -> (摘要, 缓存名)
+        self._summary_lock = threading.Lock()
+        self._summary_cache_disabled = False  # 永久错误（模型不支持缓存、内容低于最小 token 数等）后不再尝试
+        self._summary_cache_retry_at = 0.0  # 临时错误后的下次重试时间 (monotonic)
+        self._summary_cache_failures = 0
+        self._decisions: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self._db = _open_decision_db(_DISK_CACHE_PATH)
+        self._db_lock = threading.Lock()
 
-    def get_action_from_text(self, user_input: str, workflow_summary: str) -> Union[Dict, List]:
-        system_prompt = f"""
-你是一个专业的视频导演助理。你必须根据用户需求生成工作流修改指令。
-
-[当前工作流状态摘要]
-{workflow_summary}
-
-🎬 [摄影参数保真原则 - CINEMATOGRAPHY FIDELITY - 最高优先级]
-每个分镜都有从源视频中提取的摄影参数（标签形式存储在描述中），这些参数必须被保护：
-- [SCALE: ...] - 景别（WIDE/MEDIUM/CLOSE_UP等）
-- [POSITION: ...] - 主体在画面中的位置坐标
-- [ORIENTATION: ...] - 主体身体朝向
-- [GAZE: ...] - 主体视线方向
-- [MOTION: ...] - 运动矢量
-
-⚠️ 除非用户明确要求修改这些摄影参数，否则任何操作都必须保留它们不变！
-- 风格修改：只改变艺术风格，不改变摄影参数
-- 主体替换：只替换主体名词，保留所有摄影参数标签
-- 描述增强：只添加新内容，不删除或修改现有摄影参数标签
-
-[指令逻辑规范 - 极其重要]
-1. 修改全局风格: {{"op": "set_global_style", "value": "风格关键词"}}
-   - 🎨 风格输出格式：value 字段必须是简洁的风格关键词，禁止使用冗长句子
-     * ✅ 正确: "Cyberpunk Neon"
-     * ✅ 正确: "Studio Ghibli Anime"
-     * ✅ 正确: "Film Noir Cinematic"
-     * ✅ 正确: "Watercolor Impressionist"
-     * ❌ 错误: "Total transformation into Cyberpunk Neon style"（禁止使用填充词）
-     * ❌ 错误: "Hyper-stylized in Studio Ghibli anime aesthetic"（禁止冗长描述）
-   - 📐 画幅约束由系统自动强制 16:9，无需在 value 中指定
-   - 🎬 摄影保真：风格修改不会影响摄影参数，系统会自动保留
-
-🆔 [全局身份锚定 - GLOBAL IDENTITY ANCHOR - 角色一致性原则]
-当用户定义一个具体角色（如"金色短发的女人"），该描述将成为全局身份锚定(Global Identity Anchor)。
-- ✅ 系统会自动将完全相同的角色描述传播到所有相关分镜，确保视觉一致性
-- ✅ 角色特征（发型、发色、服装等）在所有主角镜头中保持100%一致
-- ⚠️ 智能场景检测：系统会自动跳过以下类型的分镜（不注入角色）：
-  * 纯风景/环境镜头（landscape, cityscape, nature scene）
-  * 空场景/建筑内景（empty room, establishing shot）
-  * 物体特写（object close-up, food, vehicle）
-  * 无人物的过渡镜头
-
-2. 全局主体替换（简单）: {{"op": "global_subject_swap", "old_subject": "英文原词", "new_subject": "英文新词"}}
-   - 方向逻辑："把 A 换成 B"意味着 A 是旧的(old)，B 是新的(new)。
-   - 匹配要求：你必须观察 [摘要] 中的 Shot Descriptions，找出其中真正存在的英文单词作为 "old_subject"。
-   - 翻译要求：如果用户说"男人"，而摘要里是 "man"，请使用 "man"；如果用户说"小孩"，请翻译为 "child"。
-   - 🎬 摄影保真：主体替换时，所有摄影参数标签会被自动保留（位置、朝向、视线、动作不变）
-   - 🆔 身份锚定：系统自动处理，风景/空镜头会被智能跳过
-   - ⚠️ 仅用于无属性描述的简单替换（如"把男人换成女人"）
-
-2b. 🎨 细粒度角色替换（带视觉属性）: {{"op": "detailed_subject_swap", "old_subject": "英文原词", "new_subject": "英文新主体", "attributes": {{...}}}}
-   - 🔍 触发条件：当用户提供详细的视觉描述时使用此操作，例如：
-     * "把男人换成一个金色短发、穿红衣服的女人"
-     * "Replace the man with a young woman with blue eyes and silver hair"
-     * "把小孩换成一个戴眼镜的老人"
-   - 📝 attributes 对象必须提取所有视觉描述符（只填写用户明确提到的）：
-     {{
-       "hair_style": "short/long/curly/straight/bald/ponytail...",
-       "hair_color": "golden/black/brown/silver/red/blonde...",
-       "eye_color": "blue/green/brown/hazel...",
-       "skin_tone": "fair/tan/dark/pale...",
-       "age_descriptor": "young/elderly/middle-aged/child...",
-       "clothing": "red dress/black suit/white shirt/casual attire...",
-       "accessories": "glasses/hat/necklace/earrings...",
-       "body_type": "slim/muscular/petite/tall...",
-       "facial_features": "beard/freckles/scar/dimples...",
-       "other_visual": "任何其他视觉特征..."
-     }}
-   - ⚠️ 只填写用户明确提到的属性，未提及的属性不要添加
-   - 🎬 摄影保真：所有视觉属性将被注入叙事层，但摄影参数标签保持不变
-   - 🆔 身份锚定：角色描述将作为Global Identity Anchor存储，并传播到所有主角分镜
-   - 🏞️ 场景保护：风景/空镜头自动跳过，保持原始语义意图
-
-3. 增强分镜描述: {{"op": "enhance_shot_description", "shot_id": "shot_XX", "spatial_info": "空间位置描述", "style_boost": "风格强化描述"}}
-   - 📐 空间感知（必须保持 16:9 宽屏构图）：
-     * "subject positioned on the left side of the 16:9 widescreen frame"
-     * "character facing right in cinematic widescreen composition"
-     * "object in the foreground, widescreen depth of field"
-     * "centered composition with 16:9 cinematic framing"
-   - ⚠️ 严禁任何 1:1 正方形或竖屏构图描述
-   - 🎬 摄影保真：增强描述时，现有的摄影参数标签会被自动保留
-
-4. 修改摄影参数（仅当用户明确要求时使用）: {{"op": "update_cinematography", "shot_id": "shot_XX", "param": "参数名", "value": "新值"}}
-   - 参数名可以是: "shot_scale", "subject_frame_position", "subject_orientation", "gaze_direction", "motion_vector"
-   - ⚠️ 只有当用户明确说"把镜头改成特写"、"让人物转向左边"等明确修改摄影参数的指令时才使用此操作
-
-[输出要求]
-- 必须识别用户的所有意图。
-- 必须返回一个包含指令对象的 JSON 列表 []，即使只有一条指令也要放在列表里。
-- 严禁输出任何解释性文字，只输出纯 JSON 字符串。
-- set_global_style 的 value 必须是 2-4 个单词的简洁风格关键词，禁止使用 "Total transformation"、"Hyper-stylized"、"Complete overhaul" 等填充句式。
-- 默认保护摄影参数，除非用户明确要求修改。
-"""
+    def _request_kwargs(self, contents: List[str], cache_name: Optional[str]) -> Dict[str, Any]:
+        """构建 generate_content 参数（强制 JSON 模式）；不走摘要缓存时静态指令随请求发送"""
+        if cache_name:
+            return {
+                "model": self.model_id,
+                "contents": contents,
+                "config": types.GenerateContentConfig(
+                    response_mime_type='application/json',
+                    response_schema=list[AgentAction],
+                    cached_content=cache_name,
+                ),
+            }
+        return {
+            "model": self.model_id,
+            "contents": [_STATIC_DIRECTIVES, *contents],
+            "config": types.GenerateContentConfig(
+                response_mime_type='application/json',
+                response_schema=list[AgentAction],
+            ),
+        }
+
+    def _create_summary_cache(self, workflow_summary: str) -> Optional[str]:
         try:
-            # 💡 强制 JSON 模式，确保输出结构稳定
-            response = self.client.models.generate_content(
+            cache = self.client.caches.create(
                 model=self.model_id,
-                contents=[system_prompt, f"用户指令: {user_input}"],
-                config=types.GenerateContentConfig(
-                    response_mime_type='application/json',
+                config=types.CreateCachedContentConfig(
+                    contents=[_STATIC_DIRECTIVES, _SUMMARY_HEADER, workflow_summary],
+                    ttl=_CACHE_TTL,
                 )
             )
-            
-            # 自动解析 JSON 字符串
-            res_json = json.loads(response.text)
-            
-            # 调试日志：在终端打印 Agent 的决策逻辑
-            print(f"🤖 Agent 决策指令集: {res_json}")
-            
+        except Exception as e:
+            if _is_transient_error(e):
+                self._summary_cache_failures += 1
+                delay = min(_SUMMARY_CACHE_RETRY_S * 2 ** (self._summary_cache_failures - 1), _SUMMARY_CACHE_RETRY_MAX_S)
+                self._summary_cache_retry_at = time.monotonic() + delay
+                print(f"⚠️ Agent 摘要缓存创建失败，{delay}s 后重试，期间随请求发送: {e}")
+            else:
+                self._summary_cache_disabled = True
+                print(f"⚠️ Agent 摘要缓存创建失败，改为随请求发送: {e}")
+            return None
+        self._summary_cache_failures = 0
+        print(f"🗄️ Agent 工作流摘要已缓存: {cache.name}")
+        return cache.name
+
+    def _summary_request(self, user_input: str, workflow_summary: str) -> Optional[Tuple[List[str], str]]:
+        """
+        长摘要走摘要缓存，返回 (contents, 缓存名)；不适用时返回 None
+
+        - 摘要已缓存：只发送用户指令
+        - 相对最近缓存的摘要小幅变化：发送行级增量
+        - 首次调用或增量超过摘要一半：新建缓存
+        """
+        if self._summary_cache_disabled or len(workflow_summary) < _SUMMARY_CACHE_MIN_CHARS:
+            return None
+        digest = hashlib.blake2b(workflow_summary.encode("utf-8"), digest_size=16).digest()
+        user_line = f"用户指令: {user_input}"
+        with self._summary_lock:
+            hit = self._summary_caches.get(digest)
+            if hit is not None:
+                self._summary_caches.move_to_end(digest)
+                return [user_line], hit[1]
+            latest = next(reversed(self._summary_caches.values()), None)
+        if latest is not None:
+            base, cache_name = latest
+            delta = "\n".join(difflib.unified_diff(
+                base.splitlines(), workflow_summary.splitlines(), lineterm="", n=0
+            ))
+            if len(delta) <= len(workflow_summary) * _SUMMARY_DELTA_MAX_RATIO:
+                return [_DELTA_HEADER, delta, user_line], cache_name
+        if time.monotonic() < self._summary_cache_retry_at:
+            return None  # 临时错误的退避期内不新建缓存，已有缓存照常使用
+        cache_name = self._create_summary_cache(workflow_summary)
+        if cache_name is None:
+            return None
+        with self._summary_lock:
+            self._summary_caches[digest] = (workflow_summary, cache_name)
+            self._summary_caches.move_to_end(digest)
+            while len(self._summary_caches) > _SUMMARY_CACHE_SLOTS:
+                self._summary_caches.popitem(last=False)
+        return [user_line], cache_name
+
+    def _drop_expired_summary(self, e: Exception, cache_name: str) -> bool:
+        if getattr(e, "code", None) != 404 and "NOT_FOUND" not in str(e):
+            return False
+        print(f"⚠️ Agent 摘要缓存已失效，将重建: {cache_name}")
+        with self._summary_lock:
+            for digest, (_, name) in list(self._summary_caches.items()):
+                if name == cache_name:
+                    del self._summary_caches[digest]
+        return True
+
+    def _generate(self, user_input: str, workflow_summary: str):
+        """调用 Gemini，长摘要优先引用摘要缓存"""
+        summary_req = self._summary_request(user_input, workflow_summary)
+        if summary_req:
+            contents, cache_name = summary_req
+            try:
+                return self.client.models.generate_content(**self._request_kwargs(contents, cache_name))
+            except Exception as e:
+                if not self._drop_expired_summary(e, cache_name):
+                    raise
+        contents = self._build_contents(user_input, workflow_summary)
+        return self.client.models.generate_content(**self._request_kwargs(contents, None))
+
+    async def _generate_async(self, user_input: str, workflow_summary: str):
+        """_generate 的异步版本，使用 client.aio，不占用事件循环"""
+        summary_req = None
+        if not self._summary_cache_disabled and len(workflow_summary) >= _SUMMARY_CACHE_MIN_CHARS:
+            # 计算增量 / 创建缓存是阻塞操作，放到线程中执行
+            summary_req = await asyncio.to_thread(self._summary_request, user_input, workflow_summary)
+        if summary_req:
+            contents, cache_name = summary_req
+            try:
+                return await self.client.aio.models.generate_content(**self._request_kwargs(contents, cache_name))
+            except Exception as e:
+                if not self._drop_expired_summary(e, cache_name):
+                    raise
+        contents = self._build_contents(user_input, workflow_summary)
+        return await self.client.aio.models.generate_content(**self._request_kwargs(contents, None))
+
+    def _fast_kwargs(self, contents: List[str]) -> Dict[str, Any]:
+        """轻量模型请求参数：摘要缓存按模型区分，静态指令随请求发送"""
+        return {
+            "model": self.fast_model_id,
+            "contents": [_STATIC_DIRECTIVES, *contents],
+            "config": types.GenerateContentConfig(
+                response_mime_type='application/json',
+                response_schema=list[AgentAction],
+                http_options=types.HttpOptions(timeout=_FAST_TIMEOUT_MS),
+            ),
+        }
+
+    @staticmethod
+    def _use_fast_path(user_input: str) -> bool:
+        return len(user_input) < _FAST_PATH_MAX_LEN and _FAST_PATH_RE.search(user_input) is not None
+
+    def _check_fast_result(self, res_json: Any) -> Optional[List]:
+        if _is_valid_actions(res_json):
             return res_json
-            
+        print(f"⚠️ 轻量模型输出不合法，升级到 {self.model_id}")
+        return None
+
+    def _try_fast(self, contents: List[str]) -> Optional[List]:
+        try:
+            response = self.client.models.generate_content(**self._fast_kwargs(contents))
+            return self._check_fast_result(self._parse_response(response))
+        except Exception as e:
+            print(f"⚠️ 轻量模型调用失败，升级到 {self.model_id}: {e}")
+            return None
+
+    async def _try_fast_async(self, contents: List[str]) -> Optional[List]:
+        try:
+            response = await self.client.aio.models.generate_content(**self._fast_kwargs(contents))
+            return self._check_fast_result(self._parse_response(response))
         except Exception as e:
-            print(f"❌ Agent 决策过程出现异常: {str(e)}")
-            if 'response' in locals() and hasattr(response, 'candidates'):
-                print(f"🔍 调试信息 - 停止原因: {response.candidates[0].finish_reason}")
-            return {"op": "error", "reason": str(e)}
\ No newline at end of file
+            print(f"⚠️ 轻量模型调用失败，升级到 {self.model_id}: {e}")
+            return None
+
+    @staticmethod
+    def _build_contents(user_input: str, workflow_summary: str) -> List[str]:
+        return [_SUMMARY_HEADER, workflow_summary, f"用户指令: {user_input}"]
+
+    @staticmethod
+    def _parse_response(response) -> Union[Dict, List]:
+        # 自动解析 JSON 字符串
+        res_json = _drop_nulls(orjson.loads(response.text))
+        for act in (res_json if isinstance(res_json, list) else [res_json]):
+            if isinstance(act, dict) and act.get("op") == "set_global_style":
+                value = act.get("value")
+                if isinstance(value, str):
+                    act["value"] = _STYLE_FILLER_RE.sub("", value).strip() or value
+
+        # 调试日志：在终端打印 Agent 的决策逻辑
+        print(f"🤖 Agent 决策指令集: {res_json}")
+
+        return res_json
+
+    @staticmethod
+    def _error_result(e: Exception, response) -> Dict[str, Any]:
+        print(f"❌ Agent 决策过程出现异常: {str(e)}")
+        if response is not None and hasattr(response, 'candidates'):
+            print(f"🔍 调试信息 - 停止原因: {response.candidates[0].finish_reason}")
+        return {"op": "error", "reason": str(e)}
+
+    def _decision_key(self, user_input: str, workflow_summary: str) -> bytes:
+        """决策缓存键：模型、提示词 / schema 指纹、用户指令、工作流摘要"""
+        h = hashlib.blake2b(digest_size=16)
+        for part in (self.model_id, self.fast_model_id, _PROMPT_DIGEST, user_input, workflow_summary):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.digest()
+
+    def _remember_in_memory(self, key: bytes, raw: bytes) -> None:
+        self._decisions[key] = raw
+        self._decisions.move_to_end(key)
+        if len(self._decisions) > _DECISION_CACHE_SIZE:
+            self._decisions.popitem(last=False)
+
+    def _load_from_disk(self, key: bytes) -> Optional[bytes]:
+        if self._db is None:
+            return None
+        try:
+            with self._db_lock:
+                row = self._db.execute("SELECT v, ts FROM cache WHERE k = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️ Agent 决策缓存读取失败: {e}")
+            return None
+        if row is None or row[1] < time.time() - _DISK_CACHE_TTL:
+            return None
+        self._remember_in_memory(key, row[0])
+        return row[0]
+
+    def _cached_decision(self, key: bytes) -> Optional[Union[Dict, List]]:
+        """命中时返回决策的新副本（调用方可能修改返回的 dict）"""
+        raw = self._decisions.get(key)
+        if raw is not None:
+            self._decisions.move_to_end(key)
+        else:
+            raw = self._load_from_disk(key)
+            if raw is None:
+                return None
+        print("🤖 Agent 决策命中缓存")
+        return orjson.loads(raw)
+
+    def _remember_decision(self, key: bytes, res_json: Union[Dict, List]) -> None:
+        raw = orjson.dumps(res_json)
+        self._remember_in_memory(key, raw)
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache(k, v, ts) VALUES (?, ?, ?)",
+                    (key, raw, int(time.time())),
+                )
+        except sqlite3.Error as e:
+            print(f"⚠️ Agent 决策缓存写入失败: {e}")
+
+    def get_action_from_text(self, user_input: str, workflow_summary: str) -> Union[Dict, List]:
+        key = self._decision_key(user_input, workflow_summary)
+        cached = self._cached_decision(key)
+        if cached is not None:
+            return cached
+        res_json = None
+        if self._use_fast_path(user_input):
+            res_json = self._try_fast(self._build_contents(user_input, workflow_summary))
+        if res_json is None:
+            response = None
+            try:
+                response = self._generate(user_input, workflow_summary)
+                res_json = self._parse_response(response)
+            except Exception as e:
+                return self._error_result(e, response)
+        self._remember_decision(key, res_json)
+        return res_json
+
+    async def get_action_from_text_async(self, user_input: str, workflow_summary: str) -> Union[Dict, List]:
+        """get_action_from_text 的异步版本，供 FastAPI 路由直接 await"""
+        key = self._decision_key(user_input, workflow_summary)
+        cached = self._cached_decision(key)
+        if cached is not None:
+            return cached
+        res_json = None
+        if self._use_fast_path(user_input):
+            res_json = await self._try_fast_async(self._build_contents(user_input, workflow_summary))
+        if res_json is None:
+            response = None
+            try:
+                response = await self._generate_async(user_input, workflow_summary)
+                res_json = self._parse_response(response)
+            except Exception as e:
+                return self._error_result(e, response)
+        self._remember_decision(key, res_json)
+        return res_json
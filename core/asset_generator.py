@@ -8,12 +8,26 @@ Asset Generator - Gemini 3 Pro Image 资产生成器
 
 import os
 import asyncio
+import hashlib
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, Union
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
 from enum import Enum
 from PIL import Image
 import io
+import logging
+from types import MappingProxyType
+
+
+# 资产生成日志：handler 和级别由入口（app.py）统一配置
+log = logging.getLogger(__name__)
 
 
 class AssetType(Enum):
@@ -51,6 +65,323 @@ class GeneratedAsset:
     error_message: Optional[str] = None
 
 
+# 各视图的镜头指令（不可变，模块加载时构建一次）
+_CHARACTER_VIEW_INSTRUCTIONS = MappingProxyType({
+    AssetType.CHARACTER_FRONT: "front facing view, looking directly at camera",
+    AssetType.CHARACTER_SIDE: "side profile view, facing left, same character as reference",
+    AssetType.CHARACTER_BACK: "back view, facing away from camera, same character as reference"
+})
+
+_ENV_VIEW_INSTRUCTIONS = MappingProxyType({
+    AssetType.ENVIRONMENT_WIDE: MappingProxyType({
+        "shot_type": "extreme wide establishing shot",
+        "lens": "14-24mm ultra wide angle lens",
+        "focus": "Capture the full scope and scale of the environment, showing spatial relationships and overall layout",
+        "composition": "Environment fills the frame, emphasizing vastness and context",
+        "camera_position": "Camera positioned far back to show entire scene, eye-level or slightly elevated"
+    }),
+    AssetType.ENVIRONMENT_DETAIL: MappingProxyType({
+        "shot_type": "close-up detail shot",
+        "lens": "85-135mm macro lens",
+        "focus": "IMPORTANT: This is a CLOSE-UP shot focusing on textures, materials, and small distinctive features. Show surface details like wood grain, stone texture, fabric weave, metal patina, or natural patterns",
+        "composition": "Fill frame with interesting textures and details. Show wear marks, reflections, or intricate patterns. This should look completely different from a wide shot",
+        "camera_position": "Camera very close to surfaces, shooting textures and small objects at near-macro distance"
+    }),
+    AssetType.ENVIRONMENT_ALT: MappingProxyType({
+        "shot_type": "dramatic low angle or high angle shot",
+        "lens": "24-35mm wide angle lens",
+        "focus": "IMPORTANT: Shoot from a dramatically DIFFERENT angle - either looking UP from ground level or looking DOWN from above. Show the environment from an unexpected perspective",
+        "composition": "Use strong diagonal lines, dramatic perspective distortion, or bird's eye / worm's eye view. This should feel like a completely different vantage point",
+        "camera_position": "Camera either very low (ground level looking up) or very high (looking down), creating dramatic perspective"
+    })
+})
+
+_PRODUCT_VIEW_INSTRUCTIONS = MappingProxyType({
+    "front": "front view, product facing directly toward camera, centered composition",
+    "side": "side profile view, product rotated 90 degrees, same product as reference",
+    "back": "back view, product facing away from camera, showing rear details, same product as reference"
+})
+
+# 产品视图 prompt 模板（技术要求部分固定）
+_PRODUCT_PROMPT_TEMPLATE = """Professional product photography, {view_instruction}.
+
+Product: {name}
+{description}
+
+Technical requirements:
+- Clean white/light gray studio background
+- Professional three-point lighting with soft shadows
+- Same lighting setup across all views
+- High detail, sharp focus
+- Product centered in frame
+- No text, no watermarks, no logos
+- Consistent scale and proportions across all views
+- 16:9 widescreen composition
+- E-commerce quality product shot
+- Subtle reflection on surface for premium look"""
+
+# 视图名 -> 资产类型
+_CHARACTER_VIEW_TYPES = MappingProxyType({
+    "front": AssetType.CHARACTER_FRONT,
+    "side": AssetType.CHARACTER_SIDE,
+    "back": AssetType.CHARACTER_BACK
+})
+
+_ENV_VIEW_TYPES = MappingProxyType({
+    "wide": AssetType.ENVIRONMENT_WIDE,
+    "detail": AssetType.ENVIRONMENT_DETAIL,
+    "alt": AssetType.ENVIRONMENT_ALT
+})
+
+_ENV_VIEW_LABELS = MappingProxyType({
+    AssetType.ENVIRONMENT_WIDE: "Wide Shot (全景)",
+    AssetType.ENVIRONMENT_DETAIL: "Detail View (细节)",
+    AssetType.ENVIRONMENT_ALT: "Alt Angle (备选角度)"
+})
+
+
+@lru_cache(maxsize=64)
+def _visual_style_lines(art_style: str, color_palette: str, lighting_mood: str, lighting_label: str) -> str:
+    """Visual Style 配置 -> prompt 片段（同一任务的所有视图共用，按取值缓存）"""
+    vs_parts = []
+    if art_style:
+        vs_parts.append(f"Art style: {art_style}")
+    if color_palette:
+        vs_parts.append(f"Color palette: {color_palette}")
+    if lighting_mood:
+        vs_parts.append(f"{lighting_label}: {lighting_mood}")
+    return "\n".join(vs_parts)
+
+
+def _visual_style_key(visual_style: Optional[Dict[str, str]]) -> Tuple[str, str, str]:
+    if not visual_style:
+        return "", "", ""
+    return (
+        visual_style.get("artStyle") or "",
+        visual_style.get("colorPalette") or "",
+        visual_style.get("lightingMood") or "",
+    )
+
+
+@dataclass
+class GeneratedImage:
+    """Gemini 返回的原始图片数据；只有需要像素时（如作为后续视图的参考图）才解码"""
+    data: bytes
+    mime_type: str
+
+    @cached_property
+    def image(self) -> Image.Image:
+        image = Image.open(io.BytesIO(self.data))
+        image.load()
+        return image
+
+    @cached_property
+    def digest(self) -> str:
+        return _content_hash(self.data)
+
+
+def _content_hash(*chunks: bytes) -> str:
+    """缓存键用的内容哈希（BLAKE2b，纯软件实现下比 SHA-256 快，逐块 update 避免拼接大缓冲）"""
+    h = hashlib.blake2b(digest_size=20)
+    for chunk in chunks:
+        h.update(chunk)
+    return h.hexdigest()
+
+
+# ASCII 控制字符（非 printable）删除表
+_ASCII_CONTROL_CHARS = dict.fromkeys([*range(0x20), 0x7F])
+
+
+@lru_cache(maxsize=4)
+def _get_client(api_key: str):
+    """按 API key 复用 Gemini 客户端（及其连接池），多个 AssetGenerator 实例共享"""
+    from google import genai
+
+    # Sanitize API key to remove non-ASCII characters (fixes encoding errors in HTTP headers)
+    api_key = api_key.strip().encode("ascii", "ignore").decode("ascii").translate(_ASCII_CONTROL_CHARS)
+    return genai.Client(api_key=api_key)
+
+
+# 常驻的资产生成事件循环：共享客户端的异步连接池绑定在创建它的事件循环上，
+# 所有异步生成都在同一个循环中执行，连接才能跨调用复用
+_asset_loop: Optional[asyncio.AbstractEventLoop] = None
+_asset_loop_lock = threading.Lock()
+
+
+def _get_asset_loop() -> asyncio.AbstractEventLoop:
+    global _asset_loop
+    with _asset_loop_lock:
+        if _asset_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="asset-generator-loop", daemon=True).start()
+            _asset_loop = loop
+    return _asset_loop
+
+
+# 所有锚点 / 视图共享的 Gemini 并发请求上限（缓存命中不占用）；信号量在首次使用时绑定到资产事件循环
+_GEMINI_CONCURRENCY = int(os.environ.get("GEMINI_CONCURRENCY", "10"))
+_gemini_semaphore = asyncio.Semaphore(_GEMINI_CONCURRENCY)
+# 进行中的请求 {缓存键: Future}：并发的相同请求共享一次 API 调用（只在资产事件循环上访问）
+_inflight_requests: Dict[str, asyncio.Future] = {}
+
+
+# 资产落盘专用线程池：写文件不占用默认线程池（参考图缩放等 CPU 任务），生成与写盘互相重叠
+_io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="asset-io")
+
+
+# 进度回调专用单线程：回调按提交顺序在事件循环之外执行，慢回调（如推送 UI）不阻塞生成
+_progress_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asset-progress")
+
+
+def _deliver_progress(callback, args: tuple) -> None:
+    try:
+        callback(*args)
+    except Exception as e:
+        log.warning("   ⚠️ Progress callback failed: %s", e)
+
+
+async def _run_io(fn, *args):
+    """在落盘线程池中执行 fn(*args)"""
+    return await asyncio.get_running_loop().run_in_executor(_io_pool, fn, *args)
+
+
+def run_in_asset_loop(coro):
+    """在资产生成事件循环上运行协程并阻塞等待结果（供同步调用方使用，不可在该循环内调用）"""
+    return asyncio.run_coroutine_threadsafe(coro, _get_asset_loop()).result()
+
+
+# 图片 MIME 类型 -> 文件后缀（格式一致时可直接写入原始字节）
+_MIME_SUFFIXES = MappingProxyType({"image/png": ".png", "image/jpeg": ".jpg", "image/webp": ".webp"})
+# get_asset_paths 识别的资产后缀（含用户上传的参考图）
+_ASSET_SUFFIXES = frozenset({".png", ".jpg", ".jpeg", ".webp"})
+
+# 资产文件名（不含后缀）：{anchor_id}_{view}，只识别已知视图名
+_ASSET_STEM_RE = re.compile(r"^(.+)_(" + "|".join(re.escape(t.value) for t in AssetType) + r")$")
+
+# 可重试的 HTTP 状态码与错误状态
+_TRANSIENT_CODES = frozenset({408, 429, 500, 502, 503, 504})
+_TRANSIENT_STATUSES = ("RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED", "INTERNAL")
+
+
+def _is_transient_error(e: Exception) -> bool:
+    """限流、服务端 5xx、超时 / 连接中断视为瞬时错误，其余（参数错误、内容拦截等）直接失败"""
+    if getattr(e, "code", None) in _TRANSIENT_CODES:
+        return True
+    if isinstance(e, (asyncio.TimeoutError, ConnectionError)) or "Timeout" in type(e).__name__:
+        return True
+    message = str(e)
+    return any(status in message for status in _TRANSIENT_STATUSES)
+
+
+def _read_existing_asset(file_path: Path) -> Optional[GeneratedImage]:
+    """读取已生成的资产文件（不存在或为空时返回 None）"""
+    try:
+        data = Path(file_path).read_bytes()
+    except FileNotFoundError:
+        return None
+    if not data:
+        return None
+    mime_type = next((m for m, ext in _MIME_SUFFIXES.items() if ext == Path(file_path).suffix.lower()), "image/png")
+    return GeneratedImage(data, mime_type)
+
+
+def _sniff_mime(data: bytes) -> str:
+    """按文件头识别图片格式（缓存文件的扩展名不代表实际编码）"""
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "image/png"
+
+
+def _read_cached_image(cache_path: Path) -> Optional[GeneratedImage]:
+    """读取结果缓存并刷新 mtime（淘汰按最近使用时间）；不存在或为空时返回 None"""
+    try:
+        data = cache_path.read_bytes()
+    except FileNotFoundError:
+        return None
+    if not data:
+        return None
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+    return GeneratedImage(data, _sniff_mime(data))
+
+
+def _prune_cache_dir(cache_dir: Path, max_bytes: int, max_age: float) -> int:
+    """
+    淘汰结果缓存：按最近使用时间从旧到新，删除超过 max_age 秒未使用的条目，
+    并继续删除直到总大小不超过 max_bytes。返回删除的条目数
+    """
+    entries = []
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                # 跳过正在写入的临时文件
+                if entry.name.endswith(".tmp") or not entry.is_file():
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+    except FileNotFoundError:
+        return 0
+
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    expire_before = time.time() - max_age
+    removed = 0
+    for mtime, size, path in entries:
+        if mtime >= expire_before and total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+# 结果缓存上次淘汰的时间（进程内共享，避免每次写入都扫描目录）
+_last_cache_prune = 0.0
+_cache_prune_lock = threading.Lock()
+
+
+def _load_image(path: str) -> Image.Image:
+    """
+    打开并立即解码参考图；按 (路径, 修改时间, 大小) 缓存，多个锚点 / 视图共享同一参考图时只解码一次，
+    文件被重新上传覆盖后自动失效。返回的图片只作参考，调用方不得原地修改
+    """
+    st = os.stat(path)
+    return _load_image_cached(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=64)
+def _load_image_cached(path: str, mtime_ns: int, size: int) -> Image.Image:
+    image = Image.open(path)
+    image.load()
+    return image
+
+
+# 参考图：用户上传 / 已存在的视图为 PIL Image，链式生成的视图保持为原始字节
+ReferenceImage = Union[Image.Image, GeneratedImage]
+
+
+def _first_image(chunk) -> Optional[GeneratedImage]:
+    """从一个响应块中取出第一张图片（保留原始字节，按需解码）"""
+    if not chunk.candidates or chunk.candidates[0].content is None:
+        return None
+    for part in chunk.candidates[0].content.parts or []:
+        if getattr(part, 'inline_data', None) is not None:
+            return GeneratedImage(part.inline_data.data, part.inline_data.mime_type or "")
+    return None
+
+
 class AssetGenerator:
     """
     Gemini 3 Pro Image 资产生成器
@@ -65,14 +396,36 @@ class AssetGenerator:
     MODEL_NAME = "gemini-3-pro-image-preview"
     DEFAULT_RESOLUTION = "2K"
     ASPECT_RATIO = "16:9"
-
-    def __init__(self, job_id: str, project_root: str):
+    # PNG 是无损格式，压缩级别只影响文件大小；2K 图默认级别 6 编码很慢，用 1 换取速度
+    PNG_COMPRESS_LEVEL = 1
+    # 参考图上传前缩放到的最长边（像素），减少多参考图请求的上传体积
+    REFERENCE_MAX_EDGE = int(os.environ.get("ASSET_REF_MAX_EDGE", "768"))
+    REFERENCE_JPEG_QUALITY = 90
+    # 同时处理的锚点数上限；实际请求并发由 GEMINI_CONCURRENCY 控制（按账号 QPM 调整）
+    ANCHOR_CONCURRENCY = int(os.environ.get("ASSET_ANCHOR_CONCURRENCY", "8"))
+    # 限流 / 5xx / 超时等瞬时错误的退避重试（内容拦截等永久错误不重试）
+    TRANSIENT_RETRIES = 3
+    TRANSIENT_BACKOFF = 1.0  # 秒，指数退避基数（1s, 2s, 4s + 抖动）
+    # 资产输出格式：png（默认，下游按 .png 查找）/ jpeg / webp（有损，体积小、编码快）
+    ASSET_FORMAT = os.environ.get("ASSET_FORMAT", "png").lower()
+    ASSET_EXT = {"jpeg": ".jpg", "jpg": ".jpg", "webp": ".webp"}.get(ASSET_FORMAT, ".png")
+    LOSSY_QUALITY = 92
+    # 写盘后是否 fsync（更耐断电，但更慢）
+    FSYNC_WRITES = os.environ.get("ASSET_FSYNC", "0") == "1"
+    # 结果缓存上限：总大小 / 未使用时长，超出后按最近使用时间淘汰；最多每 CACHE_PRUNE_INTERVAL 秒检查一次
+    CACHE_MAX_BYTES = int(os.environ.get("GEMINI_CACHE_MAX_MB", "1024")) * 1024 * 1024
+    CACHE_MAX_AGE = float(os.environ.get("GEMINI_CACHE_MAX_AGE_DAYS", "30")) * 86400
+    CACHE_PRUNE_INTERVAL = 300
+
+    def __init__(self, job_id: str, project_root: str, use_cache: bool = True):
         """
         初始化资产生成器
 
         Args:
             job_id: 任务 ID
             project_root: 项目根目录
+            use_cache: 是否复用结果缓存；用户要求重新生成时传 False，
+                       仍会请求 Gemini 并用新结果刷新缓存
         """
         self.job_id = job_id
         self.project_root = Path(project_root)
@@ -81,30 +434,75 @@ class AssetGenerator:
 
         # 初始化 Gemini 客户端
         self._init_client()
+        # 生成结果缓存目录：相同 prompt + 参考图 + 模型配置直接复用上次结果，不再请求 Gemini
+        self._init_state(self.project_root / ".gemini_cache", use_cache)
 
-        # 生成状态追踪
-        self.generation_status: Dict[str, AssetStatus] = {}
+    @classmethod
+    def standalone(cls) -> "AssetGenerator":
+        """
+        不绑定任务的生成器：只用于调用方指定 output_dir 的生成（如 generate_product_views），
+        不创建 assets 目录，不读写结果缓存
+        """
+        generator = cls.__new__(cls)
+        generator.job_id = None
+        generator.project_root = None
+        generator.assets_dir = None
+        generator._init_client()
+        generator._init_state(None, use_cache=False)
+        return generator
+
+    def _init_state(self, cache_dir: Optional[Path], use_cache: bool) -> None:
+        """初始化与任务目录无关的运行状态（__init__ 与 standalone 共用）"""
+        # 生成状态追踪：直接存 AssetStatus 的字符串值，读取时无需逐项转换
+        self.generation_status: Dict[str, str] = {}
+
+        # 已缩放并编码的参考图缓存：id(原图) -> (原图, 请求 Part)，同一参考图在多个视图间只编码一次
+        self._ref_cache: Dict[int, Tuple[Image.Image, Any]] = {}
+        # 参考图内容哈希缓存：id(原图) -> (原图, 哈希)
+        self._ref_hash_cache: Dict[int, Tuple[Image.Image, str]] = {}
+
+        self.cache_dir: Optional[Path] = cache_dir
+        self.use_cache = use_cache
+
+        # 已提交、尚未确认送达的进度回调
+        self._progress_futures: List[Future] = []
+
+        # get_asset_paths 的内存索引 {anchor_id: {view: path}}：目录 mtime 变化时重新扫描，之后随写入更新
+        self._path_index: Optional[Dict[str, Dict[str, str]]] = None
+        self._path_index_mtime: Optional[int] = None
 
     def _init_client(self):
         """初始化 Gemini 客户端"""
         try:
-            from google import genai
             from google.genai import types
 
             api_key = os.environ.get("GEMINI_API_KEY")
             if not api_key:
                 raise ValueError("GEMINI_API_KEY environment variable not set")
-            # Sanitize API key to remove non-ASCII characters (fixes encoding errors in HTTP headers)
-            api_key = api_key.strip()
-            api_key = ''.join(c for c in api_key if c.isascii() and c.isprintable())
 
-            self.client = genai.Client(api_key=api_key)
+            self.client = _get_client(api_key)
             self.types = types
-            print(f"✅ Gemini client initialized for asset generation")
+            log.info("✅ Gemini client initialized for asset generation")
 
         except ImportError:
             raise ImportError("Please install google-genai: pip install google-genai")
 
+    def _notify(self, on_progress: Optional[callable], *args) -> None:
+        """把进度回调交给回调线程执行，不在资产事件循环里同步调用"""
+        if on_progress:
+            self._progress_futures.append(_progress_pool.submit(_deliver_progress, on_progress, args))
+
+    def run_sync(self, coro):
+        """
+        在资产事件循环上运行协程并阻塞等待结果，返回前确保其间的进度回调都已执行
+        （同步调用方使用，不可在该循环内调用）
+        """
+        try:
+            return run_in_asset_loop(coro)
+        finally:
+            pending, self._progress_futures = self._progress_futures, []
+            wait(pending)
+
     def _build_character_prompt(
         self,
         view: AssetType,
@@ -127,11 +525,7 @@ class AssetGenerator:
             visual_style: Visual Style 配置 (artStyle, colorPalette, lightingMood, cameraStyle)
             has_reference: 是否有用户上传的参考图片
         """
-        view_instructions = {
-            AssetType.CHARACTER_FRONT: "front facing view, looking directly at camera",
-            AssetType.CHARACTER_SIDE: "side profile view, facing left, same character as reference",
-            AssetType.CHARACTER_BACK: "back view, facing away from camera, same character as reference"
-        }
+        view_instructions = _CHARACTER_VIEW_INSTRUCTIONS
 
         attributes_str = ""
         if persistent_attributes:
@@ -142,17 +536,9 @@ class AssetGenerator:
             style_str = f"Style: {style_adaptation}. "
 
         # Build visual style instructions
-        visual_style_str = ""
-        if visual_style:
-            vs_parts = []
-            if visual_style.get("artStyle"):
-                vs_parts.append(f"Art style: {visual_style['artStyle']}")
-            if visual_style.get("colorPalette"):
-                vs_parts.append(f"Color palette: {visual_style['colorPalette']}")
-            if visual_style.get("lightingMood"):
-                vs_parts.append(f"Lighting: {visual_style['lightingMood']}")
-            if vs_parts:
-                visual_style_str = "\n".join(vs_parts) + "\n"
+        visual_style_str = _visual_style_lines(*_visual_style_key(visual_style), "Lighting")
+        if visual_style_str:
+            visual_style_str += "\n"
 
         if has_reference and detailed_description:
             # Has reference image + text description: prioritize the reference image
@@ -278,31 +664,7 @@ Technical requirements:
             style_adaptation: 风格适配说明
             visual_style: Visual Style 配置 (artStyle, colorPalette, lightingMood, cameraStyle)
         """
-        view_instructions = {
-            AssetType.ENVIRONMENT_WIDE: {
-                "shot_type": "extreme wide establishing shot",
-                "lens": "14-24mm ultra wide angle lens",
-                "focus": "Capture the full scope and scale of the environment, showing spatial relationships and overall layout",
-                "composition": "Environment fills the frame, emphasizing vastness and context",
-                "camera_position": "Camera positioned far back to show entire scene, eye-level or slightly elevated"
-            },
-            AssetType.ENVIRONMENT_DETAIL: {
-                "shot_type": "close-up detail shot",
-                "lens": "85-135mm macro lens",
-                "focus": "IMPORTANT: This is a CLOSE-UP shot focusing on textures, materials, and small distinctive features. Show surface details like wood grain, stone texture, fabric weave, metal patina, or natural patterns",
-                "composition": "Fill frame with interesting textures and details. Show wear marks, reflections, or intricate patterns. This should look completely different from a wide shot",
-                "camera_position": "Camera very close to surfaces, shooting textures and small objects at near-macro distance"
-            },
-            AssetType.ENVIRONMENT_ALT: {
-                "shot_type": "dramatic low angle or high angle shot",
-                "lens": "24-35mm wide angle lens",
-                "focus": "IMPORTANT: Shoot from a dramatically DIFFERENT angle - either looking UP from ground level or looking DOWN from above. Show the environment from an unexpected perspective",
-                "composition": "Use strong diagonal lines, dramatic perspective distortion, or bird's eye / worm's eye view. This should feel like a completely different vantage point",
-                "camera_position": "Camera either very low (ground level looking up) or very high (looking down), creating dramatic perspective"
-            }
-        }
-
-        instructions = view_instructions.get(view, view_instructions[AssetType.ENVIRONMENT_WIDE])
+        instructions = _ENV_VIEW_INSTRUCTIONS.get(view, _ENV_VIEW_INSTRUCTIONS[AssetType.ENVIRONMENT_WIDE])
 
         atmosphere_str = ""
         if atmospheric_conditions:
@@ -315,17 +677,9 @@ Technical requirements:
         camera_position = instructions.get('camera_position', '')
 
         # Build visual style instructions
-        visual_style_str = ""
-        if visual_style:
-            vs_parts = []
-            if visual_style.get("artStyle"):
-                vs_parts.append(f"Art style: {visual_style['artStyle']}")
-            if visual_style.get("colorPalette"):
-                vs_parts.append(f"Color palette: {visual_style['colorPalette']}")
-            if visual_style.get("lightingMood"):
-                vs_parts.append(f"Lighting mood: {visual_style['lightingMood']}")
-            if vs_parts:
-                visual_style_str = "VISUAL STYLE:\n" + "\n".join(vs_parts) + "\n\n"
+        visual_style_str = _visual_style_lines(*_visual_style_key(visual_style), "Lighting mood")
+        if visual_style_str:
+            visual_style_str = "VISUAL STYLE:\n" + visual_style_str + "\n\n"
 
         prompt = f"""Cinematic environment {instructions['shot_type']}, {instructions['lens']} perspective.
 
@@ -351,60 +705,145 @@ Technical requirements:
 """
         return prompt.strip()
 
+    def _encode_reference(self, image: Image.Image):
+        """
+        参考图缩放到最长边不超过 REFERENCE_MAX_EDGE 并编码为请求 Part（按原图对象缓存）：
+        否则 SDK 会在每个引用它的视图请求中重新编码一次
+        """
+        cached = self._ref_cache.get(id(image))
+        if cached is not None and cached[0] is image:
+            return cached[1]
+        if max(image.size) <= self.REFERENCE_MAX_EDGE:
+            thumb = image
+        else:
+            thumb = image.copy()
+            thumb.thumbnail((self.REFERENCE_MAX_EDGE, self.REFERENCE_MAX_EDGE), Image.LANCZOS)
+        buf = io.BytesIO()
+        if thumb.mode in ("RGB", "L"):
+            # 无透明通道：JPEG 体积远小于 PNG
+            thumb.save(buf, "JPEG", quality=self.REFERENCE_JPEG_QUALITY)
+            mime_type = "image/jpeg"
+        else:
+            thumb.save(buf, "PNG", compress_level=self.PNG_COMPRESS_LEVEL)
+            mime_type = "image/png"
+        part = self.types.Part.from_bytes(data=buf.getvalue(), mime_type=mime_type)
+        # 保留原图引用，避免原图被回收后 id 复用命中错误的缓存
+        self._ref_cache[id(image)] = (image, part)
+        return part
+
+    def _reference_content(self, ref: ReferenceImage):
+        """参考图 -> 请求内容：生成的视图（2K）同样先解码再缩放到 REFERENCE_MAX_EDGE，编码一次后复用"""
+        if isinstance(ref, GeneratedImage):
+            ref = ref.image
+        return self._encode_reference(ref)
+
     async def _generate_image(
         self,
         prompt: str,
-        reference_images: List[Image.Image] = None
-    ) -> Tuple[Optional[Image.Image], Optional[str]]:
+        reference_images: List[ReferenceImage] = None
+    ) -> Tuple[Optional[GeneratedImage], Optional[str]]:
         """
-        调用 Gemini API 生成图片
+        生成图片：优先命中磁盘结果缓存（use_cache=False 时跳过），相同请求并发时只调用一次 API
+        （同步调用方通过 run_in_asset_loop 使用）
 
         Args:
             prompt: 生成 prompt
             reference_images: 参考图片列表
 
         Returns:
-            (生成的图片, 错误信息)
+            (生成的图片数据, 错误信息)
         """
         try:
-            # 构建 contents
-            contents = [prompt]
-            if reference_images:
-                for ref_img in reference_images:
-                    contents.append(ref_img)
-
-            # 配置生成参数
-            config = self.types.GenerateContentConfig(
-                response_modalities=['IMAGE'],
-            )
-
-            # 调用 API
-            response = self.client.models.generate_content(
-                model=self.MODEL_NAME,
-                contents=contents,
-                config=config
-            )
-
-            # 提取生成的图片
-            for part in response.candidates[0].content.parts:
-                if hasattr(part, 'inline_data') and part.inline_data is not None:
-                    # 从 bytes 创建 PIL Image
-                    image_data = part.inline_data.data
-                    image = Image.open(io.BytesIO(image_data))
-                    return image, None
-
-            return None, "No image generated in response"
-
+            key = await asyncio.to_thread(self._cache_key, prompt, reference_images)
         except Exception as e:
-            return None, str(e)
+            log.warning("   ⚠️ Generation cache unavailable: %s", e)
+            key = None
 
-    def _generate_image_sync(
+        cache_path = None
+        if key is not None and self.cache_dir is not None:
+            cache_path = self.cache_dir / f"{key}.png"
+            try:
+                cached = await asyncio.to_thread(_read_cached_image, cache_path) if self.use_cache else None
+                if cached is not None:
+                    log.info("   ♻️ Cache hit: %s", cache_path.name)
+                    return cached, None
+            except Exception as e:
+                log.warning("   ⚠️ Generation cache unavailable: %s", e)
+                cache_path = None
+
+        if key is None:
+            async with _gemini_semaphore:
+                return await self._request_image(prompt, reference_images)
+
+        # 相同请求正在进行中（如多个锚点共用同一描述）：等待同一个结果，不重复请求
+        pending = _inflight_requests.get(key)
+        if pending is not None:
+            log.info("   🔗 Joining in-flight request")
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        _inflight_requests[key] = future
+        result = (None, "Request cancelled")
+        try:
+            async with _gemini_semaphore:
+                result = await self._request_image(prompt, reference_images)
+        finally:
+            del _inflight_requests[key]
+            future.set_result(result)
+
+        generated, error = result
+        if generated and cache_path is not None:
+            # 缓存写入不影响本次结果，后台进行，不阻塞后续视图的生成
+            _io_pool.submit(self._store_cached, cache_path, generated)
+        return generated, error
+
+    def _ref_hash(self, ref: ReferenceImage) -> str:
+        """参考图内容哈希（PIL 图按对象缓存，同一参考图只哈希一次）"""
+        if isinstance(ref, GeneratedImage):
+            return ref.digest
+        cached = self._ref_hash_cache.get(id(ref))
+        if cached is not None and cached[0] is ref:
+            return cached[1]
+        digest = _content_hash(f"{ref.mode}|{ref.size}|".encode(), ref.tobytes())
+        self._ref_hash_cache[id(ref)] = (ref, digest)
+        return digest
+
+    def _cache_key(self, prompt: str, reference_images: Optional[List[ReferenceImage]]) -> str:
+        """(prompt, 参考图哈希, 模型, 输出模态) -> 缓存键"""
+        ref_hashes = [self._ref_hash(r) for r in reference_images or []]
+        modalities = "TEXT,IMAGE" if reference_images else "IMAGE"
+        return _content_hash("|".join([self.MODEL_NAME, modalities, prompt, *ref_hashes]).encode("utf-8"))
+
+    def _store_cached(self, cache_path: Path, generated: GeneratedImage) -> None:
+        """写入结果缓存（统一存为 PNG）并按需淘汰旧条目；在后台线程执行，失败只打印警告"""
+        global _last_cache_prune
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self._save_generated(generated, cache_path)
+        except Exception as e:
+            log.warning("   ⚠️ Failed to write generation cache: %s", e)
+            return
+
+        with _cache_prune_lock:
+            now = time.monotonic()
+            if _last_cache_prune and now - _last_cache_prune < self.CACHE_PRUNE_INTERVAL:
+                return
+            _last_cache_prune = now
+            try:
+                removed = _prune_cache_dir(cache_path.parent, self.CACHE_MAX_BYTES, self.CACHE_MAX_AGE)
+            except OSError as e:
+                log.warning("   ⚠️ Failed to prune generation cache: %s", e)
+                return
+        if removed:
+            log.info("   🧹 Pruned %s generation cache entries", removed)
+
+    async def _request_image(
         self,
         prompt: str,
-        reference_images: List[Image.Image] = None
-    ) -> Tuple[Optional[Image.Image], Optional[str]]:
+        reference_images: List[ReferenceImage] = None
+    ) -> Tuple[Optional[GeneratedImage], Optional[str]]:
         """
-        同步版本的图片生成
+        调用 Gemini API 生成图片
 
         When reference images are provided, uses TEXT+IMAGE mode (image editing)
         so Gemini actually references the input images.
@@ -415,38 +854,166 @@ Technical requirements:
             contents = [prompt]
             if reference_images:
                 for ref_img in reference_images:
-                    contents.append(ref_img)
+                    contents.append(await asyncio.to_thread(self._reference_content, ref_img))
 
             # 有参考图时用 TEXT+IMAGE 模式（图片编辑），Gemini 才会真正参考输入图片
             # 无参考图时用纯 IMAGE 模式（文生图）
-            if reference_images:
-                config = self.types.GenerateContentConfig(
-                    response_modalities=['TEXT', 'IMAGE'],
-                )
-            else:
-                config = self.types.GenerateContentConfig(
-                    response_modalities=['IMAGE'],
-                )
-
-            # 调用 API
-            response = self.client.models.generate_content(
-                model=self.MODEL_NAME,
-                contents=contents,
-                config=config
+            config = self.types.GenerateContentConfig(
+                response_modalities=['TEXT', 'IMAGE'] if reference_images else ['IMAGE'],
             )
 
-            # 提取生成的图片
-            for part in response.candidates[0].content.parts:
-                if hasattr(part, 'inline_data') and part.inline_data is not None:
-                    image_data = part.inline_data.data
-                    image = Image.open(io.BytesIO(image_data))
-                    return image, None
-
-            return None, "No image generated in response"
+            # 调用 API（异步流式，多个视图可并发请求）；收到第一张图片即返回，瞬时错误退避重试
+            for attempt in range(self.TRANSIENT_RETRIES + 1):
+                try:
+                    stream = await self.client.aio.models.generate_content_stream(
+                        model=self.MODEL_NAME,
+                        contents=contents,
+                        config=config
+                    )
+                    try:
+                        async for chunk in stream:
+                            generated = _first_image(chunk)
+                            if generated:
+                                return generated, None
+                    finally:
+                        if hasattr(stream, "aclose"):
+                            await stream.aclose()
+                    return None, "No image generated in response"
+                except Exception as e:
+                    if not _is_transient_error(e) or attempt == self.TRANSIENT_RETRIES:
+                        raise
+                    # 加抖动，避免并发请求同时重试再次撞上限流
+                    delay = self.TRANSIENT_BACKOFF * (2 ** attempt) + random.random() * 0.2
+                    log.info("   ⏳ Transient error (%s), retrying in %.1fs...", e, delay)
+                    await asyncio.sleep(delay)
 
         except Exception as e:
             return None, str(e)
 
+    async def _generate_images_batched(
+        self,
+        tasks: List[Tuple[str, Optional[List[ReferenceImage]]]],
+        concurrency: int = 6
+    ) -> List[Tuple[Optional[GeneratedImage], Optional[str]]]:
+        """
+        并发生成多张互不依赖的图片
+
+        Args:
+            tasks: [(prompt, reference_images), ...]
+            concurrency: 同时进行的请求数
+
+        Returns:
+            与 tasks 顺序一致的 [(生成的图片数据, 错误信息), ...]
+        """
+        sem = asyncio.Semaphore(concurrency)
+
+        async def _one(prompt: str, refs: Optional[List[ReferenceImage]]):
+            async with sem:
+                return await self._generate_image(prompt, refs)
+
+        return await asyncio.gather(*(_one(prompt, refs) for prompt, refs in tasks))
+
+    def _begin_view(self, anchor_id: str, view_name: str, on_progress: callable = None) -> None:
+        """标记视图开始生成"""
+        self.generation_status[f"{anchor_id}_{view_name}"] = AssetStatus.GENERATING.value
+        self._notify(on_progress, anchor_id, view_name, "GENERATING")
+
+    def _finish_view(
+        self,
+        anchor_id: str,
+        view_name: str,
+        asset_type: AssetType,
+        file_path: Path,
+        image: Optional[GeneratedImage],
+        error: Optional[str],
+        on_progress: callable = None,
+        index: bool = True
+    ) -> GeneratedAsset:
+        """
+        记录视图生成结果：更新状态、输出日志、回调进度，并返回 GeneratedAsset
+
+        Args:
+            index: 是否写入 get_asset_paths 索引（仅 assets 目录下的资产）
+        """
+        status_key = f"{anchor_id}_{view_name}"
+        if image and not error:
+            if index:
+                self._index_asset(anchor_id, view_name, file_path)
+            self.generation_status[status_key] = AssetStatus.SUCCESS.value
+            log.info("   ✅ Saved: %s", file_path)
+            self._notify(on_progress, anchor_id, view_name, "SUCCESS", str(file_path))
+            return GeneratedAsset(
+                anchor_id=anchor_id,
+                asset_type=asset_type,
+                file_path=str(file_path),
+                status=AssetStatus.SUCCESS
+            )
+
+        self.generation_status[status_key] = AssetStatus.FAILED.value
+        log.error("   ❌ Failed: %s", error)
+        self._notify(on_progress, anchor_id, view_name, "FAILED", None, error)
+        return GeneratedAsset(
+            anchor_id=anchor_id,
+            asset_type=asset_type,
+            file_path=None,
+            status=AssetStatus.FAILED,
+            error_message=error
+        )
+
+    async def _produce_view(
+        self,
+        file_path: Path,
+        prompt: str,
+        reference_images: Optional[List[ReferenceImage]] = None,
+        skip_if_exists: bool = False
+    ) -> Tuple[Optional[GeneratedImage], Optional[str]]:
+        """
+        生成一张视图并保存到 file_path；skip_if_exists 时直接复用已存在的非空文件，不再请求 Gemini
+
+        Returns:
+            (图片数据, 错误信息)，复用的文件同样以 GeneratedImage 返回，可继续作为后续视图的参考
+        """
+        if skip_if_exists:
+            existing = await _run_io(_read_existing_asset, file_path)
+            if existing is not None:
+                log.info("   ⏭️ Reusing existing: %s", file_path)
+                return existing, None
+
+        image, error = await self._generate_image(prompt, reference_images)
+        if image and not error:
+            await _run_io(self._save_generated, image, file_path)
+        return image, error
+
+    def _save_generated(self, generated: GeneratedImage, file_path: Path) -> None:
+        """
+        保存生成的图片，格式由文件后缀决定（.png / .jpg / .webp）：
+        Gemini 返回的格式与目标一致时直接写入原始字节，跳过解码 + 重新编码
+
+        先写临时文件再 os.replace 原子替换，中途崩溃不会留下被当作有效资产的半截文件
+        """
+        file_path = Path(file_path)
+        suffix = file_path.suffix.lower()
+        tmp_path = file_path.with_name(file_path.name + ".tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                if _MIME_SUFFIXES.get(generated.mime_type) == suffix:
+                    f.write(generated.data)
+                elif suffix == ".jpg":
+                    generated.image.convert("RGB").save(
+                        f, "JPEG", quality=self.LOSSY_QUALITY, optimize=True, progressive=True
+                    )
+                elif suffix == ".webp":
+                    generated.image.save(f, "WEBP", quality=self.LOSSY_QUALITY, method=4)
+                else:
+                    generated.image.save(f, "PNG", compress_level=self.PNG_COMPRESS_LEVEL)
+                if self.FSYNC_WRITES:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
     def generate_character_assets(
         self,
         anchor_id: str,
@@ -455,7 +1022,8 @@ Technical requirements:
         style_adaptation: str = "",
         persistent_attributes: List[str] = None,
         user_reference_path: str = None,
-        on_progress: callable = None
+        on_progress: callable = None,
+        skip_if_exists: bool = False
     ) -> Dict[str, GeneratedAsset]:
         """
         生成角色三视图资产（链式生成）
@@ -468,21 +1036,45 @@ Technical requirements:
             persistent_attributes: 持久属性
             user_reference_path: 用户上传的参考图路径
             on_progress: 进度回调函数
+            skip_if_exists: 目标文件已存在（非空）时直接复用，不重新生成
 
         Returns:
             {view: GeneratedAsset} 三视图资产字典
         """
+        return self.run_sync(self.generate_character_assets_async(
+            anchor_id=anchor_id,
+            anchor_name=anchor_name,
+            detailed_description=detailed_description,
+            style_adaptation=style_adaptation,
+            persistent_attributes=persistent_attributes,
+            user_reference_path=user_reference_path,
+            on_progress=on_progress,
+            skip_if_exists=skip_if_exists
+        ))
+
+    async def generate_character_assets_async(
+        self,
+        anchor_id: str,
+        anchor_name: str,
+        detailed_description: str,
+        style_adaptation: str = "",
+        persistent_attributes: List[str] = None,
+        user_reference_path: str = None,
+        on_progress: callable = None,
+        skip_if_exists: bool = False
+    ) -> Dict[str, GeneratedAsset]:
+        """generate_character_assets 的异步实现"""
         results = {}
         reference_images = []
 
         # 加载用户参考图（如果有）
         if user_reference_path and os.path.exists(user_reference_path):
             try:
-                user_ref = Image.open(user_reference_path)
+                user_ref = await asyncio.to_thread(_load_image, user_reference_path)
                 reference_images.append(user_ref)
-                print(f"   📷 Loaded user reference image: {user_reference_path}")
+                log.info("   📷 Loaded user reference image: %s", user_reference_path)
             except Exception as e:
-                print(f"   ⚠️ Failed to load reference image: {e}")
+                log.warning("   ⚠️ Failed to load reference image: %s", e)
 
         # 生成三视图（链式生成）
         views = [
@@ -495,12 +1087,9 @@ Technical requirements:
 
         for i, view in enumerate(views):
             view_name = view.value
-            self.generation_status[f"{anchor_id}_{view_name}"] = AssetStatus.GENERATING
+            self._begin_view(anchor_id, view_name, on_progress)
 
-            if on_progress:
-                on_progress(anchor_id, view_name, "GENERATING")
-
-            print(f"   🎨 Generating {anchor_name} - {view_name} view ({i+1}/3)...")
+            log.info("   🎨 Generating %s - %s view (%d/3)...", anchor_name, view_name, i + 1)
 
             # 构建 prompt
             prompt = self._build_character_prompt(
@@ -518,43 +1107,17 @@ Technical requirements:
                 # 对于侧面和背面，加入正面图作为参考
                 refs_for_this_view.append(front_image)
 
-            # 生成图片
-            image, error = self._generate_image_sync(prompt, refs_for_this_view)
-
-            if image and not error:
-                # 保存图片
-                file_name = f"{anchor_id}_{view_name}.png"
-                file_path = self.assets_dir / file_name
-                image.save(file_path, "PNG")
+            # 生成并保存图片
+            file_path = self.assets_dir / f"{anchor_id}_{view_name}{self.ASSET_EXT}"
+            image, error = await self._produce_view(file_path, prompt, refs_for_this_view, skip_if_exists)
 
-                # 保存正面图供后续参考
-                if view == AssetType.CHARACTER_FRONT:
-                    front_image = image
+            results[view_name] = self._finish_view(
+                anchor_id, view_name, view, file_path, image, error, on_progress
+            )
 
-                results[view_name] = GeneratedAsset(
-                    anchor_id=anchor_id,
-                    asset_type=view,
-                    file_path=str(file_path),
-                    status=AssetStatus.SUCCESS
-                )
-                self.generation_status[f"{anchor_id}_{view_name}"] = AssetStatus.SUCCESS
-                print(f"   ✅ Saved: {file_path}")
-
-                if on_progress:
-                    on_progress(anchor_id, view_name, "SUCCESS", str(file_path))
-            else:
-                results[view_name] = GeneratedAsset(
-                    anchor_id=anchor_id,
-                    asset_type=view,
-                    file_path=None,
-                    status=AssetStatus.FAILED,
-                    error_message=error
-                )
-                self.generation_status[f"{anchor_id}_{view_name}"] = AssetStatus.FAILED
-                print(f"   ❌ Failed: {error}")
-
-                if on_progress:
-                    on_progress(anchor_id, view_name, "FAILED", None, error)
+            # 保存正面图供后续参考
+            if image and not error and view == AssetType.CHARACTER_FRONT:
+                front_image = image
 
         return results
 
@@ -589,6 +1152,38 @@ Technical requirements:
         Returns:
             {view: GeneratedAsset} 生成的资产字典
         """
+        return self.run_sync(self.generate_character_views_selective_async(
+            anchor_id=anchor_id,
+            anchor_name=anchor_name,
+            detailed_description=detailed_description,
+            style_adaptation=style_adaptation,
+            persistent_attributes=persistent_attributes,
+            visual_style=visual_style,
+            views_to_generate=views_to_generate,
+            existing_views=existing_views,
+            user_reference_path=user_reference_path,
+            on_progress=on_progress
+        ))
+
+    async def generate_character_views_selective_async(
+        self,
+        anchor_id: str,
+        anchor_name: str,
+        detailed_description: str,
+        style_adaptation: str = "",
+        persistent_attributes: List[str] = None,
+        visual_style: Dict[str, str] = None,
+        views_to_generate: List[str] = None,
+        existing_views: Dict[str, str] = None,
+        user_reference_path: str = None,
+        on_progress: callable = None
+    ) -> Dict[str, GeneratedAsset]:
+        """
+        generate_character_views_selective 的异步实现
+
+        有用户参考图时：先生成正面图，侧面/背面以参考图 + 正面图为条件并发生成；
+        没有参考图时：按 front -> side -> back 链式生成，每一步把已生成的视图作为后续参考
+        """
         if views_to_generate is None:
             views_to_generate = ["front", "side", "back"]
 
@@ -601,45 +1196,46 @@ Technical requirements:
         # 加载用户参考图
         if user_reference_path and os.path.exists(user_reference_path):
             try:
-                user_ref = Image.open(user_reference_path)
+                user_ref = await asyncio.to_thread(_load_image, user_reference_path)
                 reference_images.append(user_ref)
-                print(f"   📷 Loaded user reference image: {user_reference_path}")
+                log.info("   📷 Loaded user reference image: %s", user_reference_path)
             except Exception as e:
-                print(f"   ⚠️ Failed to load reference image: {e}")
+                log.warning("   ⚠️ Failed to load reference image: %s", e)
 
         # 加载已存在的视图作为参考
         existing_images = {}
         for view_name, path in existing_views.items():
             if path and os.path.exists(path):
                 try:
-                    existing_images[view_name] = Image.open(path)
-                    print(f"   📷 Loaded existing {view_name} view as reference")
+                    existing_images[view_name] = await asyncio.to_thread(_load_image, path)
+                    log.info("   📷 Loaded existing %s view as reference", view_name)
                 except Exception as e:
-                    print(f"   ⚠️ Failed to load existing {view_name}: {e}")
+                    log.warning("   ⚠️ Failed to load existing %s: %s", view_name, e)
 
         # 视图类型映射
-        view_type_map = {
-            "front": AssetType.CHARACTER_FRONT,
-            "side": AssetType.CHARACTER_SIDE,
-            "back": AssetType.CHARACTER_BACK
-        }
+        view_type_map = _CHARACTER_VIEW_TYPES
 
-        # 按顺序生成（front -> side -> back），每一步把已生成的视图作为后续参考
-        ordered_views = ["front", "side", "back"]
         front_image = existing_images.get("front")
         generated_views = {}  # Track all successfully generated views for chaining
 
-        for view_name in ordered_views:
-            if view_name not in views_to_generate:
-                continue
+        def refs_for(view: AssetType) -> List[ReferenceImage]:
+            # 准备参考图片：user reference + front image + all previously generated views
+            refs = reference_images.copy()
+            if front_image and view != AssetType.CHARACTER_FRONT:
+                refs.append(front_image)
+            # 按对象身份去重：PIL Image 的 == 会逐像素比较
+            ref_ids = {id(r) for r in refs}
+            for prev_view_name, prev_image in generated_views.items():
+                if id(prev_image) not in ref_ids:
+                    refs.append(prev_image)
+                    ref_ids.add(id(prev_image))
+            return refs
 
+        async def run_view(view_name: str, refs: List[ReferenceImage]) -> Optional[GeneratedImage]:
             view = view_type_map[view_name]
-            self.generation_status[f"{anchor_id}_{view_name}"] = AssetStatus.GENERATING
-
-            if on_progress:
-                on_progress(anchor_id, view_name, "GENERATING")
+            self._begin_view(anchor_id, view_name, on_progress)
 
-            print(f"   🎨 Generating {anchor_name} - {view_name} view...")
+            log.info("   🎨 Generating %s - %s view...", anchor_name, view_name)
 
             # 构建 prompt
             prompt = self._build_character_prompt(
@@ -652,55 +1248,39 @@ Technical requirements:
                 has_reference=bool(reference_images)
             )
 
-            # 准备参考图片：user reference + front image + all previously generated views
-            refs = reference_images.copy()
-            if front_image and view != AssetType.CHARACTER_FRONT:
-                refs.append(front_image)
-            for prev_view_name, prev_image in generated_views.items():
-                if prev_image not in refs:
-                    refs.append(prev_image)
-
-            print(f"   📸 Passing {len(refs)} reference images for {view_name}")
+            log.info("   📸 Passing %d reference images for %s", len(refs), view_name)
 
             # 生成图片
-            image, error = self._generate_image_sync(prompt, refs)
+            file_path = self.assets_dir / f"{anchor_id}_{view_name}{self.ASSET_EXT}"
+            image, error = await self._produce_view(file_path, prompt, refs)
 
-            if image and not error:
-                file_name = f"{anchor_id}_{view_name}.png"
-                file_path = self.assets_dir / file_name
-                image.save(file_path, "PNG")
+            results[view_name] = self._finish_view(
+                anchor_id, view_name, view, file_path, image, error, on_progress
+            )
+            return image if results[view_name].status == AssetStatus.SUCCESS else None
 
-                # 保存生成的视图供后续参考
-                if view == AssetType.CHARACTER_FRONT:
-                    front_image = image
-                generated_views[view_name] = image
-
-                results[view_name] = GeneratedAsset(
-                    anchor_id=anchor_id,
-                    asset_type=view,
-                    file_path=str(file_path),
-                    status=AssetStatus.SUCCESS
-                )
-                self.generation_status[f"{anchor_id}_{view_name}"] = AssetStatus.SUCCESS
-                print(f"   ✅ Saved: {file_path}")
-
-                if on_progress:
-                    on_progress(anchor_id, view_name, "SUCCESS", str(file_path))
-            else:
-                results[view_name] = GeneratedAsset(
-                    anchor_id=anchor_id,
-                    asset_type=view,
-                    file_path=None,
-                    status=AssetStatus.FAILED,
-                    error_message=error
-                )
-                self.generation_status[f"{anchor_id}_{view_name}"] = AssetStatus.FAILED
-                print(f"   ❌ Failed: {error}")
-
-                if on_progress:
-                    on_progress(anchor_id, view_name, "FAILED", None, error)
+        ordered_views = [v for v in ["front", "side", "back"] if v in views_to_generate]
 
-        return results
+        if reference_images:
+            # 用户参考图已锚定角色外观：正面图生成后，其余视图互不依赖，可并发请求
+            if "front" in ordered_views:
+                image = await run_view("front", refs_for(AssetType.CHARACTER_FRONT))
+                if image:
+                    front_image = image
+            rest_views = [v for v in ordered_views if v != "front"]
+            await asyncio.gather(*(run_view(v, refs_for(view_type_map[v])) for v in rest_views))
+        else:
+            # 按顺序生成（front -> side -> back），每一步把已生成的视图作为后续参考
+            for view_name in ordered_views:
+                image = await run_view(view_name, refs_for(view_type_map[view_name]))
+                if image:
+                    # 保存生成的视图供后续参考
+                    if view_name == "front":
+                        front_image = image
+                    generated_views[view_name] = image
+
+        # 按 front -> side -> back 顺序返回
+        return {v: results[v] for v in ordered_views}
 
     def generate_environment_views_selective(
         self,
@@ -733,6 +1313,33 @@ Technical requirements:
         Returns:
             {view: GeneratedAsset} 生成的资产字典
         """
+        return self.run_sync(self.generate_environment_views_selective_async(
+            anchor_id=anchor_id,
+            anchor_name=anchor_name,
+            detailed_description=detailed_description,
+            atmospheric_conditions=atmospheric_conditions,
+            style_adaptation=style_adaptation,
+            visual_style=visual_style,
+            views_to_generate=views_to_generate,
+            existing_views=existing_views,
+            user_reference_path=user_reference_path,
+            on_progress=on_progress
+        ))
+
+    async def generate_environment_views_selective_async(
+        self,
+        anchor_id: str,
+        anchor_name: str,
+        detailed_description: str,
+        atmospheric_conditions: str = "",
+        style_adaptation: str = "",
+        visual_style: Dict[str, str] = None,
+        views_to_generate: List[str] = None,
+        existing_views: Dict[str, str] = None,
+        user_reference_path: str = None,
+        on_progress: callable = None
+    ) -> Dict[str, GeneratedAsset]:
+        """generate_environment_views_selective 的异步实现"""
         if views_to_generate is None:
             views_to_generate = ["wide", "detail", "alt"]
 
@@ -745,50 +1352,67 @@ Technical requirements:
         # 加载用户参考图
         if user_reference_path and os.path.exists(user_reference_path):
             try:
-                user_ref = Image.open(user_reference_path)
+                user_ref = await asyncio.to_thread(_load_image, user_reference_path)
                 reference_images.append(user_ref)
-                print(f"   📷 Loaded user reference image: {user_reference_path}")
+                log.info("   📷 Loaded user reference image: %s", user_reference_path)
             except Exception as e:
-                print(f"   ⚠️ Failed to load reference image: {e}")
+                log.warning("   ⚠️ Failed to load reference image: %s", e)
 
         # 加载已存在的视图作为参考
         existing_images = {}
         for view_name, path in existing_views.items():
             if path and os.path.exists(path):
                 try:
-                    existing_images[view_name] = Image.open(path)
-                    print(f"   📷 Loaded existing {view_name} view as reference")
+                    existing_images[view_name] = await asyncio.to_thread(_load_image, path)
+                    log.info("   📷 Loaded existing %s view as reference", view_name)
                 except Exception as e:
-                    print(f"   ⚠️ Failed to load existing {view_name}: {e}")
-
-        # 视图类型映射
-        view_type_map = {
-            "wide": AssetType.ENVIRONMENT_WIDE,
-            "detail": AssetType.ENVIRONMENT_DETAIL,
-            "alt": AssetType.ENVIRONMENT_ALT
-        }
+                    log.warning("   ⚠️ Failed to load existing %s: %s", view_name, e)
 
-        view_names_cn = {
-            "wide": "Wide Shot (全景)",
-            "detail": "Detail View (细节)",
-            "alt": "Alt Angle (备选角度)"
-        }
+        return await self._generate_environment_views(
+            anchor_id=anchor_id,
+            anchor_name=anchor_name,
+            detailed_description=detailed_description,
+            atmospheric_conditions=atmospheric_conditions,
+            style_adaptation=style_adaptation,
+            visual_style=visual_style,
+            view_names=[v for v in ["wide", "detail", "alt"] if v in views_to_generate],
+            reference_images=reference_images,
+            wide_image=existing_images.get("wide"),
+            on_progress=on_progress
+        )
 
-        # 按顺序生成（wide -> detail -> alt）
-        ordered_views = ["wide", "detail", "alt"]
-        wide_image = existing_images.get("wide")
+    async def _generate_environment_views(
+        self,
+        anchor_id: str,
+        anchor_name: str,
+        detailed_description: str,
+        atmospheric_conditions: str,
+        style_adaptation: str,
+        view_names: List[str],
+        reference_images: List[ReferenceImage],
+        visual_style: Dict[str, str] = None,
+        wide_image: Optional[ReferenceImage] = None,
+        on_progress: callable = None,
+        skip_if_exists: bool = False
+    ) -> Dict[str, GeneratedAsset]:
+        """
+        生成环境视图：先生成 wide，detail / alt 只依赖 wide（不互相依赖），随后并发请求
 
-        for view_name in ordered_views:
-            if view_name not in views_to_generate:
-                continue
+        Args:
+            view_names: 要生成的视图（wide / detail / alt 的子集，按此顺序）
+            reference_images: 用户参考图
+            wide_image: 已存在的全景图（不重新生成 wide 时作为参考）
 
-            view = view_type_map[view_name]
-            self.generation_status[f"{anchor_id}_{view_name}"] = AssetStatus.GENERATING
+        Returns:
+            {view_name: GeneratedAsset}
+        """
+        results = {}
 
-            if on_progress:
-                on_progress(anchor_id, view_name, "GENERATING")
+        async def run_view(view_name: str) -> Optional[GeneratedImage]:
+            view = _ENV_VIEW_TYPES[view_name]
+            self._begin_view(anchor_id, view_name, on_progress)
 
-            print(f"   🏞️ Generating {anchor_name} - {view_names_cn[view_name]}...")
+            log.info("   🏞️ Generating %s - %s...", anchor_name, _ENV_VIEW_LABELS[view])
 
             # 构建 prompt
             prompt = self._build_environment_view_prompt(
@@ -806,43 +1430,23 @@ Technical requirements:
                 refs.append(wide_image)
 
             # 生成图片
-            image, error = self._generate_image_sync(prompt, refs)
+            file_path = self.assets_dir / f"{anchor_id}_{view_name}{self.ASSET_EXT}"
+            image, error = await self._produce_view(file_path, prompt, refs, skip_if_exists)
 
-            if image and not error:
-                file_name = f"{anchor_id}_{view_name}.png"
-                file_path = self.assets_dir / file_name
-                image.save(file_path, "PNG")
+            results[view_name] = self._finish_view(
+                anchor_id, view_name, view, file_path, image, error, on_progress
+            )
+            return image if results[view_name].status == AssetStatus.SUCCESS else None
 
+        if "wide" in view_names:
+            image = await run_view("wide")
+            if image:
                 # 保存全景图供后续参考
-                if view == AssetType.ENVIRONMENT_WIDE:
-                    wide_image = image
-
-                results[view_name] = GeneratedAsset(
-                    anchor_id=anchor_id,
-                    asset_type=view,
-                    file_path=str(file_path),
-                    status=AssetStatus.SUCCESS
-                )
-                self.generation_status[f"{anchor_id}_{view_name}"] = AssetStatus.SUCCESS
-                print(f"   ✅ Saved: {file_path}")
-
-                if on_progress:
-                    on_progress(anchor_id, view_name, "SUCCESS", str(file_path))
-            else:
-                results[view_name] = GeneratedAsset(
-                    anchor_id=anchor_id,
-                    asset_type=view,
-                    file_path=None,
-                    status=AssetStatus.FAILED,
-                    error_message=error
-                )
-                self.generation_status[f"{anchor_id}_{view_name}"] = AssetStatus.FAILED
-                print(f"   ❌ Failed: {error}")
-
-                if on_progress:
-                    on_progress(anchor_id, view_name, "FAILED", None, error)
+                wide_image = image
+        await asyncio.gather(*(run_view(v) for v in view_names if v != "wide"))
 
-        return results
+        # 按 wide -> detail -> alt 顺序返回
+        return {v: results[v] for v in view_names}
 
     def generate_environment_assets(
         self,
@@ -852,7 +1456,8 @@ Technical requirements:
         atmospheric_conditions: str = "",
         style_adaptation: str = "",
         user_reference_path: str = None,
-        on_progress: callable = None
+        on_progress: callable = None,
+        skip_if_exists: bool = False
     ) -> Dict[str, GeneratedAsset]:
         """
         生成环境/场景三视图资产（Wide Shot / Detail View / Alt Angle）
@@ -865,99 +1470,56 @@ Technical requirements:
             style_adaptation: 风格适配
             user_reference_path: 用户上传的参考图路径
             on_progress: 进度回调函数
+            skip_if_exists: 目标文件已存在（非空）时直接复用，不重新生成
 
         Returns:
             {view: GeneratedAsset} 三视图资产字典
         """
-        results = {}
+        return self.run_sync(self.generate_environment_assets_async(
+            anchor_id=anchor_id,
+            anchor_name=anchor_name,
+            detailed_description=detailed_description,
+            atmospheric_conditions=atmospheric_conditions,
+            style_adaptation=style_adaptation,
+            user_reference_path=user_reference_path,
+            on_progress=on_progress,
+            skip_if_exists=skip_if_exists
+        ))
+
+    async def generate_environment_assets_async(
+        self,
+        anchor_id: str,
+        anchor_name: str,
+        detailed_description: str,
+        atmospheric_conditions: str = "",
+        style_adaptation: str = "",
+        user_reference_path: str = None,
+        on_progress: callable = None,
+        skip_if_exists: bool = False
+    ) -> Dict[str, GeneratedAsset]:
+        """generate_environment_assets 的异步实现"""
         reference_images = []
 
         # 加载用户参考图（如果有）
         if user_reference_path and os.path.exists(user_reference_path):
             try:
-                user_ref = Image.open(user_reference_path)
+                user_ref = await asyncio.to_thread(_load_image, user_reference_path)
                 reference_images.append(user_ref)
-                print(f"   📷 Loaded user reference image: {user_reference_path}")
+                log.info("   📷 Loaded user reference image: %s", user_reference_path)
             except Exception as e:
-                print(f"   ⚠️ Failed to load reference image: {e}")
-
-        # 生成三视图
-        views = [
-            AssetType.ENVIRONMENT_WIDE,
-            AssetType.ENVIRONMENT_DETAIL,
-            AssetType.ENVIRONMENT_ALT
-        ]
-
-        view_names_cn = {
-            AssetType.ENVIRONMENT_WIDE: "Wide Shot (全景)",
-            AssetType.ENVIRONMENT_DETAIL: "Detail View (细节)",
-            AssetType.ENVIRONMENT_ALT: "Alt Angle (备选角度)"
-        }
-
-        wide_image = None  # 用于后续视图的参考保持一致性
-
-        for i, view in enumerate(views):
-            view_name = view.value
-            self.generation_status[f"{anchor_id}_{view_name}"] = AssetStatus.GENERATING
-
-            if on_progress:
-                on_progress(anchor_id, view_name, "GENERATING")
-
-            print(f"   🏞️ Generating {anchor_name} - {view_names_cn[view]} ({i+1}/3)...")
-
-            # 构建 prompt
-            prompt = self._build_environment_view_prompt(
-                view=view,
-                detailed_description=detailed_description,
-                anchor_name=anchor_name,
-                atmospheric_conditions=atmospheric_conditions,
-                style_adaptation=style_adaptation
-            )
-
-            # 准备参考图片 - use wide shot as reference to maintain location consistency
-            refs_for_this_view = reference_images.copy()
-            if wide_image and view != AssetType.ENVIRONMENT_WIDE:
-                refs_for_this_view.append(wide_image)
-
-            # 生成图片
-            image, error = self._generate_image_sync(prompt, refs_for_this_view)
-
-            if image and not error:
-                # 保存图片
-                file_name = f"{anchor_id}_{view_name}.png"
-                file_path = self.assets_dir / file_name
-                image.save(file_path, "PNG")
-
-                # 保存全景图供后续参考
-                if view == AssetType.ENVIRONMENT_WIDE:
-                    wide_image = image
-
-                results[view_name] = GeneratedAsset(
-                    anchor_id=anchor_id,
-                    asset_type=view,
-                    file_path=str(file_path),
-                    status=AssetStatus.SUCCESS
-                )
-                self.generation_status[f"{anchor_id}_{view_name}"] = AssetStatus.SUCCESS
-                print(f"   ✅ Saved: {file_path}")
-
-                if on_progress:
-                    on_progress(anchor_id, view_name, "SUCCESS", str(file_path))
-            else:
-                results[view_name] = GeneratedAsset(
-                    anchor_id=anchor_id,
-                    asset_type=view,
-                    file_path=None,
-                    status=AssetStatus.FAILED,
-                    error_message=error
-                )
-                self.generation_status[f"{anchor_id}_{view_name}"] = AssetStatus.FAILED
-                print(f"   ❌ Failed: {error}")
-
-                if on_progress:
-                    on_progress(anchor_id, view_name, "FAILED", None, error)
+                log.warning("   ⚠️ Failed to load reference image: %s", e)
 
-        return results
+        return await self._generate_environment_views(
+            anchor_id=anchor_id,
+            anchor_name=anchor_name,
+            detailed_description=detailed_description,
+            atmospheric_conditions=atmospheric_conditions,
+            style_adaptation=style_adaptation,
+            view_names=["wide", "detail", "alt"],
+            reference_images=reference_images,
+            on_progress=on_progress,
+            skip_if_exists=skip_if_exists
+        )
 
     def generate_environment_asset(
         self,
@@ -966,7 +1528,8 @@ Technical requirements:
         detailed_description: str,
         atmospheric_conditions: str = "",
         style_adaptation: str = "",
-        on_progress: callable = None
+        on_progress: callable = None,
+        skip_if_exists: bool = False
     ) -> GeneratedAsset:
         """
         生成环境参考图
@@ -978,17 +1541,36 @@ Technical requirements:
             atmospheric_conditions: 大气条件
             style_adaptation: 风格适配
             on_progress: 进度回调
+            skip_if_exists: 目标文件已存在（非空）时直接复用，不重新生成
 
         Returns:
             GeneratedAsset
         """
-        view_name = AssetType.ENVIRONMENT.value
-        self.generation_status[f"{anchor_id}_{view_name}"] = AssetStatus.GENERATING
+        return self.run_sync(self.generate_environment_asset_async(
+            anchor_id=anchor_id,
+            anchor_name=anchor_name,
+            detailed_description=detailed_description,
+            atmospheric_conditions=atmospheric_conditions,
+            style_adaptation=style_adaptation,
+            on_progress=on_progress,
+            skip_if_exists=skip_if_exists
+        ))
 
-        if on_progress:
-            on_progress(anchor_id, view_name, "GENERATING")
+    async def generate_environment_asset_async(
+        self,
+        anchor_id: str,
+        anchor_name: str,
+        detailed_description: str,
+        atmospheric_conditions: str = "",
+        style_adaptation: str = "",
+        on_progress: callable = None,
+        skip_if_exists: bool = False
+    ) -> GeneratedAsset:
+        """generate_environment_asset 的异步实现"""
+        view_name = AssetType.ENVIRONMENT.value
+        self._begin_view(anchor_id, view_name, on_progress)
 
-        print(f"   🏞️ Generating environment: {anchor_name}...")
+        log.info("   🏞️ Generating environment: %s...", anchor_name)
 
         # 构建 prompt
         prompt = self._build_environment_prompt(
@@ -999,65 +1581,93 @@ Technical requirements:
         )
 
         # 生成图片（环境图不需要参考图）
-        image, error = self._generate_image_sync(prompt)
+        file_path = self.assets_dir / f"{anchor_id}_{view_name}{self.ASSET_EXT}"
+        image, error = await self._produce_view(file_path, prompt, skip_if_exists=skip_if_exists)
 
-        if image and not error:
-            file_name = f"{anchor_id}_{view_name}.png"
-            file_path = self.assets_dir / file_name
-            image.save(file_path, "PNG")
+        return self._finish_view(
+            anchor_id, view_name, AssetType.ENVIRONMENT, file_path, image, error, on_progress
+        )
 
-            result = GeneratedAsset(
-                anchor_id=anchor_id,
-                asset_type=AssetType.ENVIRONMENT,
-                file_path=str(file_path),
-                status=AssetStatus.SUCCESS
-            )
-            self.generation_status[f"{anchor_id}_{view_name}"] = AssetStatus.SUCCESS
-            print(f"   ✅ Saved: {file_path}")
+    async def generate_many(
+        self,
+        specs: List[Dict[str, Any]],
+        concurrency: int = None
+    ) -> List[Any]:
+        """
+        并发生成多个锚点的资产：锚点之间并行，锚点内部有依赖的视图按依赖顺序生成；
+        实际同时进行的 Gemini 请求数另由 GEMINI_CONCURRENCY 统一限制
 
-            if on_progress:
-                on_progress(anchor_id, view_name, "SUCCESS", str(file_path))
+        Args:
+            specs: [{"kind": "character" | "environment" | "character_views" | "environment_views"
+                     | "environment_assets" | "product_views", **参数}]
+                   kind 对应 generate_character_assets / generate_environment_asset /
+                   generate_character_views_selective / generate_environment_views_selective /
+                   generate_environment_assets / generate_product_views
+            concurrency: 同时处理的锚点数，默认 ANCHOR_CONCURRENCY
 
-            return result
-        else:
-            result = GeneratedAsset(
-                anchor_id=anchor_id,
-                asset_type=AssetType.ENVIRONMENT,
-                file_path=None,
-                status=AssetStatus.FAILED,
-                error_message=error
-            )
-            self.generation_status[f"{anchor_id}_{view_name}"] = AssetStatus.FAILED
-            print(f"   ❌ Failed: {error}")
+        Returns:
+            与 specs 顺序一致的生成结果列表
+        """
+        runners = {
+            "character": self.generate_character_assets_async,
+            "environment": self.generate_environment_asset_async,
+            "character_views": self.generate_character_views_selective_async,
+            "environment_views": self.generate_environment_views_selective_async,
+            "environment_assets": self.generate_environment_assets_async,
+            "product_views": self.generate_product_views_async,
+        }
+        sem = asyncio.Semaphore(concurrency or self.ANCHOR_CONCURRENCY)
 
-            if on_progress:
-                on_progress(anchor_id, view_name, "FAILED", None, error)
+        async def _one(spec: Dict[str, Any]):
+            kwargs = dict(spec)
+            runner = runners[kwargs.pop("kind")]
+            async with sem:
+                return await runner(**kwargs)
 
-            return result
+        return await asyncio.gather(*(_one(spec) for spec in specs))
 
     def get_generation_status(self) -> Dict[str, str]:
         """获取所有资产的生成状态"""
-        return {k: v.value for k, v in self.generation_status.items()}
+        return self.generation_status.copy()
+
+    def _index_asset(self, anchor_id: str, view: str, file_path: Path) -> None:
+        """资产写入后更新路径索引（索引尚未建立时由首次扫描覆盖）"""
+        if self._path_index is not None:
+            self._path_index.setdefault(anchor_id, {})[view] = str(file_path)
 
     def get_asset_paths(self) -> Dict[str, Dict[str, str]]:
         """
-        获取所有已生成资产的路径
+        获取所有已生成资产的路径（assets 目录 mtime 未变时读内存索引，否则重新扫描）
 
         Returns:
-            {anchor_id: {view: path}}
+            {anchor_id: {view: path}}，目录不存在时返回空字典
         """
+        try:
+            mtime = self.assets_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._path_index = None
+            return {}
+        if self._path_index is None or mtime != self._path_index_mtime:
+            # 先记录 mtime 再扫描：扫描期间的新写入会在下次调用时触发重扫
+            self._path_index_mtime = mtime
+            try:
+                self._path_index = self._scan_asset_paths()
+            except FileNotFoundError:
+                self._path_index = None
+                return {}
+        return {anchor_id: dict(views) for anchor_id, views in list(self._path_index.items())}
+
+    def _scan_asset_paths(self) -> Dict[str, Dict[str, str]]:
+        """扫描 assets 目录，按文件名建立 {anchor_id: {view: path}}"""
         paths = {}
 
-        for file_path in self.assets_dir.glob("*.png"):
+        for file_path in self.assets_dir.iterdir():
+            if file_path.suffix.lower() not in _ASSET_SUFFIXES:
+                continue
             # 解析文件名: char_01_front.png -> anchor_id=char_01, view=front
-            parts = file_path.stem.rsplit("_", 1)
-            if len(parts) == 2:
-                anchor_id = parts[0]
-                view = parts[1]
-
-                if anchor_id not in paths:
-                    paths[anchor_id] = {}
-                paths[anchor_id][view] = str(file_path)
+            m = _ASSET_STEM_RE.match(file_path.stem)
+            if m:
+                paths.setdefault(m.group(1), {})[m.group(2)] = str(file_path)
 
         return paths
 
@@ -1075,30 +1685,11 @@ Technical requirements:
             description: 产品描述
             name: 产品名称
         """
-        view_instructions = {
-            "front": "front view, product facing directly toward camera, centered composition",
-            "side": "side profile view, product rotated 90 degrees, same product as reference",
-            "back": "back view, product facing away from camera, showing rear details, same product as reference"
-        }
-
-        prompt = f"""Professional product photography, {view_instructions.get(view, view_instructions['front'])}.
-
-Product: {name}
-{description}
-
-Technical requirements:
-- Clean white/light gray studio background
-- Professional three-point lighting with soft shadows
-- Same lighting setup across all views
-- High detail, sharp focus
-- Product centered in frame
-- No text, no watermarks, no logos
-- Consistent scale and proportions across all views
-- 16:9 widescreen composition
-- E-commerce quality product shot
-- Subtle reflection on surface for premium look
-"""
-        return prompt.strip()
+        return _PRODUCT_PROMPT_TEMPLATE.format(
+            view_instruction=_PRODUCT_VIEW_INSTRUCTIONS.get(view, _PRODUCT_VIEW_INSTRUCTIONS["front"]),
+            name=name,
+            description=description
+        )
 
     def generate_product_views(
         self,
@@ -1106,7 +1697,8 @@ Technical requirements:
         name: str,
         description: str,
         output_dir: str = None,
-        on_progress: callable = None
+        on_progress: callable = None,
+        skip_if_exists: bool = False
     ) -> Dict[str, Optional[str]]:
         """
         生成产品三视图资产
@@ -1117,10 +1709,30 @@ Technical requirements:
             description: 产品描述
             output_dir: 输出目录 (如果为 None，使用默认 assets 目录)
             on_progress: 进度回调
+            skip_if_exists: 目标文件已存在（非空）时直接复用，不重新生成
 
         Returns:
             {view: file_path} 三视图路径字典
         """
+        return self.run_sync(self.generate_product_views_async(
+            product_id=product_id,
+            name=name,
+            description=description,
+            output_dir=output_dir,
+            on_progress=on_progress,
+            skip_if_exists=skip_if_exists
+        ))
+
+    async def generate_product_views_async(
+        self,
+        product_id: str,
+        name: str,
+        description: str,
+        output_dir: str = None,
+        on_progress: callable = None,
+        skip_if_exists: bool = False
+    ) -> Dict[str, Optional[str]]:
+        """generate_product_views 的异步实现：先生成 front，side / back 以 front 为参考并发生成"""
         if output_dir:
             save_dir = Path(output_dir)
         else:
@@ -1129,16 +1741,12 @@ Technical requirements:
         save_dir.mkdir(parents=True, exist_ok=True)
 
         results = {}
-        views = ["front", "side", "back"]
         front_image = None
 
-        for i, view in enumerate(views):
-            self.generation_status[f"{product_id}_{view}"] = AssetStatus.GENERATING
-
-            if on_progress:
-                on_progress(product_id, view, "GENERATING")
+        async def run_view(view: str) -> Optional[GeneratedImage]:
+            self._begin_view(product_id, view, on_progress)
 
-            print(f"   📦 Generating {name} - {view} view ({i+1}/3)...")
+            log.info("   📦 Generating %s - %s view...", name, view)
 
             # Build prompt
             prompt = self._build_product_prompt(
@@ -1148,43 +1756,30 @@ Technical requirements:
             )
 
             # Prepare reference images
-            refs = []
-            if front_image and view != "front":
-                refs.append(front_image)
+            refs = [front_image] if front_image and view != "front" else None
 
             # Generate image
-            image, error = self._generate_image_sync(prompt, refs if refs else None)
-
-            if image and not error:
-                file_name = f"{view}.png"
-                file_path = save_dir / file_name
-                image.save(file_path, "PNG")
+            file_path = save_dir / f"{view}{self.ASSET_EXT}"
+            image, error = await self._produce_view(file_path, prompt, refs, skip_if_exists)
 
-                # Save front image for reference
-                if view == "front":
-                    front_image = image
-
-                results[view] = str(file_path)
-                self.generation_status[f"{product_id}_{view}"] = AssetStatus.SUCCESS
-                print(f"   ✅ Saved: {file_path}")
-
-                if on_progress:
-                    on_progress(product_id, view, "SUCCESS", str(file_path))
-            else:
-                results[view] = None
-                self.generation_status[f"{product_id}_{view}"] = AssetStatus.FAILED
-                print(f"   ❌ Failed: {error}")
+            asset = self._finish_view(
+                product_id, view, AssetType(view), file_path, image, error, on_progress, index=False
+            )
+            results[view] = asset.file_path
+            return image if asset.status == AssetStatus.SUCCESS else None
 
-                if on_progress:
-                    on_progress(product_id, view, "FAILED", None, error)
+        # Save front image for reference
+        front_image = await run_view("front")
+        await asyncio.gather(run_view("side"), run_view("back"))
 
-        return results
+        return {view: results[view] for view in ("front", "side", "back")}
 
 
 def generate_product_views_with_imagen(
     description: str,
     output_dir: str,
-    name: str = "Product"
+    name: str = "Product",
+    skip_if_exists: bool = False
 ) -> Dict[str, bool]:
     """
     独立函数：使用 Imagen 生成产品三视图
@@ -1193,61 +1788,23 @@ def generate_product_views_with_imagen(
         description: 产品描述
         output_dir: 输出目录
         name: 产品名称
+        skip_if_exists: 目标文件已存在（非空）时直接复用，不重新生成
 
     Returns:
         {view: success} 每个视图是否生成成功
     """
-    # Create a temporary generator
-    generator = AssetGenerator.__new__(AssetGenerator)
-    generator.generation_status = {}
-
-    # Initialize client
     try:
-        from google import genai
-        from google.genai import types
-
-        api_key = os.environ.get("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY environment variable not set")
-        # Sanitize API key to remove non-ASCII characters (fixes encoding errors in HTTP headers)
-        api_key = api_key.strip()
-        api_key = ''.join(c for c in api_key if c.isascii() and c.isprintable())
-
-        generator.client = genai.Client(api_key=api_key)
-        generator.types = types
+        generator = AssetGenerator.standalone()
     except Exception as e:
-        print(f"❌ Failed to initialize Gemini client: {e}")
+        log.error("❌ Failed to initialize Gemini client: %s", e)
         return {"front": False, "side": False, "back": False}
 
     # Generate views
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
-
-    results = {"front": False, "side": False, "back": False}
-    views = ["front", "side", "back"]
-    front_image = None
-
-    for view in views:
-        print(f"   📦 Generating product - {view} view...")
-
-        prompt = generator._build_product_prompt(
-            view=view,
-            description=description,
-            name=name
-        )
-
-        refs = [front_image] if front_image and view != "front" else None
-        image, error = generator._generate_image_sync(prompt, refs)
-
-        if image and not error:
-            file_path = output_path / f"{view}.png"
-            image.save(file_path, "PNG")
-            results[view] = True
-            print(f"   ✅ Saved: {file_path}")
-
-            if view == "front":
-                front_image = image
-        else:
-            print(f"   ❌ Failed: {error}")
-
-    return results
+    paths = generator.generate_product_views(
+        product_id=name,
+        name=name,
+        description=description,
+        output_dir=output_dir,
+        skip_if_exists=skip_if_exists
+    )
+    return {view: path is not None for view, path in paths.items()}
@@ -5,7 +5,10 @@ Film IR 读写模块
 负责 film_ir.json 的持久化读写操作。
 """
 
-import json
+import os
+import tempfile
+
+import orjson
 from pathlib import Path
 from typing import Dict, Any, Optional
 from datetime import datetime
@@ -13,6 +16,10 @@ from datetime import datetime
 from core.film_ir_schema import create_empty_film_ir
 
 
+# 缺省嵌套字段的共享空字典（只读）
+_EMPTY: Dict[str, Any] = {}
+
+
 def get_film_ir_path(job_dir: Path) -> Path:
     """获取 film_ir.json 路径"""
     return job_dir / "film_ir.json"
@@ -30,15 +37,14 @@ def load_film_ir(job_dir: Path) -> Dict[str, Any]:
     """
     ir_path = get_film_ir_path(job_dir)
 
-    if not ir_path.exists():
+    # 直接读取，不存在时再回退（省去单独的 exists 检查）
+    try:
+        return orjson.loads(ir_path.read_bytes())
+    except FileNotFoundError:
         # 尝试从 job_id 推断
         job_id = job_dir.name
         return create_empty_film_ir(job_id)
-
-    try:
-        with open(ir_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         print(f"⚠️ Film IR 解析失败: {e}")
         job_id = job_dir.name
         return create_empty_film_ir(job_id)
@@ -48,6 +54,9 @@ def save_film_ir(job_dir: Path, ir: Dict[str, Any]) -> None:
     """
     保存 Film IR
 
+    原子写入：序列化为 bytes 后写入同目录临时文件并 fsync，再 rename 覆盖，
+    读取方不会看到写了一半的文件
+
     Args:
         job_dir: 作业目录路径
         ir: Film IR 字典
@@ -60,8 +69,23 @@ def save_film_ir(job_dir: Path, ir: Dict[str, Any]) -> None:
     # 确保目录存在
     job_dir.mkdir(parents=True, exist_ok=True)
 
-    with open(ir_path, "w", encoding="utf-8") as f:
-        json.dump(ir, f, ensure_ascii=False, indent=2)
+    content = orjson.dumps(
+        ir, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+    )
+
+    # 每次写入使用独立临时文件，并发保存互不覆盖
+    fd, temp_name = tempfile.mkstemp(dir=job_dir, prefix="film_ir.", suffix=".json.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            os.fchmod(f.fileno(), 0o644)  # mkstemp 默认 0600
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        # replace 是原子操作（同一文件系统，覆盖已存在的目标）
+        os.replace(temp_name, ir_path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
 
 
 def film_ir_exists(job_dir: Path) -> bool:
@@ -223,7 +247,13 @@ def convert_to_frontend_storyboard(ir: Dict[str, Any], base_url: str = "") -> li
     job_id = ir.get("jobId", "")
     result = []
 
+    asset_prefix = f"{base_url}/assets/{job_id}/" if base_url else None
+
     for shot in data["shots"]:
+        # 每个镜头的嵌套字典只取一次
+        camera = shot.get("camera") or _EMPTY
+        audio = shot.get("audio") or _EMPTY
+
         # 构建前端格式
         frontend_shot = {
             "shotNumber": int(shot["shotId"].replace("shot_", "")),
@@ -233,19 +263,19 @@ def convert_to_frontend_storyboard(ir: Dict[str, Any], base_url: str = "") -> li
             "startSeconds": _time_to_seconds(shot.get("startTime", "0")),
             "endSeconds": _time_to_seconds(shot.get("endTime", "0")),
             "durationSeconds": shot.get("durationSeconds", 0),
-            "shotSize": shot.get("camera", {}).get("shotSize", ""),
-            "cameraAngle": shot.get("camera", {}).get("cameraAngle", ""),
-            "cameraMovement": shot.get("camera", {}).get("cameraMovement", ""),
-            "focalLengthDepth": shot.get("camera", {}).get("focalLengthDepth", ""),
+            "shotSize": camera.get("shotSize", ""),
+            "cameraAngle": camera.get("cameraAngle", ""),
+            "cameraMovement": camera.get("cameraMovement", ""),
+            "focalLengthDepth": camera.get("focalLengthDepth", ""),
             "lighting": shot.get("lighting", ""),
-            "music": shot.get("audio", {}).get("music", ""),
-            "dialogueVoiceover": shot.get("audio", {}).get("dialogue", "")
+            "music": audio.get("music", ""),
+            "dialogueVoiceover": audio.get("dialogue", "")
         }
 
         # 处理资产路径
-        assets = shot.get("assets", {})
-        if assets.get("firstFrame") and base_url:
-            frontend_shot["firstFrameImage"] = f"{base_url}/assets/{job_id}/{assets['firstFrame']}"
+        first_frame = (shot.get("assets") or _EMPTY).get("firstFrame")
+        if first_frame and asset_prefix:
+            frontend_shot["firstFrameImage"] = asset_prefix + first_frame
 
         result.append(frontend_shot)
 
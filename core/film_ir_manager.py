@@ -15,15 +15,32 @@ Film IR Manager
 
 import os
 import json
+import logging
+import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 from datetime import datetime
+from functools import lru_cache
 
+import orjson
 from google import genai
 from google.genai import types
 
 
+# Film IR 流程日志：handler 和级别由入口（app.py）统一配置
+log = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=8)
+def _get_genai_client(api_key: str):
+    """按 API key 复用 Gemini 客户端（及其 HTTP 连接池），各阶段 / 各分析调用共享"""
+    return genai.Client(api_key=api_key)
+
+
 def gemini_call_with_retry(client, model: str, contents: list, config=None, max_retries: int = 2, base_delay: float = 5.0):
     """
     带重试和自动降级的 Gemini API 调用
@@ -72,7 +89,7 @@ def gemini_call_with_retry(client, model: str, contents: list, config=None, max_
             if "503" in error_str or "overloaded" in error_str.lower() or "429" in error_str:
                 if attempt < max_retries:
                     delay = base_delay * (2 ** attempt)  # 指数退避: 5s, 10s
-                    print(f"   ⏳ {current_model} overloaded, retrying in {delay:.0f}s... (attempt {attempt + 1}/{max_retries})")
+                    log.info("   ⏳ %s overloaded, retrying in %.0fs... (attempt %s/%s)", current_model, delay, attempt + 1, max_retries)
                     time.sleep(delay)
                     continue
                 else:
@@ -84,7 +101,7 @@ def gemini_call_with_retry(client, model: str, contents: list, config=None, max_
 
     # 第二轮：降级到备用模型
     if fallback_model and fallback_model != model:
-        print(f"   🔄 Falling back to {fallback_model}...")
+        log.info("   🔄 Falling back to %s...", fallback_model)
         try:
             if config:
                 response = client.models.generate_content(
@@ -97,16 +114,46 @@ def gemini_call_with_retry(client, model: str, contents: list, config=None, max_
                     model=fallback_model,
                     contents=contents
                 )
-            print(f"   ✅ Fallback to {fallback_model} succeeded")
+            log.info("   ✅ Fallback to %s succeeded", fallback_model)
             return response
         except Exception as e:
-            print(f"   ❌ Fallback also failed: {e}")
+            log.error("   ❌ Fallback also failed: %s", e)
             # 降级也失败，抛出原始错误
             raise last_error
 
     # 无法降级，抛出原始错误
     raise last_error
 
+
+def wait_for_file_processing(client, uploaded_file, timeout: float = 600.0,
+                             initial_delay: float = 0.3, max_delay: float = 5.0):
+    """
+    等待 Gemini Files API 文件离开 PROCESSING 状态
+
+    指数退避轮询 (0.3s 起，×1.6，上限 5s，带少量抖动)：短视频很快就绪时不必多等，
+    长视频处理时也不会频繁请求 API
+
+    Args:
+        client: Gemini 客户端
+        uploaded_file: files.upload / files.get 返回的文件对象
+        timeout: 最长等待时间（秒）
+
+    Returns:
+        最新的文件对象（状态可能是 ACTIVE 或 FAILED，由调用方判断）
+    """
+    delay = initial_delay
+    deadline = time.monotonic() + timeout
+    if uploaded_file.state.name == "PROCESSING":
+        log.info("⏳ Waiting for video processing...")
+    while uploaded_file.state.name == "PROCESSING":
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Video processing timed out after {timeout:.0f}s: {uploaded_file.name}")
+        time.sleep(delay + random.uniform(0, delay * 0.1))
+        delay = min(delay * 1.6, max_delay)
+        uploaded_file = client.files.get(name=uploaded_file.name)
+    return uploaded_file
+
+from core import llm_cache
 from core.film_ir_schema import create_empty_film_ir, StageStatus
 from core.film_ir_io import (
     load_film_ir, save_film_ir, film_ir_exists,
@@ -162,6 +209,58 @@ from core.meta_prompts import (
     post_process_remixed_layer
 )
 
+# 已上传到 Gemini Files API 的视频：(路径, mtime_ns, 大小) -> (文件名, API key)
+# 进程内跨阶段 / 跨 FilmIRManager 实例复用（如重试降级批次），避免重复上传和等待 PROCESSING
+_uploaded_videos: Dict[tuple, tuple] = {}
+_uploaded_videos_lock = threading.Lock()
+
+# 阶段 -> 直接前置阶段 (必须为 SUCCESS)
+_STAGE_DEPENDENCIES: Dict[str, tuple] = {
+    "specificAnalysis": (),
+    "abstraction": ("specificAnalysis",),
+    # intentInjection 依赖 specificAnalysis (已包含 abstract 提取)
+    # 跳过 abstraction placeholder，直接从 specificAnalysis 获取 abstract 数据
+    "intentInjection": ("specificAnalysis",),
+    "assetGeneration": ("intentInjection",),
+    "shotRefinement": ("assetGeneration",),
+    "execution": ("shotRefinement",),
+}
+
+# 支柱 I-III 的数据层
+_PILLAR_LAYERS = frozenset({"concrete", "abstract", "remixed"})
+
+# set_meta_prompt 可设置的 Meta Prompt 键
+_META_PROMPT_KEYS = frozenset({
+    "storyThemeAnalysis", "narrativeExtraction", "shotDecomposition",
+    "abstractionEngine", "intentFusion",
+    "characterAnchorGen", "environmentAnchorGen",
+    "t2iPromptComposer", "i2vPromptComposer",
+})
+
+# Stage 1.1 / 1.2 的 Prompt 与视频无关，导入时一次性替换 {input_content} 占位符
+_STORY_THEME_PROMPT = STORY_THEME_ANALYSIS_PROMPT.replace(
+    "{input_content}",
+    "[Video file attached - analyze the visual and audio content]"
+)
+_NARRATIVE_PROMPT = NARRATIVE_EXTRACTION_PROMPT.replace(
+    "{input_content}",
+    "[Video file attached - analyze the narrative structure, characters, and story arc]"
+)
+
+# Stage 1 用到的全部 Meta Prompt 的内容哈希；prompt 改动后阶段指纹随之变化
+_SPECIFIC_ANALYSIS_PROMPTS_KEY = llm_cache.content_key(
+    STORY_THEME_ANALYSIS_PROMPT,
+    NARRATIVE_EXTRACTION_PROMPT,
+    SHOT_DECOMPOSITION_PROMPT,
+    SHOT_DETECTION_PROMPT,
+    SHOT_DETAIL_BATCH_PROMPT,
+    CHARACTER_DISCOVERY_PROMPT,
+    CHARACTER_PRESENCE_AUDIT_PROMPT,
+    CHARACTER_BATCH_AUDIT_PROMPT,
+    SURGICAL_RECHECK_PROMPT,
+    ENVIRONMENT_EXTRACTION_PROMPT,
+)
+
 
 class FilmIRManager:
     """
@@ -175,6 +274,16 @@ class FilmIRManager:
         manager.run_stage("assetGeneration")
     """
 
+    # 阶段名 -> 实现方法名
+    _STAGE_HANDLERS = {
+        "specificAnalysis": "_run_specific_analysis",
+        "abstraction": "_run_abstraction",
+        "intentInjection": "_run_intent_injection",
+        "assetGeneration": "_run_asset_generation",
+        "shotRefinement": "_run_shot_refinement",
+        "execution": "_run_execution",
+    }
+
     def __init__(self, job_id: str, project_root: Optional[Path] = None):
         """
         初始化 Film IR Manager
@@ -186,12 +295,17 @@ class FilmIRManager:
         self.project_dir = project_root or Path(__file__).parent.parent
         self.job_id = job_id
         self.job_dir = self.project_dir / "jobs" / job_id
+        # 分析结果缓存目录 (按 模型 + prompt + 视频内容哈希 命中)
+        self.llm_cache_dir = self.project_dir / ".llm_cache"
+        # run_stage(force=True) 期间不读分析缓存，重新调用 Gemini 并覆盖旧结果
+        self._bypass_llm_cache = False
 
-        # 加载或创建 Film IR
-        if film_ir_exists(self.job_dir):
-            self.ir = load_film_ir(self.job_dir)
-        else:
-            self.ir = create_empty_film_ir(job_id)
+        # 加载 Film IR；文件不存在时 load_film_ir 返回空结构
+        self.ir = load_film_ir(self.job_dir)
+
+        # 批量保存: _batched_saves() 期间 save() 只标记 dirty，退出时统一写一次
+        self._dirty = False
+        self._save_suspended = 0
 
     # ============================================================
     # 属性访问
@@ -217,14 +331,39 @@ class FilmIRManager:
         """获取源视频路径"""
         return self.ir.get("sourceVideo", "")
 
+    @property
+    def video_path(self) -> Optional[Path]:
+        """源视频完整路径；未设置 sourceVideo 时为 None"""
+        source = self.source_video
+        return self.job_dir / source if source else None
+
     # ============================================================
     # 持久化
     # ============================================================
 
     def save(self) -> None:
-        """保存 Film IR"""
+        """保存 Film IR（处于 _batched_saves() 中时延迟到批次结束）"""
+        if self._save_suspended:
+            self._dirty = True
+            return
+        self._flush_save()
+
+    def _flush_save(self) -> None:
+        """立即写入 film_ir.json"""
+        self._dirty = False
         save_film_ir(self.job_dir, self.ir)
 
+    @contextmanager
+    def _batched_saves(self):
+        """合并代码块内的多次 save() 为一次写盘（可嵌套）"""
+        self._save_suspended += 1
+        try:
+            yield
+        finally:
+            self._save_suspended -= 1
+            if self._save_suspended == 0 and self._dirty:
+                self._flush_save()
+
     def reload(self) -> None:
         """重新加载 Film IR"""
         self.ir = load_film_ir(self.job_dir)
@@ -256,22 +395,11 @@ class FilmIRManager:
         """
         stages = self.stages
 
-        dependencies = {
-            "specificAnalysis": [],
-            "abstraction": ["specificAnalysis"],
-            # intentInjection 依赖 specificAnalysis (已包含 abstract 提取)
-            # 跳过 abstraction placeholder，直接从 specificAnalysis 获取 abstract 数据
-            "intentInjection": ["specificAnalysis"],
-            "assetGeneration": ["intentInjection"],
-            "shotRefinement": ["assetGeneration"],
-            "execution": ["shotRefinement"]
-        }
-
-        if stage not in dependencies:
+        if stage not in _STAGE_DEPENDENCIES:
             return False, f"Unknown stage: {stage}"
 
         # 检查前置依赖
-        for dep in dependencies[stage]:
+        for dep in _STAGE_DEPENDENCIES[stage]:
             if stages.get(dep) != "SUCCESS":
                 return False, f"Dependency not met: {dep} must be SUCCESS"
 
@@ -282,12 +410,15 @@ class FilmIRManager:
 
         return True, "OK"
 
-    def run_stage(self, stage: str) -> Dict[str, Any]:
+    def run_stage(self, stage: str, force: bool = False) -> Dict[str, Any]:
         """
         运行指定阶段
 
+        阶段已 SUCCESS 且输入指纹未变时直接返回（cached=True），不重复调用 Gemini
+
         Args:
             stage: 阶段名
+            force: 忽略输入指纹和分析缓存，强制重新运行
 
         Returns:
             运行结果
@@ -296,35 +427,44 @@ class FilmIRManager:
         if not can_run:
             return {"status": "error", "reason": reason}
 
-        self.update_stage(stage, "RUNNING")
+        fingerprint = self._stage_fingerprint(stage)
+        fingerprints = self.ir.get("_cache", {}).get("stageFingerprints", {})
+        if (not force and fingerprint and self.stages.get(stage) == "SUCCESS"
+                and fingerprints.get(stage) == fingerprint):
+            log.info("♻️ Stage %s inputs unchanged, skipping", stage)
+            return {"status": "success", "message": f"Stage {stage} inputs unchanged", "cached": True}
 
-        try:
-            if stage == "specificAnalysis":
-                result = self._run_specific_analysis()
-            elif stage == "abstraction":
-                result = self._run_abstraction()
-            elif stage == "intentInjection":
-                result = self._run_intent_injection()
-            elif stage == "assetGeneration":
-                result = self._run_asset_generation()
-            elif stage == "shotRefinement":
-                result = self._run_shot_refinement()
-            elif stage == "execution":
-                result = self._run_execution()
-            else:
-                result = {"status": "error", "reason": f"Unknown stage: {stage}"}
+        self.update_stage(stage, "RUNNING")
 
-            if result.get("status") == "success":
-                self.update_stage(stage, "SUCCESS")
-            else:
-                self.update_stage(stage, "FAILED")
+        # RUNNING 立即落盘（前端轮询阶段状态）；阶段内的多次 save() 与最终状态合并为一次写入
+        with self._batched_saves():
+            self._bypass_llm_cache = force
+            try:
+                handler = self._STAGE_HANDLERS.get(stage)
+                if handler:
+                    result = getattr(self, handler)()
+                else:
+                    result = {"status": "error", "reason": f"Unknown stage: {stage}"}
+
+                if result.get("status") == "success":
+                    # 只有完整成功（无降级/跳过的步骤）才记录指纹，否则下次仍会重跑补全
+                    stage_fingerprints = self.ir.setdefault("_cache", {}).setdefault("stageFingerprints", {})
+                    if fingerprint and not result.get("incompleteSteps"):
+                        stage_fingerprints[stage] = fingerprint
+                    else:
+                        stage_fingerprints.pop(stage, None)
+                    self.update_stage(stage, "SUCCESS")
+                else:
+                    self.update_stage(stage, "FAILED")
 
-            return result
+                return result
 
-        except Exception as e:
-            self.update_stage(stage, "FAILED")
-            print(f"❌ Stage {stage} failed: {e}")
-            return {"status": "error", "reason": str(e)}
+            except Exception as e:
+                self.update_stage(stage, "FAILED")
+                log.error("❌ Stage %s failed: %s", stage, e)
+                return {"status": "error", "reason": str(e)}
+            finally:
+                self._bypass_llm_cache = False
 
     # ============================================================
     # 阶段实现 (预留接口，等待 Meta Prompts)
@@ -335,33 +475,47 @@ class FilmIRManager:
         阶段 1: 具体分析
         调用 Meta Prompts 提取四大支柱的 concrete 数据
 
-        优化: 视频只上传一次，三个分析复用同一个文件引用
+        优化: 视频只上传一次，三个分析复用同一个文件引用并发执行
         """
-        print(f"🔍 [Stage 1] Running specific analysis for {self.job_id}...")
+        log.info("🔍 [Stage 1] Running specific analysis for %s...", self.job_id)
 
         # 获取视频路径
-        video_path = self.job_dir / self.source_video
-        if not video_path.exists():
+        video_path = self.video_path
+        if video_path is None or not video_path.is_file():
             return {"status": "error", "reason": f"Video file not found: {video_path}"}
 
         # ============================================================
         # 🚀 统一上传视频 (只上传一次，三个分析复用)
         # ============================================================
-        print(f"📤 [Stage 1.0] Uploading video to Gemini (once for all analyses)...")
+        log.info("📤 [Stage 1.0] Uploading video to Gemini (once for all analyses)...")
         try:
             uploaded_file, client = self._upload_video_to_gemini(video_path)
-            print(f"✅ [Stage 1.0] Video uploaded and ready: {uploaded_file.name}")
+            log.info("✅ [Stage 1.0] Video uploaded and ready: %s", uploaded_file.name)
         except Exception as e:
-            print(f"❌ [Stage 1.0] Video upload failed: {e}")
+            log.error("❌ [Stage 1.0] Video upload failed: %s", e)
             return {"status": "error", "reason": f"Video upload failed: {e}"}
 
+        # 先在当前线程算好视频内容哈希（分析缓存键），避免并发的分析线程重复读整个视频
+        llm_cache.file_hash(video_path)
+
+        # 返回空结果 / 失败 / 有降级的非阻塞步骤，阶段仍算成功但不记录输入指纹
+        incomplete_steps = []
+
+        # Story Theme / Narrative / Shot Recipe 三个分析互不依赖（只共用已上传的视频），并发请求；
+        # 结果仍在当前线程按顺序写入 Film IR，无需加锁
+        executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="film-ir-analysis")
+        story_theme_future = executor.submit(self._analyze_story_theme, uploaded_file, client)
+        narrative_future = executor.submit(self._analyze_narrative, uploaded_file, client)
+        shot_recipe_future = executor.submit(self._analyze_shot_recipe, uploaded_file, client)
+        executor.shutdown(wait=False)
+
         # ============================================================
         # Step 1: Story Theme Analysis (支柱 I) - Concrete + Abstract 融合输出
         # ============================================================
-        print(f"📊 [Stage 1.1] Analyzing Story Theme...")
+        log.info("📊 [Stage 1.1] Analyzing Story Theme...")
 
         try:
-            story_theme_result = self._analyze_story_theme(uploaded_file, client)
+            story_theme_result = story_theme_future.result()
             if story_theme_result:
                 # 提取双层数据
                 concrete_data = convert_story_theme_to_frontend(story_theme_result)
@@ -371,20 +525,21 @@ class FilmIRManager:
                 self.ir["pillars"]["I_storyTheme"]["concrete"] = concrete_data
                 self.ir["pillars"]["I_storyTheme"]["abstract"] = abstract_data
                 self.save()
-                print(f"✅ [Stage 1.1] Story Theme analysis completed (concrete + abstract)")
+                log.info("✅ [Stage 1.1] Story Theme analysis completed (concrete + abstract)")
             else:
-                print(f"⚠️ [Stage 1.1] Story Theme analysis returned empty result")
+                log.warning("⚠️ [Stage 1.1] Story Theme analysis returned empty result")
+                incomplete_steps.append("storyTheme")
         except Exception as e:
-            print(f"❌ [Stage 1.1] Story Theme analysis failed: {e}")
+            log.error("❌ [Stage 1.1] Story Theme analysis failed: %s", e)
             return {"status": "error", "reason": f"Story Theme analysis failed: {e}"}
 
         # ============================================================
         # Step 2: Narrative Extraction (支柱 II) - Concrete + Abstract 融合输出
         # ============================================================
-        print(f"📝 [Stage 1.2] Extracting Narrative Template...")
+        log.info("📝 [Stage 1.2] Extracting Narrative Template...")
 
         try:
-            narrative_result = self._analyze_narrative(uploaded_file, client)
+            narrative_result = narrative_future.result()
             if narrative_result:
                 # 提取三层数据
                 concrete_data = convert_narrative_to_frontend(narrative_result)
@@ -396,20 +551,22 @@ class FilmIRManager:
                 self.ir["pillars"]["II_narrativeTemplate"]["abstract"] = abstract_data
                 self.ir["pillars"]["II_narrativeTemplate"]["hiddenAssets"] = hidden_assets
                 self.save()
-                print(f"✅ [Stage 1.2] Narrative extraction completed (concrete + abstract + hiddenAssets)")
+                log.info("✅ [Stage 1.2] Narrative extraction completed (concrete + abstract + hiddenAssets)")
             else:
-                print(f"⚠️ [Stage 1.2] Narrative extraction returned empty result")
+                log.warning("⚠️ [Stage 1.2] Narrative extraction returned empty result")
+                incomplete_steps.append("narrative")
         except Exception as e:
-            print(f"❌ [Stage 1.2] Narrative extraction failed: {e}")
+            log.error("❌ [Stage 1.2] Narrative extraction failed: %s", e)
+            incomplete_steps.append("narrative")
             # 不阻塞流程，继续执行
 
         # ============================================================
         # Step 3: Shot Decomposition (支柱 III) - Concrete + Abstract 融合输出
         # ============================================================
-        print(f"🎬 [Stage 1.3] Decomposing Shot Recipe...")
+        log.info("🎬 [Stage 1.3] Decomposing Shot Recipe...")
 
         try:
-            shot_recipe_result = self._analyze_shot_recipe(uploaded_file, client)
+            shot_recipe_result = shot_recipe_future.result()
             if shot_recipe_result:
                 # 提取多层数据
                 concrete_data = convert_shot_recipe_to_frontend(shot_recipe_result)
@@ -436,13 +593,16 @@ class FilmIRManager:
                 total_shots = len(concrete_data.get('shots', []))
                 degraded_count = analysis_metadata.get("degradedShots", 0)
                 if degraded_count > 0:
-                    print(f"⚠️ [Stage 1.3] Shot Recipe completed: {total_shots} shots ({degraded_count} degraded, can retry)")
+                    log.warning("⚠️ [Stage 1.3] Shot Recipe completed: %s shots (%s degraded, can retry)", total_shots, degraded_count)
+                    incomplete_steps.append("shotRecipe")
                 else:
-                    print(f"✅ [Stage 1.3] Shot Recipe completed ({total_shots} shots extracted)")
+                    log.info("✅ [Stage 1.3] Shot Recipe completed (%s shots extracted)", total_shots)
             else:
-                print(f"⚠️ [Stage 1.3] Shot Recipe returned empty result")
+                log.warning("⚠️ [Stage 1.3] Shot Recipe returned empty result")
+                incomplete_steps.append("shotRecipe")
         except Exception as e:
-            print(f"❌ [Stage 1.3] Shot Recipe analysis failed: {e}")
+            log.error("❌ [Stage 1.3] Shot Recipe analysis failed: %s", e)
+            incomplete_steps.append("shotRecipe")
             import traceback
             traceback.print_exc()
             # 不阻塞流程
@@ -450,7 +610,7 @@ class FilmIRManager:
         # ============================================================
         # Step 4: Character Ledger Generation (支柱 II 扩展) - 两阶段识别
         # ============================================================
-        print(f"👥 [Stage 1.4] Generating Character Ledger (two-phase clustering)...")
+        log.info("👥 [Stage 1.4] Generating Character Ledger (two-phase clustering)...")
 
         try:
             # 获取已分析的 shots 数据
@@ -471,51 +631,123 @@ class FilmIRManager:
                     self._init_identity_mapping(ledger_result)
 
                     self.save()
-                    print(f"✅ [Stage 1.4] Character Ledger completed:")
-                    print(get_ledger_display_summary(ledger_result))
+                    log.info("✅ [Stage 1.4] Character Ledger completed:")
+                    log.info("%s", get_ledger_display_summary(ledger_result))
                 else:
-                    print(f"⚠️ [Stage 1.4] Character Ledger generation returned empty result")
+                    log.warning("⚠️ [Stage 1.4] Character Ledger generation returned empty result")
+                    incomplete_steps.append("characterLedger")
             else:
-                print(f"⚠️ [Stage 1.4] Skipped - no shots available for clustering")
+                log.warning("⚠️ [Stage 1.4] Skipped - no shots available for clustering")
+                incomplete_steps.append("characterLedger")
         except Exception as e:
-            print(f"❌ [Stage 1.4] Character Ledger generation failed: {e}")
+            log.error("❌ [Stage 1.4] Character Ledger generation failed: %s", e)
+            incomplete_steps.append("characterLedger")
             import traceback
             traceback.print_exc()
             # 不阻塞流程
 
-        return {"status": "success", "message": "Specific analysis completed"}
+        return {
+            "status": "success",
+            "message": "Specific analysis completed",
+            "incompleteSteps": incomplete_steps,
+        }
+
+    def _stage_fingerprint(self, stage: str) -> Optional[str]:
+        """
+        阶段输入指纹；返回 None 表示该阶段不做幂等跳过
+
+        specificAnalysis: 源视频内容哈希 + Stage 1 全部 Meta Prompt
+        """
+        if stage != "specificAnalysis":
+            return None
+        video_hash = self._source_video_hash()
+        if video_hash is None:
+            return None
+        return llm_cache.content_key(_SPECIFIC_ANALYSIS_PROMPTS_KEY, video_hash)
+
+    def _analysis_cache_key(self, model: str, prompt: str) -> Optional[str]:
+        """(模型, prompt, 源视频内容哈希) -> 分析缓存键；源视频不存在时返回 None (不缓存)"""
+        video_hash = self._source_video_hash()
+        if video_hash is None:
+            return None
+        return llm_cache.content_key(model, prompt, video_hash)
+
+    def _source_video_hash(self) -> Optional[str]:
+        """源视频内容哈希（按路径 + mtime + 大小记忆）；源视频不存在时返回 None"""
+        video_path = self.video_path
+        if video_path is None or not video_path.is_file():
+            return None
+        return llm_cache.file_hash(video_path)
 
     def _upload_video_to_gemini(self, video_path: Path) -> tuple:
         """
         统一上传视频到 Gemini Files API
 
+        同一视频文件（路径 + 修改时间 + 大小）已上传且仍为 ACTIVE 时直接复用：
+        进程内记录在 _uploaded_videos，文件名同时写入 Film IR 的 _cache.geminiVideo，重启后也能重新挂载
+
         Args:
             video_path: 视频文件路径
 
         Returns:
             (uploaded_file, client) 元组，供后续分析复用
         """
-        import time
-
         from .utils import gemini_keys
-        api_key = gemini_keys.get()
 
-        client = genai.Client(api_key=api_key)
+        st = video_path.stat()
+        cache_key = (str(video_path.resolve()), st.st_mtime_ns, st.st_size)
+
+        with _uploaded_videos_lock:
+            cached = _uploaded_videos.get(cache_key)
+        if cached is not None:
+            file_name, api_key = cached
+        else:
+            record = self.ir.get("_cache", {}).get("geminiVideo") or {}
+            same_file = record.get("mtimeNs") == st.st_mtime_ns and record.get("size") == st.st_size
+            file_name = record.get("fileName") if same_file else None
+            api_key = gemini_keys.get()
+
+        if file_name:
+            client = _get_genai_client(api_key)
+            uploaded_file = self._get_active_file(client, file_name)
+            if uploaded_file is not None:
+                log.info("♻️ Reusing uploaded video: %s", file_name)
+                with _uploaded_videos_lock:
+                    _uploaded_videos[cache_key] = (file_name, api_key)
+                return uploaded_file, client
+
+        api_key = gemini_keys.get()
+        client = _get_genai_client(api_key)
 
         # 上传视频文件
         uploaded_file = client.files.upload(file=str(video_path))
 
         # 等待文件处理完成
-        while uploaded_file.state.name == "PROCESSING":
-            print(f"⏳ Waiting for video processing...")
-            time.sleep(3)
-            uploaded_file = client.files.get(name=uploaded_file.name)
+        uploaded_file = wait_for_file_processing(client, uploaded_file)
 
         if uploaded_file.state.name != "ACTIVE":
             raise RuntimeError(f"Video processing failed: {uploaded_file.state.name}")
 
+        with _uploaded_videos_lock:
+            _uploaded_videos[cache_key] = (uploaded_file.name, api_key)
+        self.ir.setdefault("_cache", {})["geminiVideo"] = {
+            "fileName": uploaded_file.name,
+            "mtimeNs": st.st_mtime_ns,
+            "size": st.st_size
+        }
+
         return uploaded_file, client
 
+    @staticmethod
+    def _get_active_file(client, file_name: str):
+        """获取已上传的文件，仍在处理则等待；已过期 / 失败 / 不可访问时返回 None"""
+        try:
+            uploaded_file = wait_for_file_processing(client, client.files.get(name=file_name))
+        except Exception as e:
+            log.warning("⚠️ Uploaded video %s unavailable, re-uploading: %s", file_name, e)
+            return None
+        return uploaded_file if uploaded_file.state.name == "ACTIVE" else None
+
     def _analyze_story_theme(self, uploaded_file, client) -> Optional[Dict[str, Any]]:
         """
         调用 Gemini API 分析视频主题
@@ -527,17 +759,20 @@ class FilmIRManager:
         Returns:
             AI 分析结果 (原始格式)
         """
-        # 构建 Prompt (替换 {input_content} 占位符)
-        prompt = STORY_THEME_ANALYSIS_PROMPT.replace(
-            "{input_content}",
-            "[Video file attached - analyze the visual and audio content]"
-        )
+        prompt = _STORY_THEME_PROMPT
+
+        model = "gemini-3-flash-preview"
+        cache_key = self._analysis_cache_key(model, prompt)
+        cached = llm_cache.get(self.llm_cache_dir, cache_key) if cache_key and not self._bypass_llm_cache else None
+        if cached is not None:
+            log.info("♻️ Story Theme analysis loaded from cache")
+            return cached
 
         # 调用 Gemini API (带 503 重试)
-        print(f"🤖 Calling Gemini API for Story Theme analysis...")
+        log.info("🤖 Calling Gemini API for Story Theme analysis...")
         response = gemini_call_with_retry(
             client=client,
-            model="gemini-3-flash-preview",
+            model=model,
             contents=[prompt, uploaded_file],
             config=types.GenerateContentConfig(
                 response_mime_type="application/json"
@@ -546,7 +781,9 @@ class FilmIRManager:
 
         # 解析 JSON 响应 - 使用增强的解析器处理转义序列等问题
         result = self._parse_json_response(response.text, "Story Theme")
-        print(f"✅ Story Theme analysis received")
+        if cache_key and result:
+            llm_cache.put(self.llm_cache_dir, cache_key, result)
+        log.info("✅ Story Theme analysis received")
         return result
 
     def _analyze_narrative(self, uploaded_file, client) -> Optional[Dict[str, Any]]:
@@ -560,17 +797,20 @@ class FilmIRManager:
         Returns:
             AI 分析结果，包含 narrativeTemplate.*.concrete 和 *.abstract
         """
-        # 构建 Prompt
-        prompt = NARRATIVE_EXTRACTION_PROMPT.replace(
-            "{input_content}",
-            "[Video file attached - analyze the narrative structure, characters, and story arc]"
-        )
+        prompt = _NARRATIVE_PROMPT
+
+        model = "gemini-3-flash-preview"
+        cache_key = self._analysis_cache_key(model, prompt)
+        cached = llm_cache.get(self.llm_cache_dir, cache_key) if cache_key and not self._bypass_llm_cache else None
+        if cached is not None:
+            log.info("♻️ Narrative extraction loaded from cache")
+            return cached
 
         # 调用 Gemini API (带 503 重试)
-        print(f"🤖 Calling Gemini API for Narrative extraction...")
+        log.info("🤖 Calling Gemini API for Narrative extraction...")
         response = gemini_call_with_retry(
             client=client,
-            model="gemini-3-flash-preview",
+            model=model,
             contents=[prompt, uploaded_file],
             config=types.GenerateContentConfig(
                 response_mime_type="application/json"
@@ -579,7 +819,9 @@ class FilmIRManager:
 
         # 解析 JSON 响应 - 使用增强的解析器处理转义序列等问题
         result = self._parse_json_response(response.text, "Narrative")
-        print(f"✅ Narrative extraction received")
+        if cache_key and result:
+            llm_cache.put(self.llm_cache_dir, cache_key, result)
+        log.info("✅ Narrative extraction received")
         return result
 
     def _analyze_shot_recipe(self, uploaded_file, client, batch_size: int = 8) -> Optional[Dict[str, Any]]:
@@ -603,7 +845,7 @@ class FilmIRManager:
         # ============================================================
         # Phase 1: 轻量级 Shot 检测
         # ============================================================
-        print(f"🔍 [Phase 1] Lightweight shot detection...")
+        log.info("🔍 [Phase 1] Lightweight shot detection...")
 
         phase1_prompt = SHOT_DETECTION_PROMPT.replace(
             "{input_content}",
@@ -623,10 +865,10 @@ class FilmIRManager:
         phase1_result = self._parse_json_response(response.text, "Shot Phase 1")
         shots_basic = phase1_result.get("shotRecipe", {}).get("shots", [])
         total_shots = len(shots_basic)
-        print(f"✅ [Phase 1] Detected {total_shots} shots")
+        log.info("✅ [Phase 1] Detected %s shots", total_shots)
 
         if total_shots == 0:
-            print(f"⚠️ No shots detected, returning Phase 1 result as-is")
+            log.warning("⚠️ No shots detected, returning Phase 1 result as-is")
             return phase1_result
 
         # ============================================================
@@ -640,7 +882,7 @@ class FilmIRManager:
             start_idx = batch_idx * batch_size
             end_idx = min((batch_idx + 1) * batch_size, total_shots)
 
-            print(f"📦 [Phase 2] Processing batch {batch_idx + 1}/{num_batches} (shots {start_idx + 1}-{end_idx})...")
+            log.info("📦 [Phase 2] Processing batch %s/%s (shots %s-%s)...", batch_idx + 1, num_batches, start_idx + 1, end_idx)
 
             # 构建批次 prompt
             shot_boundaries = create_shot_boundaries_text(shots_basic, start_idx, end_idx)
@@ -673,7 +915,7 @@ class FilmIRManager:
             if batch_result is not None:
                 batch_results.append(batch_result)
                 batch_success = True
-                print(f"✅ [Phase 2] Batch {batch_idx + 1} completed")
+                log.info("✅ [Phase 2] Batch %s completed", batch_idx + 1)
             else:
                 # 记录降级信息
                 degraded_batch = {
@@ -685,7 +927,7 @@ class FilmIRManager:
                     "timestamp": datetime.now().isoformat()
                 }
                 degraded_batches.append(degraded_batch)
-                print(f"⚠️ [Phase 2] Batch {batch_idx + 1} DEGRADED - using Phase 1 data")
+                log.warning("⚠️ [Phase 2] Batch %s DEGRADED - using Phase 1 data", batch_idx + 1)
 
         # ============================================================
         # 合并结果
@@ -697,10 +939,10 @@ class FilmIRManager:
             degraded_shot_count = sum(
                 b["endIdx"] - b["startIdx"] for b in degraded_batches
             )
-            print(f"⚠️ Shot Recipe completed with {len(degraded_batches)} degraded batch(es)")
-            print(f"   {degraded_shot_count} shots using basic data (can be retried)")
+            log.warning("⚠️ Shot Recipe completed with %s degraded batch(es)", len(degraded_batches))
+            log.info("   %s shots using basic data (can be retried)", degraded_shot_count)
         else:
-            print(f"✅ Shot Recipe fully completed (all batches successful)")
+            log.info("✅ Shot Recipe fully completed (all batches successful)")
 
         return merged_result
 
@@ -827,27 +1069,27 @@ class FilmIRManager:
                         first_shot = shots_in_batch[0]
                         has_concrete = "concrete" in first_shot
                         shot_keys = list(first_shot.keys())[:5]  # 只显示前5个键
-                        print(f"   📋 Batch structure: {len(shots_in_batch)} shots, concrete_nested={has_concrete}, keys={shot_keys}")
+                        log.info("   📋 Batch structure: %s shots, concrete_nested=%s, keys=%s", len(shots_in_batch), has_concrete, shot_keys)
 
                 return batch_result
 
             except json.JSONDecodeError as e:
-                print(f"⚠️ [Phase 2] Batch {batch_idx + 1} retry {retry + 1}/{max_retries}: JSON parse error")
+                log.warning("⚠️ [Phase 2] Batch %s retry %s/%s: JSON parse error", batch_idx + 1, retry + 1, max_retries)
 
                 # 尝试修复 JSON
                 if last_response_text:
                     fixed = self._try_fix_json(last_response_text)
                     if fixed:
-                        print(f"   🔧 JSON repair successful")
+                        log.info("   🔧 JSON repair successful")
                         return fixed
 
             except Exception as e:
-                print(f"⚠️ [Phase 2] Batch {batch_idx + 1} retry {retry + 1}/{max_retries}: {e}")
+                log.warning("⚠️ [Phase 2] Batch %s retry %s/%s: %s", batch_idx + 1, retry + 1, max_retries, e)
 
         # 所有重试都失败了，尝试拆分批次
         batch_size = end_idx - start_idx
         if batch_size > 4:
-            print(f"   🔀 Splitting batch {batch_idx + 1} into smaller chunks...")
+            log.info("   🔀 Splitting batch %s into smaller chunks...", batch_idx + 1)
             mid = start_idx + batch_size // 2
 
             # 处理前半部分
@@ -869,7 +1111,7 @@ class FilmIRManager:
                     combined_shots.extend(second_half.get("shots", []))
 
                 if combined_shots:
-                    print(f"   ✅ Split recovery: {len(combined_shots)} shots extracted")
+                    log.info("   ✅ Split recovery: %s shots extracted", len(combined_shots))
                     return {"shots": combined_shots}
 
         return None
@@ -912,15 +1154,15 @@ class FilmIRManager:
 
             # 使用增强的解析器处理转义序列等问题
             result = self._parse_json_response(response.text, f"Shot Split {split_label}")
-            print(f"      ✅ Split {split_label} completed ({start_idx + 1}-{end_idx})")
+            log.info("      ✅ Split %s completed (%s-%s)", split_label, start_idx + 1, end_idx)
             return result
 
         except json.JSONDecodeError as e:
-            print(f"      ❌ Split {split_label} JSON parse failed: {e}")
+            log.error("      ❌ Split %s JSON parse failed: %s", split_label, e)
             return None
 
         except Exception as e:
-            print(f"      ❌ Split {split_label} error: {e}")
+            log.error("      ❌ Split %s error: %s", split_label, e)
             return None
 
     def _generate_character_ledger(
@@ -944,7 +1186,7 @@ class FilmIRManager:
         Returns:
             处理后的 character ledger 数据
         """
-        print(f"📊 [Character Ledger] Input: {len(shots)} shots to analyze")
+        log.info("📊 [Character Ledger] Input: %s shots to analyze", len(shots))
         shot_subjects_text = build_shot_subjects_input(shots)
         all_shot_ids = [shot.get("shotId") for shot in shots if shot.get("shotId")]
         job_dir = Path("jobs") / self.job_id
@@ -963,7 +1205,7 @@ class FilmIRManager:
         # ============================================================
         key_frame_shots = select_key_frames(shots)
         key_frame_ids = [s.get("shotId") for s in key_frame_shots]
-        print(f"🎭 [Pass 1: Discovery] Selected {len(key_frame_shots)} key frames: {key_frame_ids}", flush=True)
+        log.info("🎭 [Pass 1: Discovery] Selected %s key frames: %s", len(key_frame_shots), key_frame_ids)
 
         discovery_prompt = CHARACTER_DISCOVERY_PROMPT.replace("{shot_subjects}", shot_subjects_text)
         discovery_contents = [discovery_prompt]
@@ -987,14 +1229,14 @@ class FilmIRManager:
         )
 
         try:
-            discovery_result = json.loads(discovery_response.text)
+            discovery_result = orjson.loads(discovery_response.text)
             discovered_chars = discovery_result.get("characters", [])
-            print(f"   ✅ Discovered {len(discovered_chars)} characters:")
+            log.info("   ✅ Discovered %s characters:", len(discovered_chars))
             for c in discovered_chars:
-                print(f"      - {c.get('entityId', '?')}: {c.get('displayName', '?')} [{c.get('importance', '?')}]")
+                log.info("      - %s: %s [%s]", c.get('entityId', '?'), c.get('displayName', '?'), c.get('importance', '?'))
         except json.JSONDecodeError as e:
-            print(f"   ❌ Failed to parse Discovery JSON: {e}")
-            print(f"   Raw response: {discovery_response.text[:300]}...")
+            log.error("   ❌ Failed to parse Discovery JSON: %s", e)
+            log.debug("   Raw response: %s...", discovery_response.text[:300])
             discovered_chars = []
 
         # ============================================================
@@ -1003,7 +1245,7 @@ class FilmIRManager:
         # ============================================================
         all_chars = list(discovered_chars)  # PRIMARY + SECONDARY together
 
-        print(f"🔍 [Pass 2: Batch Audit] Auditing ALL {len(all_chars)} characters in single API call...", flush=True)
+        log.info("🔍 [Pass 2: Batch Audit] Auditing ALL %s characters in single API call...", len(all_chars))
 
         # Build characters list text for the prompt
         chars_list_lines = []
@@ -1043,7 +1285,7 @@ class FilmIRManager:
         char_appears_map = {char.get("entityId", ""): [] for char in all_chars}
 
         try:
-            audit_result = json.loads(audit_response.text)
+            audit_result = orjson.loads(audit_response.text)
             matrix = audit_result.get("auditMatrix", [])
             for entry in matrix:
                 shot_id = entry.get("shotId", "")
@@ -1052,10 +1294,10 @@ class FilmIRManager:
                 for char_id in entry.get("presentCharacterIds", []):
                     if char_id in char_appears_map:
                         char_appears_map[char_id].append(shot_id)
-            print(f"   ✅ Batch audit matrix received: {len(matrix)} shot entries", flush=True)
+            log.info("   ✅ Batch audit matrix received: %s shot entries", len(matrix))
         except json.JSONDecodeError as e:
-            print(f"   ⚠️ Failed to parse batch audit JSON: {e}", flush=True)
-            print(f"   Raw response: {audit_response.text[:300]}...", flush=True)
+            log.warning("   ⚠️ Failed to parse batch audit JSON: %s", e)
+            log.debug("   Raw response: %s...", audit_response.text[:300])
             # Fallback: leave all appears_in empty (Pass 3 continuity will partially fill)
 
         # Build character ledger from the matrix
@@ -1067,7 +1309,7 @@ class FilmIRManager:
             importance = char.get("importance", "SECONDARY")
             appears_in = [sid for sid in char_appears_map.get(entity_id, []) if sid in all_shot_ids]
 
-            print(f"      ✅ '{char_name}' ({entity_id}) visible in {len(appears_in)}/{len(all_shot_ids)} shots: {appears_in}")
+            log.info("      ✅ '%s' (%s) visible in %s/%s shots: %s", char_name, entity_id, len(appears_in), len(all_shot_ids), appears_in)
 
             character_ledger.append({
                 "entityId": entity_id,
@@ -1093,7 +1335,7 @@ class FilmIRManager:
         for s in shots:
             if s.get("shotId") in primary_shot_ids and not s.get("isNarrative", True):
                 s["isNarrative"] = True
-                print(f"   🔒 {s['shotId']}: PRIMARY character present → forced isNarrative=true")
+                log.info("   🔒 %s: PRIMARY character present → forced isNarrative=true", s['shotId'])
 
         # ============================================================
         # Environment Extraction (text-only, unchanged)
@@ -1105,7 +1347,7 @@ class FilmIRManager:
         ]
         env_shot_subjects_text = build_shot_subjects_input(narrative_shots) if len(narrative_shots) < len(shots) else shot_subjects_text
         env_prompt = ENVIRONMENT_EXTRACTION_PROMPT.replace("{shot_subjects}", env_shot_subjects_text)
-        print(f"🏠 [Environment] Extracting environments ({len(narrative_shots)}/{len(shots)} narrative shots)...")
+        log.info("🏠 [Environment] Extracting environments (%s/%s narrative shots)...", len(narrative_shots), len(shots))
 
         env_response = gemini_call_with_retry(
             client=client,
@@ -1119,9 +1361,9 @@ class FilmIRManager:
 
         environment_ledger = []
         try:
-            env_result = json.loads(env_response.text)
+            env_result = orjson.loads(env_response.text)
             raw_envs = env_result.get("environments", [])
-            print(f"   ✅ Found {len(raw_envs)} environments")
+            log.info("   ✅ Found %s environments", len(raw_envs))
 
             for i, env in enumerate(raw_envs):
                 environment_ledger.append({
@@ -1135,7 +1377,7 @@ class FilmIRManager:
                     "shotCount": len(env.get("appearsInShots", []))
                 })
         except json.JSONDecodeError as e:
-            print(f"   ❌ Failed to parse environments JSON: {e}")
+            log.error("   ❌ Failed to parse environments JSON: %s", e)
             raw_envs = []
 
         # ============================================================
@@ -1160,13 +1402,13 @@ class FilmIRManager:
                 "appearsInShots": [shot_id],
                 "shotCount": 1,
             })
-            print(f"   🎨 {env_id}: graphic scene for {shot_id} ({subject[:40]})")
+            log.info("   🎨 %s: graphic scene for %s (%s)", env_id, shot_id, subject[:40])
             graphic_env_idx += 1
 
         # ============================================================
         # Pass 3: Continuity Check — deterministic gap-fill + surgical re-check
         # ============================================================
-        print(f"🔗 [Pass 3: Continuity] Checking character continuity...", flush=True)
+        log.info("🔗 [Pass 3: Continuity] Checking character continuity...")
 
         character_ledger, recheck_requests = check_character_continuity(
             character_ledger, environment_ledger, all_shot_ids
@@ -1174,7 +1416,7 @@ class FilmIRManager:
 
         # Execute surgical re-checks for 2-3 shot gaps
         if recheck_requests:
-            print(f"   🔬 Executing {len(recheck_requests)} surgical re-checks...", flush=True)
+            log.info("   🔬 Executing %s surgical re-checks...", len(recheck_requests))
 
             for req in recheck_requests:
                 shot_id = req["shotId"]
@@ -1205,9 +1447,9 @@ class FilmIRManager:
                 )
 
                 try:
-                    recheck_result = json.loads(recheck_response.text)
+                    recheck_result = orjson.loads(recheck_response.text)
                     is_visible = recheck_result.get("visible", False)
-                    print(f"      {req['entityId']} in {shot_id}: {'✅ VISIBLE' if is_visible else '❌ NOT visible'}")
+                    log.info("      %s in %s: %s", req['entityId'], shot_id, '✅ VISIBLE' if is_visible else '❌ NOT visible')
 
                     if is_visible:
                         # Add to character's appearsInShots
@@ -1222,7 +1464,7 @@ class FilmIRManager:
                                     char["shotCount"] = len(char["appearsInShots"])
                                 break
                 except json.JSONDecodeError:
-                    print(f"      ⚠️ Failed to parse re-check for {req['entityId']} in {shot_id}")
+                    log.warning("      ⚠️ Failed to parse re-check for %s in %s", req['entityId'], shot_id)
 
         # ============================================================
         # Combine results
@@ -1242,9 +1484,9 @@ class FilmIRManager:
         }
 
         # Final summary
-        print(f"✅ Character Ledger complete: {len(character_ledger)} characters, {len(environment_ledger)} environments")
+        log.info("✅ Character Ledger complete: %s characters, %s environments", len(character_ledger), len(environment_ledger))
         for char in character_ledger:
-            print(f"   {char['entityId']}: {char['displayName']} → {char['shotCount']}/{len(all_shot_ids)} shots {char['appearsInShots']}")
+            log.info("   %s: %s → %s/%s shots %s", char['entityId'], char['displayName'], char['shotCount'], len(all_shot_ids), char['appearsInShots'])
 
         # Use narrative-only shot IDs for environment coverage check
         # so brand_logo/endcard shots don't get force-assigned to an environment
@@ -1345,7 +1587,7 @@ class FilmIRManager:
                     "bindingTimestamp": datetime.utcnow().isoformat() + "Z" if subject_map.get("imageReference") else None,
                     "isRemixed": True
                 }
-                print(f"   ➕ New character entity created: {entity_id}")
+                log.info("   ➕ New character entity created: %s", entity_id)
             elif entity_id in identity_mapping:
                 # 更新现有实体的 remixedEntity（Overwrite 模式）
                 identity_mapping[entity_id]["remixedEntity"] = {
@@ -1364,9 +1606,9 @@ class FilmIRManager:
                     identity_mapping[entity_id]["bindingStatus"] = "REMIXED_BOUND"
                     identity_mapping[entity_id]["bindingTimestamp"] = datetime.utcnow().isoformat() + "Z"
 
-                print(f"   🔄 Character remixed: {entity_id} → {subject_map.get('toDescription', '')[:30]}...")
+                log.info("   🔄 Character remixed: %s → %s...", entity_id, subject_map.get('toDescription', '')[:30])
             else:
-                print(f"   ⚠️ Warning: Entity {entity_id} not found in Identity Mapping")
+                log.warning("   ⚠️ Warning: Entity %s not found in Identity Mapping", entity_id)
 
         # 处理环境替换 (environmentMapping)
         for env_map in parsed_intent.get("environmentMapping", []):
@@ -1394,7 +1636,7 @@ class FilmIRManager:
                     "bindingTimestamp": datetime.utcnow().isoformat() + "Z",
                     "isRemixed": True
                 }
-                print(f"   ➕ New environment entity created: {entity_id}")
+                log.info("   ➕ New environment entity created: %s", entity_id)
             elif entity_id in identity_mapping:
                 identity_mapping[entity_id]["remixedEntity"] = {
                     "toDescription": env_map.get("toDescription", ""),
@@ -1408,9 +1650,9 @@ class FilmIRManager:
                 identity_mapping[entity_id]["bindingStatus"] = "REMIXED"
                 identity_mapping[entity_id]["bindingTimestamp"] = datetime.utcnow().isoformat() + "Z"
 
-                print(f"   🔄 Environment remixed: {entity_id} → {env_map.get('toDescription', '')[:30]}...")
+                log.info("   🔄 Environment remixed: %s → %s...", entity_id, env_map.get('toDescription', '')[:30])
             else:
-                print(f"   ⚠️ Warning: Environment {entity_id} not found in Identity Mapping")
+                log.warning("   ⚠️ Warning: Environment %s not found in Identity Mapping", entity_id)
 
         # ============================================================
         # 全局替换检测：当用户说"所有角色"时，自动应用到未被明确 remix 的角色
@@ -1465,7 +1707,7 @@ class FilmIRManager:
                         applied_count += 1
 
             if applied_count > 0:
-                print(f"   🔁 Auto-applied global style to {applied_count} additional characters")
+                log.info("   🔁 Auto-applied global style to %s additional characters", applied_count)
 
         # 保存更新
         self.ir["pillars"]["IV_renderStrategy"]["identityMapping"] = identity_mapping
@@ -1477,12 +1719,12 @@ class FilmIRManager:
 
         TODO: 接入 Meta Prompt (abstractionEngine)
         """
-        print(f"🔮 [Stage 2] Running abstraction for {self.job_id}...")
+        log.info("🔮 [Stage 2] Running abstraction for %s...", self.job_id)
 
         meta_prompts = self.ir.get("metaPromptsRegistry", {})
 
         if not meta_prompts.get("abstractionEngine"):
-            print("⚠️ Meta Prompt 'abstractionEngine' not configured, using placeholder")
+            log.warning("⚠️ Meta Prompt 'abstractionEngine' not configured, using placeholder")
 
         # 获取 concrete 数据
         story_theme_concrete = self.pillars["I_storyTheme"].get("concrete")
@@ -1511,7 +1753,7 @@ class FilmIRManager:
         1. Intent Parser: 解析用户自然语言 → ParsedIntent
         2. Intent Fusion: Abstract + ParsedIntent → RemixedLayer
         """
-        print(f"💉 [Stage 3] Running intent injection for {self.job_id}...")
+        log.info("💉 [Stage 3] Running intent injection for %s...", self.job_id)
 
         user_prompt = self.user_intent.get("rawPrompt")
         if not user_prompt:
@@ -1538,12 +1780,12 @@ class FilmIRManager:
         character_ledger = narrative_pillar.get("characterLedger", [])
         environment_ledger = narrative_pillar.get("environmentLedger", [])
 
-        print(f"📋 [Ledger Context] Characters: {len(character_ledger)}, Environments: {len(environment_ledger)}")
+        log.info("📋 [Ledger Context] Characters: %s, Environments: %s", len(character_ledger), len(environment_ledger))
 
         # ============================================================
         # Step 3.1: Intent Parsing (意图解析)
         # ============================================================
-        print(f"🔍 [Stage 3.1] Parsing user intent...")
+        log.info("🔍 [Stage 3.1] Parsing user intent...")
 
         try:
             parsed_intent = self._parse_user_intent(
@@ -1560,38 +1802,38 @@ class FilmIRManager:
             # 合规检查
             is_compliant, compliance_issues = check_compliance(parsed_intent)
             if not is_compliant:
-                print(f"⚠️ Compliance issues: {compliance_issues}")
+                log.warning("⚠️ Compliance issues: %s", compliance_issues)
                 return {"status": "error", "reason": f"Compliance check failed: {compliance_issues}"}
 
             # 存储解析结果
             self.ir["userIntent"]["parsedIntent"] = parsed_intent
 
             # Phase 3: 更新 Identity Mapping (将 remix 意图绑定到实体)
-            print(f"   [3.1.1] Updating Identity Mapping with remix data...")
+            log.info("   [3.1.1] Updating Identity Mapping with remix data...")
             self._update_identity_mapping_with_remix(parsed_intent)
 
             self.save()
 
-            print(f"✅ [Stage 3.1] Intent parsed: {get_intent_summary(parsed_intent)}")
+            log.info("✅ [Stage 3.1] Intent parsed: %s", get_intent_summary(parsed_intent))
 
         except Exception as e:
-            print(f"❌ [Stage 3.1] Intent parsing failed: {e}")
+            log.error("❌ [Stage 3.1] Intent parsing failed: %s", e)
             return {"status": "error", "reason": f"Intent parsing failed: {e}"}
 
         # ============================================================
         # Step 3.2: Intent Fusion (意图融合) - 分批处理避免 token 限制
         # ============================================================
-        print(f"🔀 [Stage 3.2] Fusing intent with abstract template...")
+        log.info("🔀 [Stage 3.2] Fusing intent with abstract template...")
 
         try:
             # 3.2.1: 先生成 Identity Anchors
-            print(f"   [3.2.1] Generating identity anchors...")
+            log.info("   [3.2.1] Generating identity anchors...")
             identity_anchors = self._generate_identity_anchors(
                 parsed_intent,
                 hidden_template,
                 concrete_reference
             )
-            print(f"   ✅ Generated {len(identity_anchors.get('characters', []))} character anchors, {len(identity_anchors.get('environments', []))} environment anchors")
+            log.info("   ✅ Generated %s character anchors, %s environment anchors", len(identity_anchors.get('characters', [])), len(identity_anchors.get('environments', [])))
 
             # 3.2.2: 分批生成 Shot Prompts (每批 8 个镜头)
             shot_recipe_concrete = concrete_reference.get("shotRecipe") or {}
@@ -1610,7 +1852,7 @@ class FilmIRManager:
             for i in range(0, total_shots, batch_size):
                 batch_start = i
                 batch_end = min(i + batch_size, total_shots)
-                print(f"   [3.2.2] Processing shots {batch_start+1}-{batch_end} of {total_shots}...")
+                log.info("   [3.2.2] Processing shots %s-%s of %s...", batch_start+1, batch_end, total_shots)
 
                 batch_shots = self._generate_shot_prompts_batch(
                     parsed_intent,
@@ -1620,7 +1862,7 @@ class FilmIRManager:
                     batch_start
                 )
                 all_remixed_shots.extend(batch_shots)
-                print(f"   ✅ Batch {i//batch_size + 1} completed: {len(batch_shots)} shots")
+                log.info("   ✅ Batch %s completed: %s shots", i//batch_size + 1, len(batch_shots))
 
             # 组装完整的 fusion result
             fusion_result = {
@@ -1645,7 +1887,7 @@ class FilmIRManager:
 
             # 后处理：清理 Gemini 残留、解析占位符、规范化相机字段
             remixed_layer = post_process_remixed_layer(remixed_layer)
-            print(f"   ✅ Post-processed: cleaned artifacts, resolved placeholders, normalized camera fields")
+            log.info("   ✅ Post-processed: cleaned artifacts, resolved placeholders, normalized camera fields")
 
             # 存储到 userIntent.remixedLayer
             self.ir["userIntent"]["remixedLayer"] = remixed_layer
@@ -1655,10 +1897,10 @@ class FilmIRManager:
 
             self.save()
 
-            print(f"✅ [Stage 3.2] Fusion completed:\n{generate_fusion_summary(fusion_result)}")
+            log.info("✅ [Stage 3.2] Fusion completed:\n%s", generate_fusion_summary(fusion_result))
 
         except Exception as e:
-            print(f"❌ [Stage 3.2] Intent fusion failed: {e}")
+            log.error("❌ [Stage 3.2] Intent fusion failed: %s", e)
             import traceback
             traceback.print_exc()
             return {"status": "error", "reason": f"Intent fusion failed: {e}"}
@@ -1694,7 +1936,7 @@ class FilmIRManager:
         from .utils import gemini_keys
         api_key = gemini_keys.get()
 
-        client = genai.Client(api_key=api_key)
+        client = _get_genai_client(api_key)
 
         # 格式化 Character Ledger 为可读文本
         character_ledger = character_ledger or []
@@ -1723,7 +1965,7 @@ class FilmIRManager:
         )
 
         # 调用 Gemini API
-        print(f"🤖 Calling Gemini API for intent parsing...")
+        log.info("🤖 Calling Gemini API for intent parsing...")
         response = client.models.generate_content(
             model="gemini-3-flash-preview",
             contents=[prompt],
@@ -1734,7 +1976,7 @@ class FilmIRManager:
 
         # 解析 JSON 响应 (带容错处理)
         result = self._parse_json_response(response.text, "Intent parsing")
-        print(f"✅ Intent parsing received")
+        log.info("✅ Intent parsing received")
 
         # 规范化结果
         return parse_intent_result(result)
@@ -1807,7 +2049,7 @@ class FilmIRManager:
         from .utils import gemini_keys
         api_key = gemini_keys.get()
 
-        client = genai.Client(api_key=api_key)
+        client = _get_genai_client(api_key)
 
         # 检测视频宽高比
         from .utils import detect_aspect_ratio
@@ -1828,7 +2070,7 @@ class FilmIRManager:
         )
 
         # 调用 Gemini API
-        print(f"🤖 Calling Gemini API for intent fusion...")
+        log.info("🤖 Calling Gemini API for intent fusion...")
         response = client.models.generate_content(
             model="gemini-3-flash-preview",
             contents=[prompt],
@@ -1839,7 +2081,7 @@ class FilmIRManager:
 
         # 解析 JSON 响应 (带容错处理)
         result = self._parse_json_response(response.text, "Intent fusion")
-        print(f"✅ Intent fusion received")
+        log.info("✅ Intent fusion received")
 
         return result
 
@@ -1952,7 +2194,7 @@ class FilmIRManager:
         """
         from .utils import gemini_keys
         api_key = gemini_keys.get()
-        client = genai.Client(api_key=api_key)
+        client = _get_genai_client(api_key)
 
         # 提取原始视频中的独特主体和场景
         unique_elements = self._extract_unique_subjects_and_scenes(
@@ -1961,7 +2203,7 @@ class FilmIRManager:
             max_environments=max_environment_anchors
         )
 
-        print(f"   📊 Found {len(unique_elements['subjects'])} unique subjects, {len(unique_elements['environments'])} unique environments")
+        log.info("   📊 Found %s unique subjects, %s unique environments", len(unique_elements['subjects']), len(unique_elements['environments']))
 
         # Phase 4: 获取 Identity Mapping 中的 remixedEntity 数据
         identity_mapping = self.ir["pillars"]["IV_renderStrategy"].get("identityMapping", {})
@@ -2000,7 +2242,7 @@ class FilmIRManager:
                         "isNewEntity": remixed.get("isNewEntity", False)
                     })
 
-        print(f"   📋 Remixed entities from Identity Mapping: {len(remixed_entities['characters'])} characters, {len(remixed_entities['environments'])} environments")
+        log.info("   📋 Remixed entities from Identity Mapping: %s characters, %s environments", len(remixed_entities['characters']), len(remixed_entities['environments']))
 
         prompt = f"""
 # Task: Generate Fine-Grained Identity Anchors for Video Remix
@@ -2093,7 +2335,7 @@ Output ONLY valid JSON. No markdown, no explanation.
         """
         from .utils import gemini_keys, detect_aspect_ratio
         api_key = gemini_keys.get()
-        client = genai.Client(api_key=api_key)
+        client = _get_genai_client(api_key)
 
         # 检测视频宽高比
         aspect_ratio = detect_aspect_ratio(self.job_dir / "input.mp4")
@@ -2220,10 +2462,10 @@ Output ONLY valid JSON array. No markdown.
 
         # 尝试直接解析
         try:
-            return json.loads(s)
-        except json.JSONDecodeError as e:
-            print(f"⚠️ {context}: Initial JSON parse failed, attempting fixes...")
-            print(f"   Error: {e.msg} at line {e.lineno}")
+            return orjson.loads(s)
+        except orjson.JSONDecodeError as e:
+            log.warning("⚠️ %s: Initial JSON parse failed, attempting fixes...", context)
+            log.info("   Error: %s at line %s", e.msg, e.lineno)
 
         # 修复常见问题
         # 1. 移除尾部逗号
@@ -2278,14 +2520,14 @@ Output ONLY valid JSON array. No markdown.
 
         # 再次尝试解析
         try:
-            return json.loads(s)
-        except json.JSONDecodeError as e:
-            print(f"⚠️ {context}: JSON parse failed, attempting truncation repair...")
+            return orjson.loads(s)
+        except orjson.JSONDecodeError as e:
+            log.warning("⚠️ %s: JSON parse failed, attempting truncation repair...", context)
 
             # 尝试修复截断的 JSON
             repaired = self._try_repair_truncated_json(s)
             if repaired:
-                print(f"   🔧 JSON repair successful")
+                log.info("   🔧 JSON repair successful")
                 return repaired
 
             # 打印错误上下文
@@ -2293,13 +2535,13 @@ Output ONLY valid JSON array. No markdown.
             error_line = e.lineno - 1
             start = max(0, error_line - 2)
             end = min(len(lines), error_line + 3)
-            print(f"❌ {context}: JSON parse failed after all fixes")
-            print(f"   Error: {e.msg} at line {e.lineno}, col {e.colno}")
-            print(f"   Error context (lines {start+1}-{end}):")
+            log.error("❌ %s: JSON parse failed after all fixes", context)
+            log.info("   Error: %s at line %s, col %s", e.msg, e.lineno, e.colno)
+            log.info("   Error context (lines %s-%s):", start+1, end)
             for i in range(start, end):
                 marker = ">>> " if i == error_line else "    "
                 line_preview = lines[i][:80] + "..." if len(lines[i]) > 80 else lines[i]
-                print(f"   {marker}{i+1}: {line_preview}")
+                log.info("   %s%s: %s", marker, i+1, line_preview)
             raise
 
     def _try_repair_truncated_json(self, text: str) -> Optional[Dict[str, Any]]:
@@ -2457,7 +2699,7 @@ Output ONLY valid JSON array. No markdown.
         3. 为每个环境生成参考图
         4. 更新 film_ir.json 中的资产路径
         """
-        print(f"🎨 [Stage 4] Running asset generation for {self.job_id}...")
+        log.info("🎨 [Stage 4] Running asset generation for %s...", self.job_id)
 
         try:
             from core.asset_generator import AssetGenerator, AssetStatus
@@ -2471,7 +2713,7 @@ Output ONLY valid JSON array. No markdown.
             environments = identity_anchors.get("environments", [])
 
             if not characters and not environments:
-                print("⚠️ No identity anchors found. Run intent injection (M4) first.")
+                log.warning("⚠️ No identity anchors found. Run intent injection (M4) first.")
                 return {"status": "skipped", "message": "No identity anchors to generate"}
 
             # 获取用户参考图（如果有）
@@ -2481,7 +2723,7 @@ Output ONLY valid JSON array. No markdown.
             generated_count = 0
             failed_count = 0
 
-            print(f"   📊 Total assets to generate: {total_assets} ({len(characters)} characters × 3 views + {len(environments)} environments)")
+            log.info("   📊 Total assets to generate: %s (%s characters × 3 views + %s environments)", total_assets, len(characters), len(environments))
 
             # 进度回调
             def on_progress(anchor_id, view, status, path=None, error=None):
@@ -2491,13 +2733,15 @@ Output ONLY valid JSON array. No markdown.
                 elif status == "FAILED":
                     failed_count += 1
 
-            # 生成角色三视图
+            # 收集所有锚点的生成任务，锚点之间并发生成
+            specs = []
+
             for i, char in enumerate(characters):
                 anchor_id = char.get("anchorId", f"char_{i+1:02d}")
                 anchor_name = char.get("name", "Unknown Character")
                 description = char.get("description", "")
 
-                print(f"\n   👤 [{i+1}/{len(characters)}] Generating character: {anchor_name}")
+                log.info("   👤 [%s/%s] Queued character: %s", i+1, len(characters), anchor_name)
 
                 # 查找该角色的参考图（如果用户提供了）
                 user_ref_path = None
@@ -2518,50 +2762,52 @@ Output ONLY valid JSON array. No markdown.
                 if visual_dna.get("features"):
                     persistent_attrs.append(f"features: {visual_dna['features']}")
 
-                # 生成三视图
-                results = generator.generate_character_assets(
-                    anchor_id=anchor_id,
-                    anchor_name=anchor_name,
-                    detailed_description=description,
-                    style_adaptation=visual_dna.get("features", ""),
-                    persistent_attributes=persistent_attrs if persistent_attrs else None,
-                    user_reference_path=user_ref_path,
-                    on_progress=on_progress
-                )
-
-                # 更新 IR 中的三视图路径
-                self._update_character_asset_paths(anchor_id, results)
+                specs.append({
+                    "kind": "character",
+                    "anchor_id": anchor_id,
+                    "anchor_name": anchor_name,
+                    "detailed_description": description,
+                    "style_adaptation": visual_dna.get("features", ""),
+                    "persistent_attributes": persistent_attrs if persistent_attrs else None,
+                    "user_reference_path": user_ref_path,
+                    "on_progress": on_progress,
+                })
 
-            # 生成环境参考图
             for i, env in enumerate(environments):
                 anchor_id = env.get("anchorId", f"env_{i+1:02d}")
                 anchor_name = env.get("name", "Unknown Environment")
                 description = env.get("description", "")
 
-                print(f"\n   🏞️ [{i+1}/{len(environments)}] Generating environment: {anchor_name}")
+                log.info("   🏞️ [%s/%s] Queued environment: %s", i+1, len(environments), anchor_name)
 
-                # 生成环境参考图
-                result = generator.generate_environment_asset(
-                    anchor_id=anchor_id,
-                    anchor_name=anchor_name,
-                    detailed_description=description,
-                    atmospheric_conditions="",  # 从描述中已包含
-                    style_adaptation="",
-                    on_progress=on_progress
-                )
+                specs.append({
+                    "kind": "environment",
+                    "anchor_id": anchor_id,
+                    "anchor_name": anchor_name,
+                    "detailed_description": description,
+                    "atmospheric_conditions": "",  # 从描述中已包含
+                    "style_adaptation": "",
+                    "on_progress": on_progress,
+                })
 
-                # 更新 IR 中的环境参考图路径
-                self._update_environment_asset_path(anchor_id, result)
+            results = generator.run_sync(generator.generate_many(specs))
+
+            # 更新 IR 中的三视图 / 环境参考图路径
+            for spec, result in zip(specs, results):
+                if spec["kind"] == "character":
+                    self._update_character_asset_paths(spec["anchor_id"], result)
+                else:
+                    self._update_environment_asset_path(spec["anchor_id"], result)
 
             # 保存更新后的 IR
             self.save()
 
             # 生成摘要
             success_rate = (generated_count / total_assets * 100) if total_assets > 0 else 0
-            print(f"\n✅ [Stage 4] Asset generation completed:")
-            print(f"   Generated: {generated_count}/{total_assets} ({success_rate:.1f}%)")
+            log.info("\n✅ [Stage 4] Asset generation completed:")
+            log.info("   Generated: %s/%s (%.1f%%)", generated_count, total_assets, success_rate)
             if failed_count > 0:
-                print(f"   Failed: {failed_count}")
+                log.info("   Failed: %s", failed_count)
 
             return {
                 "status": "success" if failed_count == 0 else "partial",
@@ -2573,7 +2819,7 @@ Output ONLY valid JSON array. No markdown.
             }
 
         except Exception as e:
-            print(f"❌ [Stage 4] Asset generation failed: {e}")
+            log.error("❌ [Stage 4] Asset generation failed: %s", e)
             import traceback
             traceback.print_exc()
             return {"status": "failed", "message": str(e)}
@@ -2635,15 +2881,15 @@ Output ONLY valid JSON array. No markdown.
 
         TODO: 接入 Meta Prompts (t2iPromptComposer, i2vPromptComposer)
         """
-        print(f"✨ [Stage 5] Running shot refinement for {self.job_id}...")
+        log.info("✨ [Stage 5] Running shot refinement for %s...", self.job_id)
 
         meta_prompts = self.ir.get("metaPromptsRegistry", {})
 
         if not meta_prompts.get("t2iPromptComposer"):
-            print("⚠️ Meta Prompt 't2iPromptComposer' not configured")
+            log.warning("⚠️ Meta Prompt 't2iPromptComposer' not configured")
 
         if not meta_prompts.get("i2vPromptComposer"):
-            print("⚠️ Meta Prompt 'i2vPromptComposer' not configured")
+            log.warning("⚠️ Meta Prompt 'i2vPromptComposer' not configured")
 
         # TODO: 生成渲染配方
 
@@ -2654,7 +2900,7 @@ Output ONLY valid JSON array. No markdown.
         阶段 6: 执行视频生成
         调用 Imagen + Veo 生成最终视频
         """
-        print(f"🎬 [Stage 6] Running video execution for {self.job_id}...")
+        log.info("🎬 [Stage 6] Running video execution for %s...", self.job_id)
 
         # TODO: 调用视频生成管线
 
@@ -2693,7 +2939,7 @@ Output ONLY valid JSON array. No markdown.
                 "archivedAt": datetime.utcnow().isoformat() + "Z",
                 "historyIndex": len(self.ir["userIntent"]["intentHistory"])
             })
-            print(f"   📜 Previous intent archived to history (index: {len(self.ir['userIntent']['intentHistory']) - 1})")
+            log.info("   📜 Previous intent archived to history (index: %s)", len(self.ir['userIntent']['intentHistory']) - 1)
 
         # 设置新的意图
         self.ir["userIntent"]["rawPrompt"] = raw_prompt
@@ -2768,10 +3014,11 @@ Output ONLY valid JSON array. No markdown.
         """
         获取隐形模板 (所有支柱的 abstract 层)
         """
+        pillars = self.pillars
         return {
-            "storyTheme": self.pillars["I_storyTheme"].get("abstract"),
-            "narrativeTemplate": self.pillars["II_narrativeTemplate"].get("abstract"),
-            "shotRecipe": self.pillars["III_shotRecipe"].get("abstract")
+            "storyTheme": pillars["I_storyTheme"].get("abstract"),
+            "narrativeTemplate": pillars["II_narrativeTemplate"].get("abstract"),
+            "shotRecipe": pillars["III_shotRecipe"].get("abstract")
         }
 
     # ============================================================
@@ -2787,15 +3034,16 @@ Output ONLY valid JSON array. No markdown.
             layer: 层级 (concrete/abstract/remixed)
             data: 数据
         """
-        if pillar not in self.pillars:
+        pillars = self.pillars
+        if pillar not in pillars:
             raise ValueError(f"Unknown pillar: {pillar}")
 
         if pillar == "IV_renderStrategy":
-            self.ir["pillars"][pillar].update(data)
+            pillars[pillar].update(data)
         else:
-            if layer not in ["concrete", "abstract", "remixed"]:
+            if layer not in _PILLAR_LAYERS:
                 raise ValueError(f"Unknown layer: {layer}")
-            self.ir["pillars"][pillar][layer] = data
+            pillars[pillar][layer] = data
 
         self.save()
 
@@ -2804,11 +3052,10 @@ Output ONLY valid JSON array. No markdown.
         获取支柱的活跃层数据
         优先级: remixed > concrete > None
         """
-        if pillar not in self.pillars:
+        pillar_data = self.pillars.get(pillar)
+        if pillar_data is None:
             raise ValueError(f"Unknown pillar: {pillar}")
 
-        pillar_data = self.pillars[pillar]
-
         if pillar == "IV_renderStrategy":
             return pillar_data
 
@@ -2901,15 +3148,8 @@ Output ONLY valid JSON array. No markdown.
             key: Prompt 键名
             prompt: Prompt 内容
         """
-        valid_keys = [
-            "storyThemeAnalysis", "narrativeExtraction", "shotDecomposition",
-            "abstractionEngine", "intentFusion",
-            "characterAnchorGen", "environmentAnchorGen",
-            "t2iPromptComposer", "i2vPromptComposer"
-        ]
-
-        if key not in valid_keys:
-            raise ValueError(f"Invalid meta prompt key: {key}. Valid keys: {valid_keys}")
+        if key not in _META_PROMPT_KEYS:
+            raise ValueError(f"Invalid meta prompt key: {key}. Valid keys: {sorted(_META_PROMPT_KEYS)}")
 
         self.ir["metaPromptsRegistry"][key] = prompt
         self.save()
@@ -2921,14 +3161,11 @@ Output ONLY valid JSON array. No markdown.
         Args:
             config_path: 配置文件路径 (JSON)
         """
-        import json
-
-        with open(config_path, "r", encoding="utf-8") as f:
-            prompts = json.load(f)
+        prompts = orjson.loads(Path(config_path).read_bytes())
 
         for key, prompt in prompts.items():
             if key in self.ir["metaPromptsRegistry"]:
                 self.ir["metaPromptsRegistry"][key] = prompt
 
         self.save()
-        print(f"✅ Loaded {len(prompts)} meta prompts from {config_path}")
+        log.info("✅ Loaded %s meta prompts from %s", len(prompts), config_path)
@@ -0,0 +1,139 @@
+# core/llm_cache.py
+"""
+LLM 响应缓存
+============
+按 (模型, prompt, 输入内容哈希) 缓存 Gemini 分析结果到磁盘。
+键包含视频内容哈希，源视频变化时自然失效。
+目录总大小 / 条目未使用时长超出上限后，写入时按最近使用时间淘汰旧条目。
+"""
+
+import hashlib
+import os
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import orjson
+
+# 视频按块读取计算哈希，避免整文件读入内存
+_HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+# 缓存上限：总大小 / 未使用时长；最多每 PRUNE_INTERVAL 秒检查一次
+MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024
+MAX_AGE = float(os.environ.get("LLM_CACHE_MAX_AGE_DAYS", "30")) * 86400
+PRUNE_INTERVAL = 300
+
+# 上次淘汰的时间（进程内共享，避免每次写入都扫描目录）
+_last_prune = 0.0
+_prune_lock = threading.Lock()
+
+
+def content_key(*parts: str) -> str:
+    """多个字符串片段 -> 缓存键（BLAKE2b）"""
+    h = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def file_hash(path: Path) -> str:
+    """文件内容哈希；按 (路径, mtime_ns, 大小) 记忆，同一文件只读一遍"""
+    path = Path(path).resolve()
+    stat = path.stat()
+    return _file_hash_cached(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=32)
+def _file_hash_cached(path: str, mtime_ns: int, size: int) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_SIZE):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def get(cache_dir: Path, key: str) -> Optional[Dict[str, Any]]:
+    """读取缓存并刷新 mtime（淘汰按最近使用时间）；不存在或损坏返回 None"""
+    cache_path = cache_dir / f"{key}.json"
+    try:
+        value = orjson.loads(cache_path.read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, orjson.JSONDecodeError) as e:
+        print(f"⚠️ LLM cache entry unreadable, ignoring: {e}")
+        return None
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+    return value
+
+
+def put(cache_dir: Path, key: str, value: Dict[str, Any]) -> None:
+    """写入缓存（临时文件 + 原子替换）；失败只打印警告"""
+    cache_path = cache_dir / f"{key}.json"
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS))
+        os.replace(tmp_path, cache_path)
+    except (OSError, orjson.JSONEncodeError) as e:
+        print(f"⚠️ Failed to write LLM cache: {e}")
+        tmp_path.unlink(missing_ok=True)
+        return
+    _maybe_prune(cache_dir)
+
+
+def prune(cache_dir: Path, max_bytes: int, max_age: float) -> int:
+    """
+    按最近使用时间从旧到新，删除超过 max_age 秒未使用的条目，
+    并继续删除直到总大小不超过 max_bytes。返回删除的条目数
+    """
+    entries = []
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                # 跳过正在写入的临时文件
+                if entry.name.endswith(".tmp") or not entry.is_file():
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+    except FileNotFoundError:
+        return 0
+
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    expire_before = time.time() - max_age
+    removed = 0
+    for mtime, size, path in entries:
+        if mtime >= expire_before and total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def _maybe_prune(cache_dir: Path) -> None:
+    global _last_prune
+    with _prune_lock:
+        now = time.monotonic()
+        if _last_prune and now - _last_prune < PRUNE_INTERVAL:
+            return
+        _last_prune = now
+        try:
+            removed = prune(cache_dir, MAX_BYTES, MAX_AGE)
+        except OSError as e:
+            print(f"⚠️ Failed to prune LLM cache: {e}")
+            return
+    if removed:
+        print(f"🧹 Pruned {removed} LLM cache entries")
@@ -1,9 +1,12 @@
-import json
+import os
 import time
 import tempfile
-import shutil
 from pathlib import Path
 
+import orjson
+
+_EMPTY_STATUS: dict = {}
+
 
 def load_workflow(job_dir: Path, max_retries: int = 3) -> dict:
     """
@@ -23,7 +26,7 @@ def load_workflow(job_dir: Path, max_retries: int = 3) -> dict:
             if not wf_path.exists():
                 return {}
 
-            content = wf_path.read_text(encoding="utf-8")
+            content = wf_path.read_bytes()
 
             # 检查文件是否为空（可能正在写入）
             if not content or not content.strip():
@@ -32,9 +35,9 @@ def load_workflow(job_dir: Path, max_retries: int = 3) -> dict:
                     continue
                 return {}
 
-            return json.loads(content)
+            return orjson.loads(content)
 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             # JSON 解析失败，可能文件正在写入中
             if attempt < max_retries - 1:
                 time.sleep(0.1 * (attempt + 1))
@@ -51,6 +54,28 @@ def load_workflow(job_dir: Path, max_retries: int = 3) -> dict:
     return {}
 
 
+def compute_progress(wf: dict) -> dict:
+    """
+    统计 shots 的生成进度
+
+    Returns:
+        {"total", "stylized", "video_done", "running"}
+    """
+    shots = wf.get("shots", [])
+    stylized = video_done = running = 0
+    for s in shots:
+        st = s.get("status") or _EMPTY_STATUS
+        stylize = st.get("stylize")
+        video = st.get("video_generate")
+        if stylize == "SUCCESS":
+            stylized += 1
+        if video == "SUCCESS":
+            video_done += 1
+        if stylize == "RUNNING" or video == "RUNNING":
+            running += 1
+    return {"total": len(shots), "stylized": stylized, "video_done": video_done, "running": running}
+
+
 def save_workflow(job_dir: Path, wf: dict) -> None:
     """
     原子写入 workflow.json，防止读写竞态
@@ -58,17 +83,17 @@ def save_workflow(job_dir: Path, wf: dict) -> None:
     使用临时文件 + rename 确保写入原子性
     """
     wf_path = job_dir / "workflow.json"
-    content = json.dumps(wf, ensure_ascii=False, indent=2)
+    content = orjson.dumps(wf, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
 
     # 原子写入：先写临时文件，再 rename
     temp_path = wf_path.with_suffix(".json.tmp")
     try:
-        temp_path.write_text(content, encoding="utf-8")
-        # rename 是原子操作
-        shutil.move(str(temp_path), str(wf_path))
+        temp_path.write_bytes(content)
+        # replace 是原子操作（同一文件系统，覆盖已存在的目标）
+        os.replace(temp_path, wf_path)
     except Exception:
         # 清理临时文件
         if temp_path.exists():
             temp_path.unlink()
         # fallback: 直接写入
-        wf_path.write_text(content, encoding="utf-8")
+        wf_path.write_bytes(content)
@@ -6,6 +6,7 @@ import re
 import uuid
 import subprocess
 import shutil
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Union
 
@@ -24,11 +25,16 @@ from google import genai
 from analyze_video import DIRECTOR_METAPROMPT, wait_until_file_active, extract_json_array
 from extract_frames import to_seconds
 
+# 合并超过该时长（秒）仍为 RUNNING 视为进程已退出，load() 时改为 FAILED
+MERGE_TIMEOUT = 30 * 60
+
 class WorkflowManager:
     def __init__(self, job_id: Optional[str] = None, project_root: Optional[Path] = None):
         self.project_dir = project_root or Path(__file__).parent.parent
         self.job_id = job_id
         self.workflow: Dict[str, Any] = {}
+        self._save_depth = 0
+        self._dirty = False
         
         if job_id:
             self.job_dir = self.project_dir / "jobs" / job_id
@@ -661,6 +667,14 @@ class WorkflowManager:
             self.workflow["global_stages"] = {"analyze": "SUCCESS", "extract": "SUCCESS", "stylize": "NOT_STARTED", "video_gen": "NOT_STARTED", "merge": "NOT_STARTED"}
 
         updated = False
+
+        # 0. 合并进程中途退出时 merge 会一直停在 RUNNING：超时即改为 FAILED，前端不再无限等待
+        stages = self.workflow["global_stages"]
+        if stages.get("merge") == "RUNNING" and time.time() - self.workflow.get("merge_started_at", 0) > MERGE_TIMEOUT:
+            stages["merge"] = "FAILED"
+            self.workflow.pop("merge_started_at", None)
+            updated = True
+
         shots = self.workflow.get("shots", [])
         for shot in shots:
             sid = shot.get("shot_id")
@@ -707,9 +721,32 @@ class WorkflowManager:
         return self.workflow
 
     def save(self):
+        """写盘；处于 batched_save() 中时只标记 dirty，退出时统一写一次"""
+        if self._save_depth:
+            self._dirty = True
+            return
+        self.flush()
+
+    def flush(self):
+        self._dirty = False
         self.workflow.setdefault("meta", {})["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
         save_workflow(self.job_dir, self.workflow)
 
+    @contextmanager
+    def batched_save(self):
+        """
+        合并代码块内的多次 save()，退出时最多写盘一次
+
+        块内不要 await：共享的 manager 可能在此期间被其他请求切换 job
+        """
+        self._save_depth += 1
+        try:
+            yield self
+        finally:
+            self._save_depth -= 1
+            if self._save_depth == 0 and self._dirty:
+                self.flush()
+
     def apply_agent_action(self, action: Union[Dict, List]) -> Dict[str, Any]:
         """处理修改意图：强制重置后续所有依赖节点"""
         actions = action if isinstance(action, list) else [action]
@@ -1432,8 +1469,14 @@ class WorkflowManager:
             if s.get("shot_id") == shot_id: return s
         return None
 
+    def start_merge(self):
+        """标记合并开始（RUNNING + 开始时间），供 load() 判断合并是否超时"""
+        self.workflow.setdefault("global_stages", {})["merge"] = "RUNNING"
+        self.workflow["merge_started_at"] = time.time()
+        self.save()
+
     def merge_videos(self) -> str:
-        """执行无损合并（包含所有生成成功的镜头，含 ENDCARD/BRAND_SPLASH 静态视频）"""
+        """执行无损合并（包含所有生成成功的镜头，含 ENDCARD/BRAND_SPLASH 静态视频），返回输出文件名"""
         ffmpeg_path = get_ffmpeg_path()
         success_shots = [
             s for s in self.workflow.get("shots", [])
@@ -1454,8 +1497,11 @@ class WorkflowManager:
         if result.returncode != 0: raise RuntimeError(f"合并失败: {result.stderr}")
         if "global_stages" in self.workflow:
             self.workflow["global_stages"]["merge"] = "SUCCESS"
+        # 记录输出文件名，前端通过 /status 的 mergeOutput 获取
+        self.workflow["merge_output"] = output_video_path.name
+        self.workflow.pop("merge_started_at", None)
         self.save()
-        return "final_output.mp4"
+        return output_video_path.name
 
     # ============================================================
     # Film IR 集成
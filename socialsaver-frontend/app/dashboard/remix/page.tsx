@@ -37,6 +37,7 @@ import {
   getJobStatus,
   sendAgentChat,
   runTask,
+  waitForMerge,
   getAssetUrl,
   getCharacterLedger,
   triggerRemix,
@@ -1171,10 +1172,11 @@ export default function RemixPage() {
       })
 
       const mergeResult = await runTask("merge", currentJobId)
+      const mergedFile = mergeResult.file ?? await waitForMerge(currentJobId)
 
       // Set the final video URL
-      if (mergeResult.file) {
-        const videoUrl = getAssetUrl(currentJobId, mergeResult.file)
+      if (mergedFile) {
+        const videoUrl = getAssetUrl(currentJobId, mergedFile)
         setGeneratedVideoUrl(videoUrl)
       }
 
@@ -22,6 +22,7 @@ export interface JobStatus {
   canMerge: boolean;
   globalStages: Record<string, string>;
   globalStyle: string;
+  mergeOutput?: string | null;
 }
 
 export interface SocialSaverStoryboard {
@@ -285,6 +286,35 @@ export async function runTask(
   return response.json();
 }
 
+/**
+ * Wait for a merge started via runTask("merge") to finish in the background.
+ * Returns the merged file path relative to the job directory.
+ */
+export async function waitForMerge(
+  jobId: string,
+  intervalMs: number = 2000,
+  maxAttempts: number = 300
+): Promise<string> {
+  for (let attempt = 0; attempt < maxAttempts; attempt++) {
+    const status = await getJobStatus(jobId);
+    const mergeStage = status.globalStages?.merge;
+
+    if (mergeStage === "SUCCESS") {
+      if (!status.mergeOutput) {
+        throw new Error("Merge finished without an output file");
+      }
+      return status.mergeOutput;
+    }
+    if (mergeStage === "FAILED") {
+      throw new Error("Merge failed");
+    }
+
+    await new Promise(resolve => setTimeout(resolve, intervalMs));
+  }
+
+  throw new Error("Merge timed out");
+}
+
 /**
  * Batch serial video generation (to prevent Veo RPM throttling)
  *
@@ -0,0 +1,184 @@
+# tests/test_agent_engine.py
+"""
+Agent 决策引擎辅助逻辑单元测试（不调用 Gemini）
+
+覆盖：
+- AgentAction 输出 schema、未填写字段剥离
+- 风格填充句式剥离
+- 轻量模型路由与输出校验
+- 决策缓存键
+- 摘要缓存创建失败：永久错误停用，临时错误退避后重试
+"""
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("pydantic")
+pytest.importorskip("google.genai")
+
+from google.genai import errors
+from pydantic import ValidationError
+
+from core import agent_engine as ae
+
+
+def _engine(model_id="gemini-3-flash-preview"):
+    # 只测试不依赖客户端的方法，跳过 __init__ 中的 API key / 缓存库初始化
+    engine = ae.AgentEngine.__new__(ae.AgentEngine)
+    engine.model_id = model_id
+    engine.fast_model_id = ae._FAST_MODEL_ID
+    return engine
+
+
+def _parse(text: str):
+    return ae.AgentEngine._parse_response(SimpleNamespace(text=text))
+
+
+class TestActionSchema:
+
+    def test_valid_action(self):
+        act = ae.AgentAction(op="detailed_subject_swap", old_subject="man", new_subject="woman",
+                             attributes={"hair_color": "golden"})
+        assert act.attributes.hair_color == "golden"
+        assert act.value is None
+
+    def test_unknown_op(self):
+        with pytest.raises(ValidationError):
+            ae.AgentAction(op="delete_everything")
+
+    def test_drop_nulls(self):
+        raw = [{"op": "set_global_style", "value": "Film Noir", "shot_id": None,
+                "attributes": {"hair_color": None, "clothing": "red dress"}}]
+        assert ae._drop_nulls(raw) == [
+            {"op": "set_global_style", "value": "Film Noir", "attributes": {"clothing": "red dress"}}
+        ]
+
+
+class TestStyleFiller:
+
+    def test_strip_style_filler(self):
+        res = _parse('[{"op": "set_global_style", "value": "Total transformation into Cyberpunk Neon"}]')
+        assert res[0]["value"] == "Cyberpunk Neon"
+
+    def test_filler_only_value_kept(self):
+        """剥离后为空时保留原值"""
+        res = _parse('{"op": "set_global_style", "value": "Complete overhaul"}')
+        assert res["value"] == "Complete overhaul"
+
+    def test_other_ops_untouched(self):
+        res = _parse('[{"op": "update_cinematography", "value": "Hyper-stylized in close-up"}]')
+        assert res == [{"op": "update_cinematography", "value": "Hyper-stylized in close-up"}]
+
+
+class TestFastPath:
+
+    def test_use_fast_path(self):
+        assert ae.AgentEngine._use_fast_path("把男人换成女人")
+        assert ae.AgentEngine._use_fast_path("replace the dog with a cat")
+        assert not ae.AgentEngine._use_fast_path("改成赛博朋克风格")
+        assert not ae.AgentEngine._use_fast_path("把男人换成女人" + "，" * ae._FAST_PATH_MAX_LEN)
+
+    def test_is_valid_actions(self):
+        assert ae._is_valid_actions([{"op": "global_subject_swap", "old_subject": "man", "new_subject": "woman"}])
+        assert not ae._is_valid_actions([])
+        assert not ae._is_valid_actions({"op": "global_subject_swap"})
+        assert not ae._is_valid_actions([{"op": "error", "reason": "x"}])
+        assert not ae._is_valid_actions(["global_subject_swap"])
+
+    def test_valid_ops_match_schema(self):
+        op_type = ae.AgentAction.model_fields["op"].annotation
+        assert ae._VALID_OPS == frozenset(op_type.__args__)
+
+
+class TestDecisionKey:
+
+    def test_stable(self):
+        assert _engine()._decision_key("换成女人", "summary") == _engine()._decision_key("换成女人", "summary")
+
+    def test_includes_model(self):
+        assert _engine("a")._decision_key("x", "y") != _engine("b")._decision_key("x", "y")
+
+    def test_separates_parts(self):
+        engine = _engine()
+        assert engine._decision_key("ab", "c") != engine._decision_key("a", "bc")
+
+    def test_includes_prompt_digest(self, monkeypatch):
+        engine = _engine()
+        before = engine._decision_key("x", "y")
+        monkeypatch.setattr(ae, "_PROMPT_DIGEST", "changed")
+        assert engine._decision_key("x", "y") != before
+
+
+class _FakeCaches:
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return SimpleNamespace(name=f"cachedContents/{self.calls}")
+
+
+def _api_error(code, status):
+    return errors.APIError(code, {"error": {"code": code, "message": status, "status": status}})
+
+
+class TestSummaryCacheErrors:
+
+    def _engine(self, error):
+        engine = _engine()
+        engine.client = SimpleNamespace(caches=_FakeCaches(error))
+        engine._summary_caches = OrderedDict()
+        engine._summary_lock = threading.Lock()
+        engine._summary_cache_disabled = False
+        engine._summary_cache_retry_at = 0.0
+        engine._summary_cache_failures = 0
+        return engine
+
+    def _request(self, engine, summary="x" * ae._SUMMARY_CACHE_MIN_CHARS):
+        return engine._summary_request("换成女人", summary)
+
+    def test_is_transient_error(self):
+        assert ae._is_transient_error(_api_error(429, "RESOURCE_EXHAUSTED"))
+        assert ae._is_transient_error(_api_error(503, "UNAVAILABLE"))
+        assert ae._is_transient_error(httpx.ReadTimeout("timeout"))
+        assert not ae._is_transient_error(_api_error(400, "INVALID_ARGUMENT"))
+        assert not ae._is_transient_error(_api_error(404, "NOT_FOUND"))
+
+    def test_permanent_error_disables(self):
+        engine = self._engine(_api_error(400, "INVALID_ARGUMENT"))
+        assert self._request(engine) is None
+        assert engine._summary_cache_disabled
+        assert self._request(engine) is None
+        assert engine.client.caches.calls == 1
+
+    def test_transient_error_backs_off(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(ae.time, "monotonic", lambda: now[0])
+        engine = self._engine(_api_error(429, "RESOURCE_EXHAUSTED"))
+        assert self._request(engine) is None
+        assert not engine._summary_cache_disabled
+        # 退避期内不再请求
+        assert self._request(engine) is None
+        assert engine.client.caches.calls == 1
+        # 连续失败时间隔翻倍
+        now[0] += ae._SUMMARY_CACHE_RETRY_S
+        assert self._request(engine) is None
+        assert engine.client.caches.calls == 2
+        assert engine._summary_cache_retry_at == now[0] + 2 * ae._SUMMARY_CACHE_RETRY_S
+        # 恢复后正常创建缓存并清零失败计数
+        engine.client.caches.error = None
+        now[0] += 2 * ae._SUMMARY_CACHE_RETRY_S
+        contents, cache_name = self._request(engine)
+        assert cache_name == "cachedContents/3"
+        assert engine._summary_cache_failures == 0
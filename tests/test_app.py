@@ -0,0 +1,172 @@
+# tests/test_app.py
+"""
+app.py 接口单元测试（不调用 Gemini）
+
+覆盖：
+- Agent 对话：等待 Gemini 期间全局 manager 被改绑时，指令仍应用到本请求的 job
+- job 目录存在性缓存：TTL 内复用、过期条目删除、容量上限
+- 分镜表缓存：源文件未变时命中、LRU 容量上限、不改绑全局 manager
+"""
+
+import asyncio
+import functools
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+import orjson
+import pytest
+from fastapi import HTTPException
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("fastapi")
+pytest.importorskip("google.genai")
+pytest.importorskip("sse_starlette")
+
+# AgentEngine 在导入 app 时创建：提供占位 key，决策缓存库写到临时目录
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+from core import agent_engine
+agent_engine._DISK_CACHE_PATH = Path(tempfile.mkdtemp()) / "agent_cache.db"
+
+import app as app_module
+from core.workflow_manager import WorkflowManager
+
+
+@pytest.fixture
+def jobs_root(monkeypatch):
+    with tempfile.TemporaryDirectory() as d:
+        monkeypatch.chdir(d)
+        # 按请求新建的 WorkflowManager 也指向临时目录
+        monkeypatch.setattr(app_module, "WorkflowManager", functools.partial(WorkflowManager, project_root=Path(d)))
+        yield Path(d) / "jobs"
+
+
+def _make_job(jobs_root: Path, job_id: str) -> Path:
+    job_dir = jobs_root / job_id
+    job_dir.mkdir(parents=True)
+    (job_dir / "workflow.json").write_bytes(orjson.dumps({
+        "job_id": job_id,
+        "global": {"style_prompt": "Original"},
+        "shots": [{"shot_id": "shot_01", "description": "a man walking",
+                   "assets": {}, "status": {"stylize": "NOT_STARTED", "video_generate": "NOT_STARTED"}}],
+    }))
+    return job_dir
+
+
+def _style(job_dir: Path) -> str:
+    return orjson.loads((job_dir / "workflow.json").read_bytes())["global"]["style_prompt"]
+
+
+class TestAgentChat:
+
+    def test_rebinding_during_gemini_call(self, jobs_root, monkeypatch):
+        job_dir = _make_job(jobs_root, "job_test")
+        other_dir = _make_job(jobs_root, "job_other")
+
+        async def fake_action(message, summary):
+            # 模拟 Gemini 调用期间的状态轮询：把全局 manager 改绑到另一个 job
+            app_module.manager.job_id = "job_other"
+            app_module.manager.job_dir = Path("jobs") / "job_other"
+            app_module.manager.load()
+            return [{"op": "set_global_style", "value": "Film Noir"}]
+
+        monkeypatch.setattr(app_module.agent, "get_action_from_text_async", fake_action)
+        req = app_module.ChatRequest(message="改成黑色电影风格", job_id="job_test")
+        res = asyncio.run(app_module.agent_chat(req))
+
+        assert res["result"]["status"] == "success"
+        assert _style(job_dir) == "Film Noir"
+        assert _style(other_dir) == "Original"
+
+
+class TestJobDirCache:
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self, monkeypatch):
+        monkeypatch.setattr(app_module, "_job_dir_seen", OrderedDict())
+
+    def test_missing_job(self, jobs_root):
+        with pytest.raises(HTTPException) as exc:
+            app_module._require_job_dir("job_missing")
+        assert exc.value.status_code == 404
+        assert "job_missing" not in app_module._job_dir_seen
+
+    def test_cached_within_ttl(self, jobs_root):
+        job_dir = _make_job(jobs_root, "job_test")
+        app_module._require_job_dir("job_test")
+        (job_dir / "workflow.json").unlink()
+        job_dir.rmdir()
+        # TTL 内不再 stat
+        assert app_module._require_job_dir("job_test") == Path("jobs") / "job_test"
+
+    def test_expired_entry_removed(self, jobs_root):
+        job_dir = _make_job(jobs_root, "job_test")
+        app_module._require_job_dir("job_test")
+        app_module._job_dir_seen["job_test"] = 0.0
+        (job_dir / "workflow.json").unlink()
+        job_dir.rmdir()
+        with pytest.raises(HTTPException):
+            app_module._require_job_dir("job_test")
+        assert "job_test" not in app_module._job_dir_seen
+
+    def test_bounded(self, jobs_root, monkeypatch):
+        monkeypatch.setattr(app_module, "_JOB_DIR_CACHE_SIZE", 2)
+        for job_id in ("job_a", "job_b", "job_c"):
+            _make_job(jobs_root, job_id)
+            app_module._require_job_dir(job_id)
+        assert list(app_module._job_dir_seen) == ["job_b", "job_c"]
+
+
+def _touch(path: Path):
+    # 部分文件系统 mtime 精度较粗：显式推进 mtime_ns，确保版本变化
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+class TestStoryboardCache:
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self, monkeypatch):
+        monkeypatch.setattr(app_module, "_job_dir_seen", OrderedDict())
+        monkeypatch.setattr(app_module, "_storyboard_cache", OrderedDict())
+
+    def _get(self, job_id):
+        return orjson.loads(asyncio.run(app_module.get_storyboard_socialsaver(job_id)).body)
+
+    def test_file_version(self, jobs_root):
+        job_dir = _make_job(jobs_root, "job_test")
+        assert app_module._file_version(job_dir / "film_ir.json") is None
+        before = app_module._file_version(job_dir / "workflow.json")
+        _touch(job_dir / "workflow.json")
+        assert app_module._file_version(job_dir / "workflow.json") != before
+
+    def test_hit_until_source_changes(self, jobs_root, monkeypatch):
+        job_dir = _make_job(jobs_root, "job_test")
+        calls = []
+        convert = app_module.convert_workflow_to_socialsaver
+        monkeypatch.setattr(app_module, "convert_workflow_to_socialsaver",
+                            lambda wf, base_url: calls.append(1) or convert(wf, base_url))
+        first = self._get("job_test")
+        assert self._get("job_test") == first
+        assert len(calls) == 1
+        _touch(job_dir / "workflow.json")
+        self._get("job_test")
+        assert len(calls) == 2
+
+    def test_lru_bounded(self, jobs_root, monkeypatch):
+        monkeypatch.setattr(app_module, "_STORYBOARD_CACHE_SIZE", 2)
+        for job_id in ("job_a", "job_b"):
+            _make_job(jobs_root, job_id)
+            self._get(job_id)
+        self._get("job_a")  # 命中后移到末尾
+        _make_job(jobs_root, "job_c")
+        self._get("job_c")
+        assert list(app_module._storyboard_cache) == ["job_a", "job_c"]
+
+    def test_keeps_shared_manager_binding(self, jobs_root):
+        _make_job(jobs_root, "job_test")
+        before = (app_module.manager.job_id, getattr(app_module.manager, "job_dir", None))
+        self._get("job_test")
+        assert (app_module.manager.job_id, getattr(app_module.manager, "job_dir", None)) == before
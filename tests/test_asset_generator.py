@@ -0,0 +1,186 @@
+# tests/test_asset_generator.py
+"""
+资产生成器辅助逻辑单元测试（不调用 Gemini）
+
+覆盖：
+- 结果缓存的格式识别、读取与淘汰
+- 瞬时错误识别与退避重试
+- get_asset_paths 路径索引
+- 不绑定任务的 standalone 生成器
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("PIL")
+
+from core import asset_generator as ag
+
+
+@pytest.fixture
+def cache_dir():
+    with tempfile.TemporaryDirectory() as d:
+        yield Path(d)
+
+
+def _write(path: Path, size: int, age: float = 0.0) -> Path:
+    path.write_bytes(b"\x89PNG" + b"\0" * (size - 4))
+    if age:
+        t = time.time() - age
+        os.utime(path, (t, t))
+    return path
+
+
+class TestGenerationCache:
+
+    def test_sniff_mime(self):
+        assert ag._sniff_mime(b"\x89PNG\r\n") == "image/png"
+        assert ag._sniff_mime(b"\xff\xd8\xff\xe0") == "image/jpeg"
+        assert ag._sniff_mime(b"RIFF\0\0\0\0WEBPVP8 ") == "image/webp"
+
+    def test_read_cached_image(self, cache_dir):
+        path = cache_dir / "k.png"
+        path.write_bytes(b"\xff\xd8\xff\xe0jpeg")
+        cached = ag._read_cached_image(path)
+        assert cached.mime_type == "image/jpeg"
+        assert ag._read_cached_image(cache_dir / "missing.png") is None
+
+    def test_prune_expired(self, cache_dir):
+        old = _write(cache_dir / "old.png", 10, age=3600)
+        new = _write(cache_dir / "new.png", 10)
+        assert ag._prune_cache_dir(cache_dir, max_bytes=1 << 20, max_age=60) == 1
+        assert not old.exists() and new.exists()
+
+    def test_prune_to_size_oldest_first(self, cache_dir):
+        a = _write(cache_dir / "a.png", 100, age=30)
+        b = _write(cache_dir / "b.png", 100, age=20)
+        c = _write(cache_dir / "c.png", 100, age=10)
+        tmp = _write(cache_dir / "d.png.tmp", 100, age=40)
+        assert ag._prune_cache_dir(cache_dir, max_bytes=200, max_age=3600) == 1
+        assert not a.exists() and b.exists() and c.exists()
+        assert tmp.exists()
+
+    def test_prune_missing_dir(self, cache_dir):
+        assert ag._prune_cache_dir(cache_dir / "nope", 0, 0) == 0
+
+
+@pytest.fixture
+def generator(cache_dir, monkeypatch):
+    monkeypatch.setattr(ag.AssetGenerator, "_init_client", lambda self: None)
+    return ag.AssetGenerator("job_test", str(cache_dir))
+
+
+class TestAssetPathIndex:
+
+    def test_scan(self, generator):
+        (generator.assets_dir / "char_01_front.png").write_bytes(b"x")
+        (generator.assets_dir / "notes.txt").write_bytes(b"x")
+        paths = generator.get_asset_paths()
+        assert list(paths) == ["char_01"]
+        assert paths["char_01"]["front"].endswith("char_01_front.png")
+
+    def test_rescan_on_external_write(self, generator):
+        """其它进程写入新文件后（目录 mtime 变化）索引随之更新"""
+        assert generator.get_asset_paths() == {}
+        (generator.assets_dir / "env_01_wide.png").write_bytes(b"x")
+        stat = generator.assets_dir.stat()
+        os.utime(generator.assets_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert "env_01" in generator.get_asset_paths()
+
+    def test_missing_dir(self, generator):
+        generator.assets_dir.rmdir()
+        assert generator.get_asset_paths() == {}
+
+
+class _Stream:
+    """generate_content_stream 返回的异步迭代器替身"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def _image_chunk(data=b"\x89PNGimage"):
+    part = SimpleNamespace(inline_data=SimpleNamespace(data=data, mime_type="image/png"))
+    return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+
+class _APIError(Exception):
+    def __init__(self, code):
+        super().__init__(f"{code} error")
+        self.code = code
+
+
+def _with_responses(generator, responses):
+    """依次返回 responses 中的结果（异常则抛出），记录调用次数"""
+    calls = []
+
+    async def generate_content_stream(**kwargs):
+        calls.append(kwargs)
+        result = responses[len(calls) - 1]
+        if isinstance(result, Exception):
+            raise result
+        return _Stream(result)
+
+    generator.client = SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(
+        generate_content_stream=generate_content_stream)))
+    generator.types = SimpleNamespace(GenerateContentConfig=lambda **kw: kw)
+    return calls
+
+
+class TestRetry:
+
+    def test_is_transient_error(self):
+        assert ag._is_transient_error(_APIError(429))
+        assert ag._is_transient_error(_APIError(503))
+        assert ag._is_transient_error(asyncio.TimeoutError())
+        assert ag._is_transient_error(Exception("RESOURCE_EXHAUSTED: quota"))
+        assert not ag._is_transient_error(_APIError(400))
+        assert not ag._is_transient_error(ValueError("SAFETY block"))
+
+    def test_retry_then_succeed(self, generator, monkeypatch):
+        monkeypatch.setattr(ag.AssetGenerator, "TRANSIENT_BACKOFF", 0.0)
+        calls = _with_responses(generator, [_APIError(429), _APIError(503), [_image_chunk()]])
+        image, error = asyncio.run(generator._request_image("prompt"))
+        assert error is None and image.data == b"\x89PNGimage"
+        assert len(calls) == 3
+
+    def test_permanent_error_not_retried(self, generator, monkeypatch):
+        monkeypatch.setattr(ag.AssetGenerator, "TRANSIENT_BACKOFF", 0.0)
+        calls = _with_responses(generator, [_APIError(400)])
+        image, error = asyncio.run(generator._request_image("prompt"))
+        assert image is None and "400" in error
+        assert len(calls) == 1
+
+    def test_gives_up_after_retries(self, generator, monkeypatch):
+        monkeypatch.setattr(ag.AssetGenerator, "TRANSIENT_BACKOFF", 0.0)
+        calls = _with_responses(generator, [_APIError(429)] * (ag.AssetGenerator.TRANSIENT_RETRIES + 1))
+        image, error = asyncio.run(generator._request_image("prompt"))
+        assert image is None and "429" in error
+        assert len(calls) == ag.AssetGenerator.TRANSIENT_RETRIES + 1
+
+
+class TestStandalone:
+
+    def test_no_job_dir(self, monkeypatch):
+        """standalone 生成器不绑定任务目录，也不读写结果缓存"""
+        monkeypatch.setattr(ag.AssetGenerator, "_init_client", lambda self: None)
+        generator = ag.AssetGenerator.standalone()
+        assert generator.assets_dir is None and generator.cache_dir is None
+        assert generator.get_generation_status() == {}
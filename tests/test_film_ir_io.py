@@ -0,0 +1,81 @@
+# tests/test_film_ir_io.py
+"""
+film_ir.json 读写单元测试
+
+覆盖：
+- 保存后读取内容一致（含中文，不转义）
+- 原子写入不残留临时文件
+- 文件缺失 / 损坏 JSON 回退为空结构
+- 分镜转换为前端格式
+"""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.film_ir_io import convert_to_frontend_storyboard, load_film_ir, save_film_ir
+
+
+@pytest.fixture
+def job_dir():
+    with tempfile.TemporaryDirectory() as d:
+        yield Path(d) / "job_test"
+
+
+class TestFilmIRIO:
+
+    def test_roundtrip(self, job_dir):
+        """保存后读取得到相同内容，并刷新 updatedAt"""
+        ir = {"jobId": "job_test", "stages": {"specificAnalysis": "SUCCESS"}}
+        save_film_ir(job_dir, ir)
+        loaded = load_film_ir(job_dir)
+        assert loaded == ir
+        assert loaded["updatedAt"].endswith("Z")
+
+    def test_atomic_write(self, job_dir):
+        """中文原样写入，目录中只留下 film_ir.json"""
+        save_film_ir(job_dir, {"userIntent": {"rawPrompt": "把猫换成霸王龙"}})
+        save_film_ir(job_dir, {"userIntent": {"rawPrompt": "水彩风格"}})
+        raw = (job_dir / "film_ir.json").read_text(encoding="utf-8")
+        assert "水彩风格" in raw
+        assert raw.endswith("\n")
+        assert [p.name for p in job_dir.iterdir()] == ["film_ir.json"]
+
+    def test_missing_file(self, job_dir):
+        """文件不存在时返回空结构，且不创建目录"""
+        assert load_film_ir(job_dir)["jobId"] == "job_test"
+        assert not job_dir.exists()
+
+    def test_corrupt_file(self, job_dir):
+        job_dir.mkdir(parents=True)
+        (job_dir / "film_ir.json").write_text('{"jobId": ')
+        assert load_film_ir(job_dir)["jobId"] == "job_test"
+
+
+class TestFrontendStoryboard:
+
+    def _ir(self, shots):
+        return {"jobId": "job_test", "pillars": {"III_shotRecipe": {"concrete": {"shots": shots}}}}
+
+    def test_convert_shot(self):
+        ir = self._ir([{
+            "shotId": "shot_03", "subject": "猫", "startTime": "00:01", "endTime": "00:03.5",
+            "camera": {"shotSize": "CU"}, "audio": {"dialogue": "喵"},
+            "assets": {"firstFrame": "frames/shot_03.png"},
+        }])
+        shot = convert_to_frontend_storyboard(ir, "http://host")[0]
+        assert shot["shotNumber"] == 3
+        assert shot["startSeconds"] == 1.0 and shot["endSeconds"] == 3.5
+        assert shot["shotSize"] == "CU" and shot["cameraAngle"] == ""
+        assert shot["dialogueVoiceover"] == "喵" and shot["music"] == ""
+        assert shot["firstFrameImage"] == "http://host/assets/job_test/frames/shot_03.png"
+
+    def test_missing_nested_fields(self):
+        """camera / audio / assets 缺失时填空值，无 base_url 不生成图片 URL"""
+        ir = self._ir([{"shotId": "shot_01", "assets": {"firstFrame": "a.png"}}])
+        shot = convert_to_frontend_storyboard(ir)[0]
+        assert shot["shotSize"] == "" and shot["music"] == ""
+        assert shot["firstFrameImage"] == ""
@@ -0,0 +1,99 @@
+# tests/test_llm_cache.py
+"""
+LLM 响应缓存单元测试
+
+覆盖：
+- put 后 get 得到相同内容（含中文）
+- 未命中 / 损坏条目返回 None
+- 文件内容变化后哈希随之变化
+- 按最近使用时间淘汰过期 / 超出大小上限的条目
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import llm_cache
+
+
+@pytest.fixture
+def cache_dir():
+    with tempfile.TemporaryDirectory() as d:
+        yield Path(d) / ".llm_cache"
+
+
+class TestLLMCache:
+
+    def test_roundtrip(self, cache_dir):
+        key = llm_cache.content_key("model", "prompt", "videohash")
+        value = {"storyTheme": {"coreTheme": "孤独"}}
+        llm_cache.put(cache_dir, key, value)
+        assert llm_cache.get(cache_dir, key) == value
+        assert list(cache_dir.iterdir()) == [cache_dir / f"{key}.json"]
+
+    def test_miss(self, cache_dir):
+        assert llm_cache.get(cache_dir, "missing") is None
+
+    def test_corrupt_entry(self, cache_dir):
+        cache_dir.mkdir(parents=True)
+        (cache_dir / "bad.json").write_text('{"storyTheme": ')
+        assert llm_cache.get(cache_dir, "bad") is None
+
+    def test_key_separates_parts(self):
+        assert llm_cache.content_key("ab", "c") != llm_cache.content_key("a", "bc")
+
+    def test_file_hash_tracks_content(self, cache_dir):
+        cache_dir.mkdir(parents=True)
+        video = cache_dir / "source.mp4"
+        video.write_bytes(b"frame-a")
+        first = llm_cache.file_hash(video)
+        assert llm_cache.file_hash(video) == first
+
+        video.write_bytes(b"frame-b")
+        stat = video.stat()
+        os.utime(video, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert llm_cache.file_hash(video) != first
+
+
+def _write(path: Path, size: int, age: float = 0.0) -> Path:
+    path.write_bytes(b"{" + b" " * (size - 2) + b"}")
+    if age:
+        t = time.time() - age
+        os.utime(path, (t, t))
+    return path
+
+
+class TestPrune:
+
+    def test_prune_expired(self, cache_dir):
+        cache_dir.mkdir(parents=True)
+        old = _write(cache_dir / "old.json", 10, age=3600)
+        new = _write(cache_dir / "new.json", 10)
+        assert llm_cache.prune(cache_dir, max_bytes=1 << 20, max_age=60) == 1
+        assert not old.exists() and new.exists()
+
+    def test_prune_to_size_oldest_first(self, cache_dir):
+        cache_dir.mkdir(parents=True)
+        a = _write(cache_dir / "a.json", 100, age=30)
+        b = _write(cache_dir / "b.json", 100, age=20)
+        c = _write(cache_dir / "c.json", 100, age=10)
+        tmp = _write(cache_dir / "d.json.123.tmp", 100, age=40)
+        assert llm_cache.prune(cache_dir, max_bytes=200, max_age=3600) == 1
+        assert not a.exists() and b.exists() and c.exists()
+        assert tmp.exists()
+
+    def test_get_refreshes_mtime(self, cache_dir):
+        """命中的条目按最近使用时间保留"""
+        cache_dir.mkdir(parents=True)
+        entry = _write(cache_dir / "k.json", 10, age=3600)
+        assert llm_cache.get(cache_dir, "k") == {}
+        assert llm_cache.prune(cache_dir, max_bytes=1 << 20, max_age=60) == 0
+        assert entry.exists()
+
+    def test_prune_missing_dir(self, cache_dir):
+        assert llm_cache.prune(cache_dir, 0, 0) == 0
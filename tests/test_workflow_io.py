@@ -0,0 +1,78 @@
+# tests/test_workflow_io.py
+"""
+workflow.json 读写单元测试
+
+覆盖：
+- 保存后读取内容一致（含中文，不转义）
+- 文件缺失 / 空文件 / 损坏 JSON 返回空字典
+- progress 按读取时的 shots 状态统计
+"""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.workflow_io import compute_progress, load_workflow, save_workflow
+
+
+@pytest.fixture
+def job_dir():
+    with tempfile.TemporaryDirectory() as d:
+        yield Path(d)
+
+
+class TestWorkflowIO:
+
+    def test_roundtrip(self, job_dir):
+        """保存后读取得到相同内容"""
+        wf = {
+            "job_id": "job_test",
+            "global": {"style_prompt": "赛博朋克"},
+            "shots": [{"shot_id": "shot_01", "start_time": 0.0, "end_time": 2.5}],
+        }
+        save_workflow(job_dir, wf)
+        assert load_workflow(job_dir) == wf
+
+    def test_non_ascii_not_escaped(self, job_dir):
+        """中文按 UTF-8 原样写入"""
+        save_workflow(job_dir, {"global": {"style_prompt": "水彩"}})
+        raw = (job_dir / "workflow.json").read_text(encoding="utf-8")
+        assert "水彩" in raw
+        assert not (job_dir / "workflow.json.tmp").exists()
+
+    def test_missing_file(self, job_dir):
+        assert load_workflow(job_dir) == {}
+
+    def test_empty_file(self, job_dir):
+        (job_dir / "workflow.json").write_text("")
+        assert load_workflow(job_dir, max_retries=1) == {}
+
+    def test_corrupt_file(self, job_dir):
+        (job_dir / "workflow.json").write_text('{"job_id": ')
+        assert load_workflow(job_dir, max_retries=1) == {}
+
+
+class TestProgress:
+
+    def _wf(self):
+        return {"shots": [
+            {"shot_id": "shot_01", "status": {"stylize": "SUCCESS", "video_generate": "SUCCESS"}},
+            {"shot_id": "shot_02", "status": {"stylize": "SUCCESS", "video_generate": "RUNNING"}},
+            {"shot_id": "shot_03", "status": {"stylize": "RUNNING", "video_generate": "NOT_STARTED"}},
+            {"shot_id": "shot_04"},
+        ]}
+
+    def test_compute_progress(self):
+        assert compute_progress(self._wf()) == {
+            "total": 4, "stylized": 2, "video_done": 1, "running": 2,
+        }
+
+    def test_progress_ignores_stale_field(self, job_dir):
+        """文件中残留的 progress 字段不影响统计"""
+        wf = self._wf()
+        wf["progress"] = {"total": 0, "stylized": 0, "video_done": 0, "running": 0}
+        save_workflow(job_dir, wf)
+        assert compute_progress(load_workflow(job_dir))["video_done"] == 1
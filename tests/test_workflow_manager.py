@@ -0,0 +1,118 @@
+# tests/test_workflow_manager.py
+"""
+WorkflowManager 批量保存单元测试
+
+覆盖：
+- batched_save() 内多次 save() 合并为一次写盘
+- 嵌套时只在最外层退出时写盘
+- 块内没有 save() 时不写盘
+- 合并：记录输出文件名，超时仍为 RUNNING 的合并在 load() 时改为 FAILED
+"""
+
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("google.genai")
+
+from core import workflow_manager as wm
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    writes = []
+    monkeypatch.setattr(wm, "save_workflow", lambda job_dir, wf: writes.append(dict(wf)))
+    with tempfile.TemporaryDirectory() as d:
+        m = wm.WorkflowManager(project_root=Path(d))
+        m.job_dir = Path(d) / "jobs" / "job_test"
+        m.workflow = {"shots": []}
+        m.writes = writes
+        yield m
+
+
+class TestBatchedSave:
+
+    def test_save_writes_immediately(self, manager):
+        manager.save()
+        assert len(manager.writes) == 1
+
+    def test_coalesce(self, manager):
+        with manager.batched_save():
+            manager.workflow["a"] = 1
+            manager.save()
+            manager.workflow["b"] = 2
+            manager.save()
+            assert manager.writes == []
+        assert len(manager.writes) == 1
+        assert manager.writes[0]["a"] == 1 and manager.writes[0]["b"] == 2
+
+    def test_nested(self, manager):
+        with manager.batched_save():
+            with manager.batched_save():
+                manager.save()
+            assert manager.writes == []
+        assert len(manager.writes) == 1
+
+    def test_no_save_no_write(self, manager):
+        with manager.batched_save():
+            pass
+        assert manager.writes == []
+
+    def test_flush_on_exception(self, manager):
+        """块内抛出异常时已标记的修改仍会写盘"""
+        with pytest.raises(RuntimeError):
+            with manager.batched_save():
+                manager.save()
+                raise RuntimeError("boom")
+        assert len(manager.writes) == 1
+
+
+class TestMergeState:
+
+    def _load(self, manager, monkeypatch, workflow):
+        monkeypatch.setattr(wm, "load_workflow", lambda job_dir: workflow)
+        return manager.load()
+
+    def test_stale_running_reset(self, manager, monkeypatch):
+        wf = self._load(manager, monkeypatch, {
+            "global_stages": {"merge": "RUNNING"}, "shots": [],
+            "merge_started_at": time.time() - wm.MERGE_TIMEOUT - 1,
+        })
+        assert wf["global_stages"]["merge"] == "FAILED"
+        assert "merge_started_at" not in wf
+        assert len(manager.writes) == 1
+
+    def test_running_without_start_time_reset(self, manager, monkeypatch):
+        wf = self._load(manager, monkeypatch, {"global_stages": {"merge": "RUNNING"}, "shots": []})
+        assert wf["global_stages"]["merge"] == "FAILED"
+
+    def test_recent_running_kept(self, manager, monkeypatch):
+        wf = self._load(manager, monkeypatch, {
+            "global_stages": {"merge": "RUNNING"}, "shots": [], "merge_started_at": time.time(),
+        })
+        assert wf["global_stages"]["merge"] == "RUNNING"
+        assert manager.writes == []
+
+    def test_merge_records_output(self, manager, monkeypatch):
+        manager.job_dir.mkdir(parents=True)
+        monkeypatch.setattr(wm, "get_ffmpeg_path", lambda: "ffmpeg")
+        monkeypatch.setattr(wm.subprocess, "run",
+                            lambda cmd, **kw: subprocess.CompletedProcess(cmd, 0, "", ""))
+        manager.workflow = {
+            "global_stages": {"merge": "NOT_STARTED"},
+            "shots": [{"shot_id": "shot_01", "status": {"video_generate": "SUCCESS"},
+                       "assets": {"video": "videos/shot_01.mp4"}}],
+        }
+        manager.start_merge()
+        assert manager.workflow["global_stages"]["merge"] == "RUNNING"
+        assert "merge_started_at" in manager.workflow
+
+        assert manager.merge_videos() == "final_output.mp4"
+        assert manager.workflow["global_stages"]["merge"] == "SUCCESS"
+        assert manager.workflow["merge_output"] == "final_output.mp4"
+        assert "merge_started_at" not in manager.workflow